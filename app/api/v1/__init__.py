@@ -1,10 +1,29 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import students, faculty, it_staff, staff, patients
+from app.core.config import settings
+from app.api.v1.endpoints import students, faculty, it_staff, staff, patients, people, changes, access
+from app.utils.routing import LazyRouter
 
-api_router = APIRouter()
+# Routes are only recorded here; main.py builds them once, at their final path.
+api_router = LazyRouter()
 
-api_router.include_router(students.router, prefix="/students", tags=["students"])
-api_router.include_router(faculty.router, prefix="/faculty", tags=["faculty"])
-api_router.include_router(it_staff.router, prefix="/it-staff", tags=["it-staff"])
-api_router.include_router(staff.router, prefix="/staff", tags=["staff"])
-api_router.include_router(patients.router, prefix="/patients", tags=["patients"])
\ No newline at end of file
+
+def _include(module, prefix: str, tags) -> None:
+    specs = module.router.specs
+    if settings.async_database and hasattr(module, "async_router"):
+        # Swap in the async version of each route that has one, keeping the
+        # sync router's declaration order so static paths (/bulk, /export,
+        # ...) still match before /{id}. Routes without an async version
+        # stay sync.
+        async_specs = {spec.key: spec for spec in module.async_router.specs}
+        specs = [async_specs.get(spec.key, spec) for spec in specs]
+    for spec in specs:
+        api_router.add_api_route(prefix + spec.path, spec.endpoint, **{**spec.kwargs, "tags": tags})
+
+
+_include(students, "/students", ["students"])
+_include(faculty, "/faculty", ["faculty"])
+_include(it_staff, "/it-staff", ["it-staff"])
+_include(staff, "/staff", ["staff"])
+_include(patients, "/patients", ["patients"])
+_include(people, "/people", ["people"])
+_include(changes, "/changes", ["changes"])
+_include(access, "/access", ["access"])
@@ -0,0 +1,48 @@
+from fastapi import Body, HTTPException, status
+from typing import List, Optional
+from app.core.config import settings
+from app.schemas.access import AccessDecision
+from app.schemas.people import PersonDomain
+from app.services.access_index import access_index
+from app.utils.routing import LazyRouter
+from app.utils.serialization import RowSerializer
+
+# Answered from the in-memory access index, so the routes are async in both
+# database modes and run on the event loop with the index. Without a change
+# log the index falls back to querying the databases.
+router = LazyRouter()
+
+decision_serializer = RowSerializer(AccessDecision)
+
+
+def _unknown(identifier: str) -> dict:
+    return AccessDecision(identifier=identifier).model_dump()
+
+
+@router.post("/check", response_model=List[AccessDecision])
+async def check_access(
+    identifiers: List[str] = Body(..., max_length=settings.access_check_max_items),
+    domain: Optional[PersonDomain] = None
+):
+    """
+    Decisions for many identifiers at once, in request order. An identifier
+    held by several people (in different domains) gets one entry each; an
+    unknown one gets a single entry with `is_active` false.
+    """
+    found = await access_index.find(identifiers, domain.value if domain else None)
+    decisions = []
+    for identifier, matches in zip(identifiers, found):
+        decisions.extend(matches or [_unknown(identifier)])
+    return decision_serializer.response(decisions)
+
+
+@router.get("/{identifier}", response_model=List[AccessDecision])
+async def get_access(identifier: str, domain: Optional[PersonDomain] = None):
+    """Decision for a natural id (student_id, staff_id, ...) or email, one entry per match."""
+    (matches,) = await access_index.find([identifier], domain.value if domain else None)
+    if not matches:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Identifier not found"
+        )
+    return decision_serializer.response(matches)
@@ -0,0 +1,151 @@
+from fastapi import Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from typing import List, Optional
+from app.core.config import settings
+from app.db.base import get_async_read_db, get_read_db, shards
+from app.schemas.change import ChangeFeed, ChangeFeedHead
+from app.schemas.people import PersonDomain
+from app.services.change_service import (
+    AsyncChangeService, ChangeLogUnavailableError, ChangeService, CursorExpiredError, Position,
+    change_log_available,
+)
+from app.services.change_stream import ChangeStream
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.routing import LazyRouter
+
+router = LazyRouter()
+
+
+def _decode_since(cursor: str) -> Position:
+    try:
+        seqs = decode_cursor(cursor)
+    except ValueError:
+        seqs = [None]
+    if not all(isinstance(seq, int) and not isinstance(seq, bool) and seq >= 0 for seq in seqs):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return tuple(seqs)
+
+
+async def since_param(since: Optional[str] = None) -> Position:
+    """Decode the `since` cursor; no cursor means the start of the log."""
+    if since is None:
+        return (0,) * len(shards)
+    return _decode_since(since)
+
+
+async def stream_since_param(
+    since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None)
+) -> Optional[Position]:
+    """
+    Where a stream resumes: the Last-Event-ID a reconnecting EventSource sends,
+    else the `since` cursor. None means only changes from now on.
+    """
+    cursor = last_event_id or since
+    if cursor is None:
+        return None
+    return _decode_since(cursor)
+
+
+def _feed(changes, has_more: bool, since: Position) -> ChangeFeed:
+    last = changes[-1]["position"] if changes else since
+    return ChangeFeed(changes=changes, next_cursor=encode_cursor(*last), has_more=has_more)
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail="The change feed is only kept on SQLite databases"
+    )
+
+
+def _expired() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Changes after this cursor are no longer retained; resync from /export and /changes/head"
+    )
+
+
+@router.get("/", response_model=ChangeFeed)
+def get_changes(
+    since: Position = Depends(since_param),
+    limit: int = Query(100, ge=1, le=settings.change_feed_max_limit),
+    db: Session = Depends(get_read_db)
+):
+    service = ChangeService(db)
+    try:
+        changes, has_more = service.get_changes(since, limit)
+    except CursorExpiredError:
+        raise _expired()
+    except ChangeLogUnavailableError:
+        raise _unavailable()
+    return _feed(changes, has_more, since)
+
+
+@router.get("/head", response_model=ChangeFeedHead)
+def get_changes_head(db: Session = Depends(get_read_db)):
+    service = ChangeService(db)
+    try:
+        return ChangeFeedHead(cursor=encode_cursor(*service.get_head()))
+    except ChangeLogUnavailableError:
+        raise _unavailable()
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(
+    since: Optional[Position] = Depends(stream_since_param),
+    domain: Optional[List[PersonDomain]] = Query(None),
+):
+    """
+    Server-sent events, one per change as it is committed, optionally limited
+    to some domains. Each event's id is a feed cursor, so a reconnecting client
+    resumes where it stopped. Runs on the event loop in both database modes.
+    """
+    if not change_log_available():
+        raise _unavailable()
+    domains = {d.value for d in domain} if domain else None
+    try:
+        stream = await ChangeStream.open(since, domains)
+    except CursorExpiredError:
+        raise _expired()
+    return StreamingResponse(
+        stream.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(stream.close),
+    )
+
+
+# Mounted instead of the routes above when settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.get("/", response_model=ChangeFeed)
+async def get_changes_async(
+    since: Position = Depends(since_param),
+    limit: int = Query(100, ge=1, le=settings.change_feed_max_limit),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncChangeService(db)
+    try:
+        changes, has_more = await service.get_changes(since, limit)
+    except CursorExpiredError:
+        raise _expired()
+    except ChangeLogUnavailableError:
+        raise _unavailable()
+    return _feed(changes, has_more, since)
+
+
+@async_router.get("/head", response_model=ChangeFeedHead)
+async def get_changes_head_async(db: AsyncSession = Depends(get_async_read_db)):
+    service = AsyncChangeService(db)
+    try:
+        return ChangeFeedHead(cursor=encode_cursor(*await service.get_head()))
+    except ChangeLogUnavailableError:
+        raise _unavailable()
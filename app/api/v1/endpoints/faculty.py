@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Body, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.base import get_db
-from app.schemas.faculty import FacultyCreate, FacultyUpdate, FacultyResponse
-from app.services.faculty_service import FacultyService
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.base import get_async_db, get_async_read_db, get_db, get_read_db
+from app.schemas.bulk import BulkCreateResponse, BulkUpsertResponse, ImportReport
+from app.schemas.faculty import FacultyCreate, FacultyUpdate, FacultyResponse, FacultyFilter, FacultyLookup
+from app.services.faculty_service import AsyncFacultyService, FacultyService
+from app.utils.etag import etag_matches, not_modified, row_etag, set_etag, table_etag
+from app.utils.export import stream_export
+from app.utils.pagination import PageParams, filter_params, page_params, set_next_cursor
+from app.utils.routing import LazyRouter
+from app.utils.serialization import FileFormat, RowSerializer
 
-router = APIRouter()
+router = LazyRouter()
+
+# GET / serializes rows straight to JSON bytes; see RowSerializer.
+list_serializer = RowSerializer(FacultyResponse)
+list_filters = filter_params(FacultyFilter)
 
 
 @router.post("/", response_model=FacultyResponse, status_code=status.HTTP_201_CREATED)
@@ -26,20 +38,80 @@ def create_faculty(
     return service.create_faculty(faculty)
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+def create_faculty_bulk(
+    faculty: List[FacultyCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = FacultyService(db)
+    return BulkCreateResponse.from_results(service.create_faculty_bulk(faculty))
+
+
+@router.post("/upsert", response_model=BulkUpsertResponse)
+def upsert_faculty(
+    faculty: List[FacultyCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = FacultyService(db)
+    return service.upsert_faculty(faculty)
+
+
+@router.post("/lookup", response_model=List[Optional[FacultyResponse]])
+def lookup_faculty(
+    lookup: FacultyLookup,
+    db: Session = Depends(get_read_db)
+):
+    service = FacultyService(db)
+    return list_serializer.lookup_response(service.lookup_faculty_rows(list_serializer.fields, lookup))
+
+
+@router.post("/import", response_model=ImportReport)
+def import_faculty(
+    file: UploadFile = File(...),
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db)
+):
+    service = FacultyService(db)
+    return service.import_faculty(file.file, format or FileFormat.from_filename(file.filename))
+
+
 @router.get("/", response_model=List[FacultyResponse])
 def get_faculty_list(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: Session = Depends(get_read_db)
 ):
     service = FacultyService(db)
-    return service.get_faculty_list(skip=skip, limit=limit)
+    etag = table_etag("faculty", service.get_faculty_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = service.get_faculty_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export")
+def export_faculty(
+    format: FileFormat = FileFormat.ndjson,
+    filters: Dict[str, Any] = Depends(list_filters),
+):
+    return stream_export(
+        lambda db: FacultyService(db).iter_faculty_rows(list_serializer.fields, filters),
+        list_serializer,
+        format,
+        "faculty",
+    )
 
 
 @router.get("/{faculty_id}", response_model=FacultyResponse)
 def get_faculty(
     faculty_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     service = FacultyService(db)
     faculty = service.get_faculty(faculty_id)
@@ -48,6 +120,10 @@ def get_faculty(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Faculty not found"
         )
+    etag = row_etag(faculty)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return faculty
 
 
@@ -78,4 +154,105 @@ def delete_faculty(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Faculty not found"
-        )
\ No newline at end of file
+        )
+
+
+# Same CRUD routes on an AsyncSession, mounted instead of the ones above when
+# settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.post("/", response_model=FacultyResponse, status_code=status.HTTP_201_CREATED)
+async def create_faculty_async(
+    faculty: FacultyCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncFacultyService(db)
+    
+    # Check if faculty_id already exists
+    existing_faculty = await service.get_faculty_by_faculty_id(faculty.faculty_id)
+    if existing_faculty:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Faculty ID already exists"
+        )
+    
+    return await service.create_faculty(faculty)
+
+
+@async_router.post("/lookup", response_model=List[Optional[FacultyResponse]])
+async def lookup_faculty_async(
+    lookup: FacultyLookup,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncFacultyService(db)
+    return list_serializer.lookup_response(await service.lookup_faculty_rows(list_serializer.fields, lookup))
+
+
+@async_router.get("/", response_model=List[FacultyResponse])
+async def get_faculty_list_async(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncFacultyService(db)
+    etag = table_etag("faculty", await service.get_faculty_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await service.get_faculty_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@async_router.get("/{faculty_id}", response_model=FacultyResponse)
+async def get_faculty_async(
+    faculty_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncFacultyService(db)
+    faculty = await service.get_faculty(faculty_id)
+    if not faculty:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Faculty not found"
+        )
+    etag = row_etag(faculty)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return faculty
+
+
+@async_router.put("/{faculty_id}", response_model=FacultyResponse)
+async def update_faculty_async(
+    faculty_id: int,
+    faculty_update: FacultyUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncFacultyService(db)
+    faculty = await service.update_faculty(faculty_id, faculty_update)
+    if not faculty:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Faculty not found"
+        )
+    return faculty
+
+
+@async_router.delete("/{faculty_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_faculty_async(
+    faculty_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncFacultyService(db)
+    success = await service.delete_faculty(faculty_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Faculty not found"
+        )
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Body, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.base import get_db
-from app.schemas.it_staff import ITStaffCreate, ITStaffUpdate, ITStaffResponse
-from app.services.it_staff_service import ITStaffService
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.base import get_async_db, get_async_read_db, get_db, get_read_db
+from app.schemas.bulk import BulkCreateResponse, ImportReport
+from app.schemas.it_staff import ITStaffCreate, ITStaffUpdate, ITStaffResponse, ITStaffFilter, ITStaffLookup
+from app.services.it_staff_service import AsyncITStaffService, ITStaffService
+from app.utils.etag import etag_matches, not_modified, row_etag, set_etag, table_etag
+from app.utils.export import stream_export
+from app.utils.pagination import PageParams, filter_params, page_params, set_next_cursor
+from app.utils.routing import LazyRouter
+from app.utils.serialization import FileFormat, RowSerializer
 
-router = APIRouter()
+router = LazyRouter()
+
+# GET / serializes rows straight to JSON bytes; see RowSerializer.
+list_serializer = RowSerializer(ITStaffResponse)
+list_filters = filter_params(ITStaffFilter)
 
 
 @router.post("/", response_model=ITStaffResponse, status_code=status.HTTP_201_CREATED)
@@ -26,20 +38,71 @@ def create_it_staff(
     return service.create_it_staff(it_staff)
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+def create_it_staff_bulk(
+    it_staff: List[ITStaffCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = ITStaffService(db)
+    return BulkCreateResponse.from_results(service.create_it_staff_bulk(it_staff))
+
+
+@router.post("/lookup", response_model=List[Optional[ITStaffResponse]])
+def lookup_it_staff(
+    lookup: ITStaffLookup,
+    db: Session = Depends(get_read_db)
+):
+    service = ITStaffService(db)
+    return list_serializer.lookup_response(service.lookup_it_staff_rows(list_serializer.fields, lookup))
+
+
+@router.post("/import", response_model=ImportReport)
+def import_it_staff(
+    file: UploadFile = File(...),
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db)
+):
+    service = ITStaffService(db)
+    return service.import_it_staff(file.file, format or FileFormat.from_filename(file.filename))
+
+
 @router.get("/", response_model=List[ITStaffResponse])
 def get_it_staff_list(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: Session = Depends(get_read_db)
 ):
     service = ITStaffService(db)
-    return service.get_it_staff_list(skip=skip, limit=limit)
+    etag = table_etag("it_staff", service.get_it_staff_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = service.get_it_staff_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export")
+def export_it_staff(
+    format: FileFormat = FileFormat.ndjson,
+    filters: Dict[str, Any] = Depends(list_filters),
+):
+    return stream_export(
+        lambda db: ITStaffService(db).iter_it_staff_rows(list_serializer.fields, filters),
+        list_serializer,
+        format,
+        "it_staff",
+    )
 
 
 @router.get("/{staff_id}", response_model=ITStaffResponse)
 def get_it_staff(
     staff_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     service = ITStaffService(db)
     it_staff = service.get_it_staff(staff_id)
@@ -48,6 +111,10 @@ def get_it_staff(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="IT Staff not found"
         )
+    etag = row_etag(it_staff)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return it_staff
 
 
@@ -78,4 +145,105 @@ def delete_it_staff(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="IT Staff not found"
-        )
\ No newline at end of file
+        )
+
+
+# Same CRUD routes on an AsyncSession, mounted instead of the ones above when
+# settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.post("/", response_model=ITStaffResponse, status_code=status.HTTP_201_CREATED)
+async def create_it_staff_async(
+    it_staff: ITStaffCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncITStaffService(db)
+    
+    # Check if staff_id already exists
+    existing_staff = await service.get_it_staff_by_staff_id(it_staff.staff_id)
+    if existing_staff:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="IT Staff ID already exists"
+        )
+    
+    return await service.create_it_staff(it_staff)
+
+
+@async_router.post("/lookup", response_model=List[Optional[ITStaffResponse]])
+async def lookup_it_staff_async(
+    lookup: ITStaffLookup,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncITStaffService(db)
+    return list_serializer.lookup_response(await service.lookup_it_staff_rows(list_serializer.fields, lookup))
+
+
+@async_router.get("/", response_model=List[ITStaffResponse])
+async def get_it_staff_list_async(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncITStaffService(db)
+    etag = table_etag("it_staff", await service.get_it_staff_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await service.get_it_staff_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@async_router.get("/{staff_id}", response_model=ITStaffResponse)
+async def get_it_staff_async(
+    staff_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncITStaffService(db)
+    it_staff = await service.get_it_staff(staff_id)
+    if not it_staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="IT Staff not found"
+        )
+    etag = row_etag(it_staff)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return it_staff
+
+
+@async_router.put("/{staff_id}", response_model=ITStaffResponse)
+async def update_it_staff_async(
+    staff_id: int,
+    staff_update: ITStaffUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncITStaffService(db)
+    it_staff = await service.update_it_staff(staff_id, staff_update)
+    if not it_staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="IT Staff not found"
+        )
+    return it_staff
+
+
+@async_router.delete("/{staff_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_it_staff_async(
+    staff_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncITStaffService(db)
+    success = await service.delete_it_staff(staff_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="IT Staff not found"
+        )
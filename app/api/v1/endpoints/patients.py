@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Body, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.base import get_db
-from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
-from app.services.patient_service import PatientService
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.base import get_async_db, get_async_read_db, get_db, get_read_db
+from app.schemas.bulk import BulkCreateResponse, ImportReport
+from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse, PatientFilter, PatientLookup
+from app.services.patient_service import AsyncPatientService, PatientService
+from app.utils.etag import etag_matches, not_modified, row_etag, set_etag, table_etag
+from app.utils.export import stream_export
+from app.utils.pagination import PageParams, filter_params, page_params, set_next_cursor
+from app.utils.routing import LazyRouter
+from app.utils.serialization import FileFormat, RowSerializer
 
-router = APIRouter()
+router = LazyRouter()
+
+# GET / serializes rows straight to JSON bytes; see RowSerializer.
+list_serializer = RowSerializer(PatientResponse)
+list_filters = filter_params(PatientFilter)
 
 
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
@@ -23,20 +35,71 @@ def create_patient(
         )
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+def create_patients_bulk(
+    patients: List[PatientCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = PatientService(db)
+    return BulkCreateResponse.from_results(service.create_patients_bulk(patients))
+
+
+@router.post("/lookup", response_model=List[Optional[PatientResponse]])
+def lookup_patients(
+    lookup: PatientLookup,
+    db: Session = Depends(get_read_db)
+):
+    service = PatientService(db)
+    return list_serializer.lookup_response(service.lookup_patient_rows(list_serializer.fields, lookup))
+
+
+@router.post("/import", response_model=ImportReport)
+def import_patients(
+    file: UploadFile = File(...),
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db)
+):
+    service = PatientService(db)
+    return service.import_patients(file.file, format or FileFormat.from_filename(file.filename))
+
+
 @router.get("/", response_model=List[PatientResponse])
 def get_patients(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: Session = Depends(get_read_db)
 ):
     service = PatientService(db)
-    return service.get_patients(skip=skip, limit=limit)
+    etag = table_etag("patients", service.get_patients_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = service.get_patient_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export")
+def export_patients(
+    format: FileFormat = FileFormat.ndjson,
+    filters: Dict[str, Any] = Depends(list_filters),
+):
+    return stream_export(
+        lambda db: PatientService(db).iter_patient_rows(list_serializer.fields, filters),
+        list_serializer,
+        format,
+        "patients",
+    )
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
 def get_patient(
     patient_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     service = PatientService(db)
     patient = service.get_patient(patient_id)
@@ -45,6 +108,10 @@ def get_patient(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient not found",
         )
+    etag = row_etag(patient)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return patient
 
 
@@ -76,3 +143,101 @@ def delete_patient(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient not found",
         )
+
+
+# Same CRUD routes on an AsyncSession, mounted instead of the ones above when
+# settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
+async def create_patient_async(
+    patient: PatientCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncPatientService(db)
+    try:
+        return await service.create_patient(patient)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@async_router.post("/lookup", response_model=List[Optional[PatientResponse]])
+async def lookup_patients_async(
+    lookup: PatientLookup,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncPatientService(db)
+    return list_serializer.lookup_response(await service.lookup_patient_rows(list_serializer.fields, lookup))
+
+
+@async_router.get("/", response_model=List[PatientResponse])
+async def get_patients_async(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncPatientService(db)
+    etag = table_etag("patients", await service.get_patients_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await service.get_patient_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@async_router.get("/{patient_id}", response_model=PatientResponse)
+async def get_patient_async(
+    patient_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncPatientService(db)
+    patient = await service.get_patient(patient_id)
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found",
+        )
+    etag = row_etag(patient)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return patient
+
+
+@async_router.put("/{patient_id}", response_model=PatientResponse)
+async def update_patient_async(
+    patient_id: int,
+    patient_update: PatientUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncPatientService(db)
+    patient = await service.update_patient(patient_id, patient_update)
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found",
+        )
+    return patient
+
+
+@async_router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_patient_async(
+    patient_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncPatientService(db)
+    success = await service.delete_patient(patient_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found",
+        )
@@ -0,0 +1,42 @@
+from fastapi import Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.config import settings
+from app.db.base import get_async_read_db, get_read_db
+from app.schemas.people import PersonDomain, PersonSearchResult
+from app.services.people_service import AsyncPeopleService, PeopleService
+from app.utils.routing import LazyRouter
+from app.utils.serialization import RowSerializer
+
+router = LazyRouter()
+
+search_serializer = RowSerializer(PersonSearchResult)
+
+
+@router.get("/search", response_model=List[PersonSearchResult])
+def search_people(
+    q: str = Query(..., min_length=1, max_length=200),
+    domain: Optional[PersonDomain] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.max_page_size),
+    db: Session = Depends(get_read_db)
+):
+    service = PeopleService(db)
+    return search_serializer.response(service.search(q, skip=skip, limit=limit, domain=domain))
+
+
+# Mounted instead of the route above when settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.get("/search", response_model=List[PersonSearchResult])
+async def search_people_async(
+    q: str = Query(..., min_length=1, max_length=200),
+    domain: Optional[PersonDomain] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.max_page_size),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncPeopleService(db)
+    return search_serializer.response(await service.search(q, skip=skip, limit=limit, domain=domain))
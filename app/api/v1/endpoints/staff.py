@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Body, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.base import get_db
-from app.schemas.staff import StaffCreate, StaffUpdate, StaffResponse
-from app.services.staff_service import StaffService
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.base import get_async_db, get_async_read_db, get_db, get_read_db
+from app.schemas.bulk import BulkCreateResponse, BulkUpsertResponse, ImportReport
+from app.schemas.staff import StaffCreate, StaffUpdate, StaffResponse, StaffFilter, StaffLookup
+from app.services.staff_service import AsyncStaffService, StaffService
+from app.utils.etag import etag_matches, not_modified, row_etag, set_etag, table_etag
+from app.utils.export import stream_export
+from app.utils.pagination import PageParams, filter_params, page_params, set_next_cursor
+from app.utils.routing import LazyRouter
+from app.utils.serialization import FileFormat, RowSerializer
 
-router = APIRouter()
+router = LazyRouter()
+
+# GET / serializes rows straight to JSON bytes; see RowSerializer.
+list_serializer = RowSerializer(StaffResponse)
+list_filters = filter_params(StaffFilter)
 
 
 @router.post("/", response_model=StaffResponse, status_code=status.HTTP_201_CREATED)
@@ -23,20 +35,80 @@ def create_staff(
         )
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+def create_staff_bulk(
+    staff: List[StaffCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = StaffService(db)
+    return BulkCreateResponse.from_results(service.create_staff_bulk(staff))
+
+
+@router.post("/upsert", response_model=BulkUpsertResponse)
+def upsert_staff(
+    staff: List[StaffCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = StaffService(db)
+    return service.upsert_staff(staff)
+
+
+@router.post("/lookup", response_model=List[Optional[StaffResponse]])
+def lookup_staff(
+    lookup: StaffLookup,
+    db: Session = Depends(get_read_db)
+):
+    service = StaffService(db)
+    return list_serializer.lookup_response(service.lookup_staff_rows(list_serializer.fields, lookup))
+
+
+@router.post("/import", response_model=ImportReport)
+def import_staff(
+    file: UploadFile = File(...),
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db)
+):
+    service = StaffService(db)
+    return service.import_staff(file.file, format or FileFormat.from_filename(file.filename))
+
+
 @router.get("/", response_model=List[StaffResponse])
 def get_staff_list(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: Session = Depends(get_read_db)
 ):
     service = StaffService(db)
-    return service.get_staff_list(skip=skip, limit=limit)
+    etag = table_etag("staff", service.get_staff_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = service.get_staff_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export")
+def export_staff(
+    format: FileFormat = FileFormat.ndjson,
+    filters: Dict[str, Any] = Depends(list_filters),
+):
+    return stream_export(
+        lambda db: StaffService(db).iter_staff_rows(list_serializer.fields, filters),
+        list_serializer,
+        format,
+        "staff",
+    )
 
 
 @router.get("/{staff_id}", response_model=StaffResponse)
 def get_staff(
     staff_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     service = StaffService(db)
     staff = service.get_staff(staff_id)
@@ -45,6 +117,10 @@ def get_staff(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Staff not found",
         )
+    etag = row_etag(staff)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return staff
 
 
@@ -76,3 +152,101 @@ def delete_staff(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Staff not found",
         )
+
+
+# Same CRUD routes on an AsyncSession, mounted instead of the ones above when
+# settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.post("/", response_model=StaffResponse, status_code=status.HTTP_201_CREATED)
+async def create_staff_async(
+    staff: StaffCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStaffService(db)
+    try:
+        return await service.create_staff(staff)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@async_router.post("/lookup", response_model=List[Optional[StaffResponse]])
+async def lookup_staff_async(
+    lookup: StaffLookup,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStaffService(db)
+    return list_serializer.lookup_response(await service.lookup_staff_rows(list_serializer.fields, lookup))
+
+
+@async_router.get("/", response_model=List[StaffResponse])
+async def get_staff_list_async(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStaffService(db)
+    etag = table_etag("staff", await service.get_staff_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await service.get_staff_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@async_router.get("/{staff_id}", response_model=StaffResponse)
+async def get_staff_async(
+    staff_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStaffService(db)
+    staff = await service.get_staff(staff_id)
+    if not staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff not found",
+        )
+    etag = row_etag(staff)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return staff
+
+
+@async_router.put("/{staff_id}", response_model=StaffResponse)
+async def update_staff_async(
+    staff_id: int,
+    staff_update: StaffUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStaffService(db)
+    staff = await service.update_staff(staff_id, staff_update)
+    if not staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff not found",
+        )
+    return staff
+
+
+@async_router.delete("/{staff_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_staff_async(
+    staff_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStaffService(db)
+    success = await service.delete_staff(staff_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff not found",
+        )
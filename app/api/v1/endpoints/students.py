@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Body, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.base import get_db
-from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
-from app.services.student_service import StudentService
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.base import get_async_db, get_async_read_db, get_db, get_read_db
+from app.schemas.bulk import BulkCreateResponse, BulkUpsertResponse, ImportReport
+from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse, StudentFilter, StudentLookup
+from app.services.student_service import AsyncStudentService, StudentService
+from app.utils.etag import etag_matches, not_modified, row_etag, set_etag, table_etag
+from app.utils.export import stream_export
+from app.utils.pagination import PageParams, filter_params, page_params, set_next_cursor
+from app.utils.routing import LazyRouter
+from app.utils.serialization import FileFormat, RowSerializer
 
-router = APIRouter()
+router = LazyRouter()
+
+# GET / serializes rows straight to JSON bytes; see RowSerializer.
+list_serializer = RowSerializer(StudentResponse)
+list_filters = filter_params(StudentFilter)
 
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
@@ -24,20 +36,80 @@ def create_student(
         )
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+def create_students_bulk(
+    students: List[StudentCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = StudentService(db)
+    return BulkCreateResponse.from_results(service.create_students_bulk(students))
+
+
+@router.post("/upsert", response_model=BulkUpsertResponse)
+def upsert_students(
+    students: List[StudentCreate] = Body(..., max_length=settings.bulk_max_items),
+    db: Session = Depends(get_db)
+):
+    service = StudentService(db)
+    return service.upsert_students(students)
+
+
+@router.post("/lookup", response_model=List[Optional[StudentResponse]])
+def lookup_students(
+    lookup: StudentLookup,
+    db: Session = Depends(get_read_db)
+):
+    service = StudentService(db)
+    return list_serializer.lookup_response(service.lookup_student_rows(list_serializer.fields, lookup))
+
+
+@router.post("/import", response_model=ImportReport)
+def import_students(
+    file: UploadFile = File(...),
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db)
+):
+    service = StudentService(db)
+    return service.import_students(file.file, format or FileFormat.from_filename(file.filename))
+
+
 @router.get("/", response_model=List[StudentResponse])
 def get_students(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: Session = Depends(get_read_db)
 ):
     service = StudentService(db)
-    return service.get_students(skip=skip, limit=limit)
+    etag = table_etag("students", service.get_students_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = service.get_student_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export")
+def export_students(
+    format: FileFormat = FileFormat.ndjson,
+    filters: Dict[str, Any] = Depends(list_filters),
+):
+    return stream_export(
+        lambda db: StudentService(db).iter_student_rows(list_serializer.fields, filters),
+        list_serializer,
+        format,
+        "students",
+    )
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
 def get_student(
     student_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     service = StudentService(db)
     student = service.get_student(student_id)
@@ -46,6 +118,10 @@ def get_student(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
+    etag = row_etag(student)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return student
 
 
@@ -76,4 +152,103 @@ def delete_student(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
-        )
\ No newline at end of file
+        )
+
+
+# Same CRUD routes on an AsyncSession, mounted instead of the ones above when
+# settings.async_database is on.
+async_router = LazyRouter()
+
+
+@async_router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
+async def create_student_async(
+    student: StudentCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStudentService(db)
+    
+    try:
+        return await service.create_student(student)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@async_router.post("/lookup", response_model=List[Optional[StudentResponse]])
+async def lookup_students_async(
+    lookup: StudentLookup,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStudentService(db)
+    return list_serializer.lookup_response(await service.lookup_student_rows(list_serializer.fields, lookup))
+
+
+@async_router.get("/", response_model=List[StudentResponse])
+async def get_students_async(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStudentService(db)
+    etag = table_etag("students", await service.get_students_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await service.get_student_rows(list_serializer.fields, page, filters)
+    response = list_serializer.response(rows)
+    set_next_cursor(response, rows, page)
+    set_etag(response, etag)
+    return response
+
+
+@async_router.get("/{student_id}", response_model=StudentResponse)
+async def get_student_async(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    service = AsyncStudentService(db)
+    student = await service.get_student(student_id)
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    etag = row_etag(student)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return student
+
+
+@async_router.put("/{student_id}", response_model=StudentResponse)
+async def update_student_async(
+    student_id: int,
+    student_update: StudentUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStudentService(db)
+    student = await service.update_student(student_id, student_update)
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    return student
+
+
+@async_router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_student_async(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncStudentService(db)
+    success = await service.delete_student(student_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -13,11 +13,113 @@ class Settings(BaseSettings):
     
     # For simplicity, using SQLite. Change to PostgreSQL for production
     database_url: str = "sqlite:///./access_api.db"
+
+    # Serve the CRUD routes from an AsyncEngine instead of the threadpool.
+    # The async URL defaults to database_url with an async driver (aiosqlite).
+    async_database: bool = False
+    async_database_url: Optional[str] = None
+
+    # Domains (students, faculty, it-staff, staff, patients) that get a
+    # database of their own, so their writes don't wait on the other domains'
+    # write lock. Domains not listed stay in database_url. From the
+    # environment: DATABASE_URLS='{"patients": "sqlite:///./patients.db"}'
+    database_urls: Dict[str, str] = {}
+
+    # GET routes read through a pool of their own. A SQLite file is opened a
+    # second time with mode=ro; a server database reads from its replica
+    # (read_database_url, or read_database_urls per domain like database_urls)
+    # or, without one, from the primary through the separate pool. Clients
+    # that send back a write's X-Write-Token read from the primary until the
+    # replica has caught up with it.
+    read_sessions: bool = True
+    read_database_url: Optional[str] = None
+    read_database_urls: Dict[str, str] = {}
+    read_pool_size: int = 10
+    read_max_overflow: int = 20
+
+    # Create or upgrade the schema on startup when the database's stored schema
+    # version is behind the app's. With it off, run `python -m app.db.migrate`
+    # before starting the app; startup fails if the schema is out of date.
+    auto_migrate: bool = True
+
+    # SQLite connection PRAGMAs, applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size: int = -65536  # negative = KiB, i.e. 64 MiB per connection
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout: int = 5000  # ms
+
+    # Group commit: single-row creates, updates and deletes from concurrent
+    # requests are handed to one writer thread and committed together, so one
+    # fsync covers many writes. A batch closes after max_batch writes, or
+    # window seconds after its first one. Sync (threadpool) routes only.
+    group_commit: bool = False
+    group_commit_max_batch: int = 128
+    group_commit_window: float = 0.002  # seconds
+
+    # Retries for writes that still fail with "database is locked"
+    sqlite_lock_retries: int = 3
+    sqlite_lock_retry_delay: float = 0.05  # seconds, doubled on every attempt
+    sqlite_lock_retry_max_delay: float = 0.5
+
+    # Pagination
+    default_page_size: int = 100
+    max_page_size: int = 500
+
+    # Bulk writes
+    bulk_batch_size: int = 500
+    bulk_max_items: int = 10000
+
+    # Keys accepted by the POST /{domain}/lookup routes; they are fetched
+    # bulk_batch_size at a time, one IN (...) query per batch
+    lookup_max_items: int = 1000
+
+    # Rows fetched per round trip by the streaming export endpoints
+    export_batch_size: int = 1000
+
+    # File imports: rows validated and committed per transaction, and the
+    # maximum number of row errors echoed back in the report
+    import_batch_size: int = 1000
+    import_max_errors: int = 1000
+
+    # In-process LRU cache in front of the GET /{id} lookups. Each worker has
+    # its own; the TTL bounds how stale a row can be after a write elsewhere.
+    entity_cache_enabled: bool = True
+    entity_cache_size: int = 10000  # entries per domain
+    entity_cache_ttl: float = 10.0  # seconds
+
+    # Change feed (/api/v1/changes): entries older than this are pruned on
+    # startup and then every prune interval, and cursors pointing before the
+    # oldest entry get 410 Gone
+    change_log_retention_days: int = 30
+    change_log_prune_interval: float = 3600.0  # seconds
+    change_feed_max_limit: int = 1000
+
+    # Change event stream (/api/v1/changes/stream). One poller per worker reads
+    # the change log and fans new entries out to every connected client.
+    change_stream_poll_interval: float = 0.5  # seconds; local commits wake it early
+    change_stream_heartbeat: float = 15.0  # seconds between keep-alive comments
+    change_stream_queue_size: int = 1000  # batches a client may lag before it is dropped
+
+    # In-memory access index behind /api/v1/access, rebuilt at startup and then
+    # kept current from the change log. Writes made through other workers are
+    # picked up within the refresh interval; this worker's own immediately.
+    access_index_refresh_interval: float = 0.5  # seconds
+    access_check_max_items: int = 1000
     
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Per-request SQL instrumentation (Server-Timing / X-DB-Queries headers)
+    sql_instrumentation: bool = True
+    query_budget: int = 10  # log a warning when a request runs more statements
+
+    # Prometheus /metrics endpoint. For multiple workers also set the
+    # PROMETHEUS_MULTIPROC_DIR environment variable to a shared, empty directory.
+    metrics_enabled: bool = True
+
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:8080", "http://localhost:8000"]
 
     class Config:
@@ -0,0 +1,132 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+
+
+class QueryStats:
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def add(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.duration += other.duration
+
+
+# Set by the middleware for the lifetime of a request. Starlette copies the
+# context into threadpool workers, so sync endpoints record into the same object.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_query_stats() -> Iterator[QueryStats]:
+    """
+    Record the statements run inside the block into a fresh QueryStats, for
+    work done on another thread on a request's behalf; the request adds it
+    to its own when the work is handed back.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _record_query(context) -> None:
+    # Popped so a statement is counted once even if it fails after it ran,
+    # e.g. while its rows are fetched.
+    started = context.__dict__.pop("_query_started", None) if context is not None else None
+    stats = _current_stats.get()
+    if started is not None and stats is not None:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """
+    Count and time every statement `engine` runs against the current request.
+
+    The start time lives on the statement's execution context, which is
+    discarded with it, so nothing is left behind when a statement fails;
+    failed statements are counted through handle_error.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _record_query(context)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        _record_query(exception_context.execution_context)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Report per-request database usage as `Server-Timing` and `X-DB-Queries`
+    headers, and warn when a route runs more statements than `query_budget`.
+    """
+
+    def __init__(self, app: ASGIApp, query_budget: Optional[int] = None):
+        self.app = app
+        self.query_budget = settings.query_budget if query_budget is None else query_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(DB_QUERIES_HEADER, str(stats.count))
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                    f"app;dur={total:.2f}"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if stats.count > self.query_budget:
+                route = scope.get("route")
+                logger.warning(
+                    "%s %s ran %d SQL statements (budget %d, %.1f ms in database)",
+                    scope["method"],
+                    getattr(route, "path", scope["path"]),
+                    stats.count,
+                    self.query_budget,
+                    stats.duration * 1000,
+                )
@@ -0,0 +1,199 @@
+import os
+import time
+
+import anyio.to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.instrumentation import current_query_stats
+
+# prometheus_client picks its storage backend from this variable at import
+# time; when it is set, every worker writes to shared mmap files.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response has been sent.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_LATENCY = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent executing SQL statements.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Worker threads currently running sync endpoints and dependencies.",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_SIZE = Gauge(
+    "threadpool_max_threads",
+    "Size of the threadpool used for sync endpoints.",
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the SQLAlchemy pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the SQLAlchemy pool.",
+    multiprocess_mode="livesum",
+)
+ENTITY_CACHE_REQUESTS = Counter(
+    "entity_cache_requests_total",
+    "Entity cache lookups by domain and result (hit or miss).",
+    ["domain", "result"],
+)
+ENTITY_CACHE_EVICTIONS = Counter(
+    "entity_cache_evictions_total",
+    "Entries dropped from the entity cache because it was full or they expired.",
+    ["domain", "reason"],
+)
+ENTITY_CACHE_SIZE = Gauge(
+    "entity_cache_entries",
+    "Entries currently held in the entity cache.",
+    ["domain"],
+    multiprocess_mode="livesum",
+)
+CHANGE_STREAM_SUBSCRIBERS = Gauge(
+    "change_stream_subscribers",
+    "Clients currently connected to the change event stream.",
+    multiprocess_mode="livesum",
+)
+CHANGE_STREAM_DROPPED = Counter(
+    "change_stream_dropped_total",
+    "Change stream clients disconnected for falling too far behind.",
+)
+GROUP_COMMIT_BATCH_SIZE = Histogram(
+    "group_commit_batch_size",
+    "Writes applied per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+READ_PRIMARY_FALLBACKS = Counter(
+    "read_primary_fallbacks_total",
+    "Reads sent to the primary because the read database was behind the client's write token.",
+)
+ACCESS_INDEX_ENTRIES = Gauge(
+    "access_index_entries",
+    "People held in this worker's in-memory access index.",
+    multiprocess_mode="max",
+)
+
+
+def instrument_pool(engine: Engine) -> None:
+    """Time pool checkouts and track connections in use for `engine`."""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_IN_USE.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        POOL_IN_USE.dec()
+
+
+def _sample_threadpool() -> None:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+
+class MetricsMiddleware:
+    """Record request count, latency, status and DB time per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_PROGRESS.labels(method).inc()
+        _sample_threadpool()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            IN_PROGRESS.labels(method).dec()
+            _sample_threadpool()
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            stats = current_query_stats()
+            if stats is not None:
+                REQUEST_DB_LATENCY.labels(method, route).observe(stats.duration)
+                REQUEST_DB_QUERIES.labels(method, route).observe(stats.count)
+
+
+def metrics_response(request: Request) -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared multiprocess files."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,20 +1,339 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Header, HTTPException, status
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import install_query_hooks
+from app.core.metrics import READ_PRIMARY_FALLBACKS, instrument_pool
+from app.db.changes import CHANGE_SOURCES, change_log_head, install_change_log
+from app.db.search import install_people_search
+from app.db.sqlite import configure_sqlite
+from app.db.versions import install_table_versions
+from app.db.write_tokens import (
+    WRITE_TOKEN_HEADER, install_write_tracking, parse_write_token, require_position
+)
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def _instrument(engine: Engine) -> None:
+    configure_sqlite(engine)
+    if settings.sql_instrumentation:
+        install_query_hooks(engine)
+    if settings.metrics_enabled:
+        instrument_pool(engine)
+
+
+def _create_engine(url: str, **kwargs: Any) -> Engine:
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {},
+        **kwargs
+    )
+    _instrument(engine)
+    return engine
+
+
+def _route_tables(default: Any, url_for: Callable[[str], str], create: Callable[[str], Any]) -> Dict[str, Any]:
+    """Engine for every domain table: `default`, or one per URL in DATABASE_URLS."""
+    unknown = set(settings.database_urls) - {domain for domain, _ in CHANGE_SOURCES}
+    if unknown:
+        raise ValueError(f"DATABASE_URLS names unknown domains: {', '.join(sorted(unknown))}")
+    by_url: Dict[str, Any] = {}
+    routes = {}
+    for domain, table in CHANGE_SOURCES:
+        url = settings.database_urls.get(domain)
+        if url is None:
+            routes[table] = default
+            continue
+        if url not in by_url:
+            by_url[url] = create(url_for(url))
+        routes[table] = by_url[url]
+    return routes
+
+
+def _read_url(url: str, replica: Optional[str]) -> Optional[str]:
+    """
+    Where reads of the database at `url` go: its replica if there is one, the
+    same SQLite file opened read-only, or the primary itself. None for an
+    in-memory SQLite database, which only the primary's connections can see.
+    """
+    if replica:
+        return replica
+    if not url.startswith("sqlite"):
+        return url
+    path = make_url(url).database
+    if not path or path == ":memory:" or path.startswith("file:"):
+        return None
+    return f"{url.split(':', 1)[0]}:///file:{path}?mode=ro&uri=true"
+
+
+def _route_reads(
+    default: Any, tables: Dict[str, Any], url_for: Callable[[str], str], create: Callable[[str], Any]
+) -> Tuple[Any, Dict[str, Any]]:
+    """The read engine for `default` and for every domain table routed in `tables`."""
+    unknown = set(settings.read_database_urls) - set(settings.database_urls)
+    if unknown:
+        raise ValueError(
+            f"READ_DATABASE_URLS names domains without a database of their own: {', '.join(sorted(unknown))}"
+        )
+    readers: Dict[Any, Any] = {}
 
-engine = create_engine(
-    settings.database_url, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    def reader(primary: Any, replica: Optional[str]) -> Any:
+        if primary not in readers:
+            url = _read_url(primary.url.render_as_string(hide_password=False), replica)
+            readers[primary] = primary if url is None else create(url_for(url) if url == replica else url)
+        return readers[primary]
+
+    read_default = reader(default, settings.read_database_url)
+    routes = {
+        table: reader(
+            tables[table],
+            settings.read_database_urls.get(domain) if domain in settings.database_urls
+            else settings.read_database_url,
+        )
+        for domain, table in CHANGE_SOURCES
+    }
+    return read_default, routes
+
+
+class RoutingSession(Session):
+    """
+    A Session that sends statements on each domain table to that domain's
+    database and everything else to its default bind.
+
+    ORM statements are routed by their mapper, so services and endpoints
+    work the same whether the domains share a database or not. Raw SQL names
+    its database with bind_arguments={"bind": db.engine_for(table)}. A
+    session that touches several databases commits each one in turn; there
+    is no transaction spanning them.
+    """
+
+    def __init__(self, *args: Any, table_engines: Optional[Dict[str, Engine]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.table_engines = table_engines or {}
+
+    def engine_for(self, table: str) -> Engine:
+        return self.table_engines.get(table, self.bind)
+
+    @property
+    def shards(self) -> List[Engine]:
+        """The databases holding domain tables, in a fixed order (the change feed cursor's)."""
+        return list(dict.fromkeys(self.engine_for(table) for _, table in CHANGE_SOURCES))
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kw):
+        if bind is None and mapper is not None and self.table_engines:
+            routed = self.table_engines.get(inspect(mapper).local_table.name)
+            if routed is not None:
+                return routed
+        return super().get_bind(mapper, clause=clause, bind=bind, **kw)
+
+
+engine = _create_engine(settings.database_url)
+table_engines: Dict[str, Engine] = _route_tables(engine, lambda url: url, _create_engine)
+shards: List[Engine] = list(dict.fromkeys(table_engines[table] for _, table in CHANGE_SOURCES))
+install_write_tracking(shards)
+
+# Services return rows straight from INSERT/UPDATE ... RETURNING; keeping them
+# loaded after commit saves a refresh SELECT per write.
+SessionLocal = sessionmaker(
+    class_=RoutingSession, table_engines=table_engines,
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions for the GET routes. They only ever read, so they get their own
+# pool and, where there is one, a read-only database (see _read_url).
+ReadSessionLocal = SessionLocal
+if settings.read_sessions:
+    read_engine, read_table_engines = _route_reads(
+        engine, table_engines, lambda url: url,
+        lambda url: _create_engine(
+            url, pool_size=settings.read_pool_size, max_overflow=settings.read_max_overflow
+        ),
+    )
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession, table_engines=read_table_engines,
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine
+    )
+else:
+    read_table_engines = table_engines
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if settings.async_database:
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    def _create_async_engine(url: str, **kwargs: Any) -> AsyncEngine:
+        created = create_async_engine(url, **kwargs)
+        _instrument(created.sync_engine)
+        return created
+
+    async_engine = _create_async_engine(
+        settings.async_database_url or _async_url(settings.database_url)
+    )
+    async_table_engines = _route_tables(async_engine, _async_url, _create_async_engine)
+    install_write_tracking(
+        list(dict.fromkeys(async_table_engines[table].sync_engine for _, table in CHANGE_SOURCES))
+    )
+
+    # Objects are serialized after the session work is done, outside the
+    # greenlet, so they must not expire on commit.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, sync_session_class=RoutingSession,
+        table_engines={table: e.sync_engine for table, e in async_table_engines.items()},
+        autoflush=False, expire_on_commit=False
+    )
+
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.read_sessions:
+        async_read_engine, async_read_table_engines = _route_reads(
+            async_engine, async_table_engines, _async_url,
+            # aiosqlite defaults to no pool at all
+            lambda url: _create_async_engine(
+                url, poolclass=AsyncAdaptedQueuePool,
+                pool_size=settings.read_pool_size, max_overflow=settings.read_max_overflow
+            ),
+        )
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, sync_session_class=RoutingSession,
+            table_engines={table: e.sync_engine for table, e in async_read_table_engines.items()},
+            autoflush=False, expire_on_commit=False
+        )
 
 Base = declarative_base()
 
+
+def utcnow() -> datetime:
+    """
+    Write timestamp for created_at and updated_at. Unlike CURRENT_TIMESTAMP on
+    SQLite it keeps microseconds, so two writes in the same second still get
+    distinct values (row ETags are built from it, and SQLite hands a deleted
+    row's id to the next insert).
+    """
+    return datetime.now(timezone.utc)
+
+
+def shard_tables(shard: Engine) -> List[str]:
+    """The domain tables stored in `shard`."""
+    return [table for table, routed in table_engines.items() if routed is shard]
+
+
+def init_db() -> None:
+    """
+    Create missing tables, plus any indexes added to tables that already
+    exist, and drop the `ix_` indexes a model no longer declares. Each
+    database gets its own domain tables and its own copy of everything else
+    (the change log, search index and table versions).
+    """
+    for shard in shards:
+        with shard.begin() as conn:
+            init_shard(conn)
+
+
+def init_shard(conn: Connection) -> None:
+    """init_db for the database `conn` is connected to, in the caller's transaction."""
+    domain_tables = shard_tables(conn.engine)
+    tables = [
+        table for table in Base.metadata.sorted_tables
+        if table.name in domain_tables or table.name not in table_engines
+    ]
+    Base.metadata.create_all(bind=conn, tables=tables)
+    for table in tables:
+        declared = {index.name for index in table.indexes}
+        for index in inspect(conn).get_indexes(table.name):
+            if index["name"].startswith("ix_") and index["name"] not in declared:
+                conn.exec_driver_sql(
+                    f"DROP INDEX {conn.dialect.identifier_preparer.quote(index['name'])}"
+                )
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    install_people_search(conn, domain_tables)
+    install_table_versions(conn, domain_tables)
+    install_change_log(conn, domain_tables)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _write_position(write_token: Optional[str]) -> Optional[Tuple[int, ...]]:
+    if write_token is None:
+        return None
+    try:
+        return parse_write_token(write_token)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {WRITE_TOKEN_HEADER}"
+        )
+
+
+def _caught_up(db: RoutingSession, position: Tuple[int, ...]) -> bool:
+    """Whether every read database in `db` has the writes up to `position`."""
+    shards = db.shards
+    if len(position) != len(shards):
+        # A token from before the databases were split up or merged
+        return False
+    return all(
+        seq == 0 or (shard.dialect.name == "sqlite" and change_log_head(db, shard) >= seq)
+        for shard, seq in zip(shards, position)
+    )
+
+
+def get_read_db(write_token: Optional[str] = Header(None, alias=WRITE_TOKEN_HEADER)):
+    """
+    A read session. With the X-Write-Token of a recent write, a read database
+    that has not caught up with that write is passed over for the primary.
+    """
+    position = _write_position(write_token)
+    db = ReadSessionLocal()
+    try:
+        if position is not None and ReadSessionLocal is not SessionLocal and not _caught_up(db, position):
+            READ_PRIMARY_FALLBACKS.inc()
+            db.close()
+            db = SessionLocal()
+        if position is not None:
+            require_position(db, position)
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(write_token: Optional[str] = Header(None, alias=WRITE_TOKEN_HEADER)):
+    position = _write_position(write_token)
+    async with AsyncReadSessionLocal() as db:
+        if position is None:
+            yield db
+            return
+        if AsyncReadSessionLocal is AsyncSessionLocal or await db.run_sync(
+            lambda session: _caught_up(session, position)
+        ):
+            require_position(db.sync_session, position)
+            yield db
+            return
+    READ_PRIMARY_FALLBACKS.inc()
+    async with AsyncSessionLocal() as db:
+        require_position(db.sync_session, position)
+        yield db
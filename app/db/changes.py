@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from typing import Collection
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+CHANGE_LOG = "change_log"
+
+# (domain as exposed by the API, table)
+CHANGE_SOURCES = (
+    ("students", "students"),
+    ("faculty", "faculty"),
+    ("it-staff", "it_staff"),
+    ("staff", "staff"),
+    ("patients", "patients"),
+)
+
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def has_change_log(engine: Engine) -> bool:
+    """Whether `engine`'s database keeps a change log. Only SQLite does for now."""
+    return engine.dialect.name == "sqlite"
+
+
+def install_change_log(conn: Connection, tables: Collection[str]) -> None:
+    """
+    Record every insert, update and delete on the domain tables in `tables`
+    in change_log.
+
+    Triggers write the entry in the same transaction as the change, so bulk,
+    upsert and import writes are logged too and an entry is visible exactly
+    when its change is. SQLite runs one writer at a time, so sequence numbers
+    also become visible in order and a reader can never skip past one.
+    """
+    if not has_change_log(conn.engine):
+        return
+
+    for domain, table in CHANGE_SOURCES:
+        if table not in tables:
+            continue
+        for operation, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_change_{operation.lower()} "
+                f"AFTER {operation} ON {table} BEGIN "
+                f"INSERT INTO {CHANGE_LOG} (domain, entity_id, op, changed_at) "
+                f"VALUES ('{domain}', {row}.id, '{operation.lower()}', {_NOW}); "
+                "END"
+            )
+
+
+def change_log_head(db: Session, bind: Engine) -> int:
+    """Sequence number of the newest change ever logged in `bind`'s database (0 if none)."""
+    # sqlite_sequence survives pruning, unlike max(seq).
+    head = db.scalar(
+        text(f"SELECT seq FROM sqlite_sequence WHERE name = '{CHANGE_LOG}'"),
+        bind_arguments={"bind": bind},
+    )
+    return head or 0
+
+
+def log_inserts(conn: Connection, table: str, after_id: int = 0) -> None:
+    """
+    Log an insert for every row in `table` with an id above `after_id`, in id
+    order. For rows written while the triggers were not installed.
+    """
+    for domain, source_table in CHANGE_SOURCES:
+        if source_table == table:
+            conn.exec_driver_sql(
+                f"INSERT INTO {CHANGE_LOG} (domain, entity_id, op, changed_at) "
+                f"SELECT '{domain}', id, 'insert', {_NOW} FROM {table} WHERE id > ? ORDER BY id",
+                (after_id,),
+            )
+
+
+def prune_change_log(engine: Engine, retention_days: int) -> int:
+    """
+    Delete entries older than `retention_days`; returns how many were removed.
+
+    Entries are appended in changed_at order, so the oldest one to keep is
+    found by walking seq from the start, and everything before it goes in a
+    seq range delete: the cost follows how much is pruned, not the size of
+    the log.
+    """
+    if not has_change_log(engine):
+        return 0
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+    with engine.begin() as conn:
+        return conn.execute(
+            text(
+                f"DELETE FROM {CHANGE_LOG} WHERE seq < coalesce("
+                f"(SELECT seq FROM {CHANGE_LOG} WHERE changed_at >= :cutoff ORDER BY seq LIMIT 1), "
+                f"(SELECT max(seq) + 1 FROM {CHANGE_LOG}))"
+            ),
+            {"cutoff": cutoff},
+        ).rowcount
@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import collect_query_stats, current_query_stats
+from app.core.metrics import GROUP_COMMIT_BATCH_SIZE
+from app.db.base import SessionLocal, shards, table_engines
+from app.db.write_tokens import record_writes, track_writes
+
+logger = logging.getLogger("uvicorn.error")
+
+T = TypeVar("T")
+
+Write = Callable[[Session], T]
+
+
+class GroupCommitWriter:
+    """
+    Apply single-row writes from concurrent requests in shared transactions.
+
+    Callers hand over a function that runs their statements. A single thread
+    takes the first queued write, waits up to `window` seconds for more (at
+    most `max_batch`), and runs each one under its own SAVEPOINT in a single
+    transaction. One commit (and one fsync) then covers the whole batch.
+    Each caller gets back its own result, or its own exception: a failing
+    write only rolls back its savepoint. If the commit itself fails, every
+    write in the batch gets that error.
+
+    Results are ORM objects detached from the writer's session once it has
+    committed, with their attributes loaded.
+
+    The statements run on the writer's thread, outside any request, so each
+    write's own statements (and the batch's BEGIN and commit-time reads,
+    which every caller waited for) are collected there and added to the
+    caller's query stats when it gets its result.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_batch: int, window: float):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: "queue.SimpleQueue[Tuple[Write, Future]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def run(self, write: Write[T]) -> T:
+        """Queue `write` and block until the transaction it lands in has committed."""
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((write, future))
+        result, error, written, stats = future.result()
+        caller_stats = current_query_stats()
+        if caller_stats is not None:
+            caller_stats.add(stats)
+        if error is not None:
+            raise error
+        record_writes(written)
+        return result
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="group-commit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    # Writes that queued up during the last commit are taken
+                    # straight away; only an empty queue waits out the window.
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception as e:  # never let the writer thread die
+                logger.exception("Group commit batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _apply(self, batch: List[Tuple[Write, Future]]) -> None:
+        GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+        outcomes = []
+        with collect_query_stats() as shared, self.session_factory() as db, track_writes() as written:
+            # Begin now, so the BEGIN is the batch's rather than the first write's
+            db.connection()
+            for write, future in batch:
+                with collect_query_stats() as stats:
+                    try:
+                        with db.begin_nested():
+                            outcomes.append((future, write(db), None, stats))
+                    except Exception as e:
+                        outcomes.append((future, None, e, stats))
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                for future, _, _, _ in outcomes:
+                    future.set_exception(e)
+                return
+
+        # Every write in the batch gets the batch's X-Write-Token position
+        for future, result, error, stats in outcomes:
+            stats.add(shared)
+            future.set_result((result, error, written, stats))
+
+
+def _make_writers() -> Dict[Engine, GroupCommitWriter]:
+    if not settings.group_commit:
+        return {}
+    if settings.async_database:
+        # Async services run inside the event loop; blocking on the writer
+        # there would stall every other request.
+        logger.warning("GROUP_COMMIT is ignored when ASYNC_DATABASE is on")
+        return {}
+    # One per database, so each has its own transactions and domains in
+    # separate databases keep committing independently.
+    return {
+        shard: GroupCommitWriter(
+            SessionLocal, settings.group_commit_max_batch, settings.group_commit_window
+        )
+        for shard in shards
+    }
+
+
+group_writers = _make_writers()
+
+
+def commit_write(db: Session, model: Any, write: Write[T]) -> T:
+    """
+    Run `write`, which writes to `model`'s table, and commit it.
+
+    With group commit on, `write` runs on the session of the writer for that
+    table's database rather than on `db`, in one transaction with other
+    requests' writes, and this returns once that transaction has committed.
+    Either way an exception from `write` leaves nothing behind.
+    """
+    writer = group_writers.get(table_engines[model.__tablename__])
+    if writer is not None:
+        return writer.run(write)
+    try:
+        result = write(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
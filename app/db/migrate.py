@@ -0,0 +1,121 @@
+"""
+Create or upgrade the database schema.
+
+    python -m app.db.migrate
+
+Every DDL statement in init_db is idempotent, so migrating means running it
+and then stamping each database with SCHEMA_VERSION (SQLite's user_version).
+On startup the app only compares those stamps with SCHEMA_VERSION, which
+costs one PRAGMA read per database instead of reflecting every table, index
+and trigger.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+import app.models  # noqa: F401  (registers every table with Base)
+from app.core.config import settings
+from app.db.base import init_db, init_shard, shards
+from app.db.sqlite import BEGIN_IMMEDIATE, is_locked_error
+
+logger = logging.getLogger("uvicorn.error")
+
+# Bump whenever a model, index, trigger or the search index changes, so
+# existing databases pick the change up.
+SCHEMA_VERSION = 2
+
+
+def _user_version(conn: Connection) -> Optional[int]:
+    if conn.dialect.name != "sqlite":
+        return None
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def stored_schema_version(engine: Engine) -> Optional[int]:
+    """The version the database was last migrated to (0 if never), or None when it can't store one."""
+    with engine.connect() as conn:
+        return _user_version(conn)
+
+
+def oldest_schema_version() -> Optional[int]:
+    """The lowest stored version across the app's databases, or None if any can't store one."""
+    versions = [stored_schema_version(shard) for shard in shards]
+    return None if None in versions else min(versions)
+
+
+def migrate() -> bool:
+    """
+    Bring the schema up to date and record SCHEMA_VERSION in every database.
+    Returns whether any database needed it.
+
+    Each database is migrated in one transaction that takes the write lock
+    first and then checks the stored version, so workers starting together
+    queue up and the ones behind the first find the work already done.
+    """
+    migrated = False
+    for shard in shards:
+        with _write_locked(shard) as conn:
+            stored = _user_version(conn)
+            if stored is not None and stored >= SCHEMA_VERSION:
+                continue
+            init_shard(conn)
+            if stored is not None:
+                conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            migrated = True
+    return migrated
+
+
+@contextmanager
+def _write_locked(shard: Engine) -> Iterator[Connection]:
+    """
+    A connection to `shard` in a transaction that holds the write lock. Waits
+    out busy_timeout as often as it takes, since the holder may be another
+    worker backfilling a large database.
+    """
+    while True:
+        conn = shard.connect().execution_options(**{BEGIN_IMMEDIATE: True})
+        try:
+            conn.begin()
+        except OperationalError as e:
+            conn.close()
+            if not is_locked_error(e):
+                raise
+            logger.info("Waiting for another migration of %s", shard.url)
+            continue
+        with conn:
+            yield conn
+            conn.commit()
+        return
+
+
+def ensure_schema() -> None:
+    """
+    Startup check. Does nothing when the schema is current; migrates when it
+    is behind and AUTO_MIGRATE is on, and raises otherwise. A database already
+    migrated by a newer release is left alone, so old workers keep running
+    during a rolling deploy.
+    """
+    stored = oldest_schema_version()
+    if stored is None:
+        # No version stamp to compare against; the DDL is idempotent
+        init_db()
+        return
+    if stored >= SCHEMA_VERSION:
+        return
+    if not settings.auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at version {stored}, this release needs {SCHEMA_VERSION}; "
+            "run `python -m app.db.migrate`"
+        )
+    if migrate():
+        logger.info("Migrated database schema from version %d to %d", stored, SCHEMA_VERSION)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    before = oldest_schema_version()
+    migrate()
+    logger.info("Database schema at version %d (was %s)", SCHEMA_VERSION, before)
@@ -0,0 +1,112 @@
+from typing import Collection, List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+
+PEOPLE_FTS = "people_fts"
+
+# (domain as exposed by the API, table, natural id column, rowid tag). Each
+# person is stored at rowid = id * ROWID_STRIDE + tag, so the triggers can
+# address their own row without a lookup and ids never collide across tables.
+SEARCH_SOURCES = (
+    ("students", "students", "student_id", 1),
+    ("faculty", "faculty", "faculty_id", 2),
+    ("it-staff", "it_staff", "staff_id", 3),
+    ("staff", "staff", "staff_id", 4),
+    ("patients", "patients", "patient_id", 5),
+)
+ROWID_STRIDE = 8
+
+# Column weights for bm25(), in people_fts column order: an ID hit outranks a
+# name hit, which outranks an email hit.
+RANK_WEIGHTS = (10.0, 5.0, 5.0, 2.0)
+
+# FTS5's defaults, restored after a bulk insert
+FTS_AUTOMERGE = 4
+FTS_CRISISMERGE = 16
+
+
+def _create_table_sql() -> str:
+    # Prefix indexes up to 6 characters keep partial names, emails and IDs
+    # ("smi*", "user42*") from merging the doclists of every matching term.
+    return (
+        f"CREATE VIRTUAL TABLE {PEOPLE_FTS} USING fts5("
+        "person_id, first_name, last_name, email, "
+        "domain UNINDEXED, entity_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6')"
+    )
+
+
+def _values(domain: str, id_column: str, tag: int, alias: str) -> str:
+    return (
+        f"{alias}.id * {ROWID_STRIDE} + {tag}, {alias}.{id_column}, {alias}.first_name, "
+        f"{alias}.last_name, {alias}.email, '{domain}', {alias}.id"
+    )
+
+
+def _trigger_sql(domain: str, table: str, id_column: str, tag: int) -> List[str]:
+    columns = "rowid, person_id, first_name, last_name, email, domain, entity_id"
+    delete_old = f"DELETE FROM {PEOPLE_FTS} WHERE rowid = old.id * {ROWID_STRIDE} + {tag};"
+    insert_new = f"INSERT INTO {PEOPLE_FTS}({columns}) VALUES ({_values(domain, id_column, tag, 'new')});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_people_ai AFTER INSERT ON {table} "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_people_ad AFTER DELETE ON {table} "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_people_au "
+        f"AFTER UPDATE OF id, {id_column}, first_name, last_name, email ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def install_people_search(conn: Connection, tables: Collection[str]) -> None:
+    """
+    Create the FTS5 index over the people in `tables` and the triggers that
+    keep it in sync.
+
+    Triggers fire for every write path (single, bulk, upsert, import) without
+    the services having to know about the index. When the index is created
+    for a database that already has people in it, it is backfilled once.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+
+    backfill = not inspect(conn).has_table(PEOPLE_FTS)
+    if backfill:
+        conn.exec_driver_sql(_create_table_sql())
+    for domain, table, id_column, tag in SEARCH_SOURCES:
+        if table not in tables:
+            continue
+        for statement in _trigger_sql(domain, table, id_column, tag):
+            conn.exec_driver_sql(statement)
+        if backfill:
+            index_people(conn, table)
+
+
+def index_people(conn: Connection, table: str, after_id: int = 0) -> None:
+    """
+    Add the people in `table` with an id above `after_id` to the index in one
+    statement. For rows written while the triggers were not installed.
+    """
+    for domain, source_table, id_column, tag in SEARCH_SOURCES:
+        if source_table == table:
+            # Merging segments as they fill up roughly doubles the cost of a
+            # large insert; leave them for later writes to merge instead.
+            _fts_config(conn, "automerge", 0)
+            _fts_config(conn, "crisismerge", 64)
+            conn.exec_driver_sql(
+                f"INSERT INTO {PEOPLE_FTS}"
+                "(rowid, person_id, first_name, last_name, email, domain, entity_id) "
+                f"SELECT {_values(domain, id_column, tag, table)} FROM {table} "
+                f"WHERE {table}.id > ?",
+                (after_id,),
+            )
+            _fts_config(conn, "automerge", FTS_AUTOMERGE)
+            _fts_config(conn, "crisismerge", FTS_CRISISMERGE)
+
+
+def _fts_config(conn: Connection, name: str, value: int) -> None:
+    conn.exec_driver_sql(
+        f"INSERT INTO {PEOPLE_FTS}({PEOPLE_FTS}, rank) VALUES (?, ?)", (name, value)
+    )
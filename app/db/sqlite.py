@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Connection execution option that makes the next BEGIN an IMMEDIATE one.
+BEGIN_IMMEDIATE = "sqlite_begin_immediate"
+
+PRAGMAS = ("journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store", "busy_timeout")
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """Install the connection hooks every SQLite engine in the app needs."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # pysqlite manages BEGIN on its own and silently breaks SAVEPOINT
+        # (used by the bulk endpoints); let SQLAlchemy emit BEGIN instead.
+        dbapi_connection.isolation_level = None
+
+        cursor = dbapi_connection.cursor()
+        # busy_timeout first so switching journal_mode waits out other writers.
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA temp_store = {settings.sqlite_temp_store}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        if conn.get_execution_options().get(BEGIN_IMMEDIATE):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+
+def begin_immediate(db: Session) -> None:
+    """
+    Start `db`'s transaction holding the write lock, waiting for it under
+    busy_timeout. A deferred transaction only asks for the lock at its first
+    write and can fail straight away with "database is locked" if another
+    writer got in first; long bulk writes would rather wait. Call it before
+    anything else runs on `db`: an open transaction is left as it is.
+    """
+    if not db.in_transaction():
+        db.connection(execution_options={BEGIN_IMMEDIATE: True})
+
+
+def effective_pragmas(engine: Engine) -> Dict[str, Any]:
+    """Read back the PRAGMA values SQLite actually applied on a pooled connection."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in PRAGMAS
+        }
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    return "database is locked" in str(error) or "database table is locked" in str(error)
+
+
+def _lock_retry_delays() -> Iterator[float]:
+    """Jittered exponential backoff bounded by the sqlite_lock_retry_* settings."""
+    delay = settings.sqlite_lock_retry_delay
+    for _ in range(settings.sqlite_lock_retries):
+        yield delay * random.uniform(0.5, 1.0)
+        delay = min(delay * 2, settings.sqlite_lock_retry_max_delay)
+
+
+def _on_event_loop() -> bool:
+    """True under AsyncSession.run_sync, where sleeping would stall every request."""
+    return asyncio._get_running_loop() is not None
+
+
+def run_with_lock_retry(db: Session, operation: Callable[[], T]) -> T:
+    """
+    Run `operation`, rerunning it when SQLite reports the database is locked.
+
+    busy_timeout already makes SQLite wait for the write lock, but a deferred
+    transaction that needs to upgrade from read to write fails immediately,
+    and a long bulk write can outlast the timeout. The session is rolled back
+    before each retry, with jittered exponential backoff bounded by the
+    sqlite_lock_retry_* settings, so `operation` must commit as its last step.
+
+    On the event loop thread (a sync service run through
+    AsyncSession.run_sync) the error is raised straight away instead: the
+    async service retries it with run_with_lock_retry_async, which backs off
+    without blocking the loop.
+    """
+    if _on_event_loop():
+        return operation()
+    for delay in _lock_retry_delays():
+        try:
+            return operation()
+        except OperationalError as e:
+            if not is_locked_error(e):
+                raise
+        db.rollback()
+        time.sleep(delay)
+    return operation()
+
+
+async def run_with_lock_retry_async(db: AsyncSession, operation: Callable[[], Awaitable[T]]) -> T:
+    """run_with_lock_retry for AsyncSession, backing off with asyncio.sleep."""
+    for delay in _lock_retry_delays():
+        try:
+            return await operation()
+        except OperationalError as e:
+            if not is_locked_error(e):
+                raise
+        await db.rollback()
+        await asyncio.sleep(delay)
+    return await operation()
+
+
+def retry_on_locked(method: Callable) -> Callable:
+    """Service method decorator for run_with_lock_retry on `self.db`."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return run_with_lock_retry(self.db, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def async_retry_on_locked(method: Callable) -> Callable:
+    """Async service method decorator for run_with_lock_retry_async on `self.db`."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await run_with_lock_retry_async(self.db, lambda: method(self, *args, **kwargs))
+
+    return wrapper
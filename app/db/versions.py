@@ -0,0 +1,58 @@
+from typing import Collection, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+
+TABLE_VERSIONS = "table_versions"
+
+VERSIONED_TABLES = ("students", "faculty", "it_staff", "staff", "patients")
+
+
+def install_table_versions(conn: Connection, tables: Collection[str]) -> None:
+    """
+    Keep a write counter for each of `tables` in `table_versions`.
+
+    Triggers bump the counter on every insert, update and delete, whichever
+    path made it, so reading one primary-key row tells whether anything in a
+    table changed since a client last looked.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {TABLE_VERSIONS} "
+        "(name TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID"
+    )
+    for table in VERSIONED_TABLES:
+        if table not in tables:
+            continue
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO {TABLE_VERSIONS} (name, version) VALUES ('{table}', 0)"
+        )
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} "
+                f"AFTER {operation} ON {table} BEGIN "
+                f"UPDATE {TABLE_VERSIONS} SET version = version + 1 WHERE name = '{table}'; "
+                "END"
+            )
+
+
+def bump_table_version(conn: Connection, table: str) -> None:
+    """Count a write the triggers didn't see, e.g. a bulk load with them removed."""
+    conn.exec_driver_sql(
+        f"UPDATE {TABLE_VERSIONS} SET version = version + 1 WHERE name = ?", (table,)
+    )
+
+
+def table_version(db: Session, table: str) -> Optional[int]:
+    """Current write counter for `table`, or None when the database doesn't track one."""
+    bind = db.engine_for(table)
+    if bind.dialect.name != "sqlite":
+        return None
+    return db.scalar(
+        text(f"SELECT version FROM {TABLE_VERSIONS} WHERE name = :name"), {"name": table},
+        bind_arguments={"bind": bind},
+    )
@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.changes import CHANGE_LOG
+from app.utils.pagination import decode_cursor, encode_cursor
+
+WRITE_TOKEN_HEADER = "X-Write-Token"
+
+# Session.info key holding the position a read session must see
+_WRITE_POSITION = "write_position"
+
+
+class WrittenPositions:
+    """
+    The change log sequence number of the newest entry a request committed,
+    per database. Zero for a database it did not write to.
+    """
+
+    __slots__ = ("seqs",)
+
+    def __init__(self):
+        self.seqs: Optional[List[int]] = None  # None until something is written
+
+    def record(self, shard: int, shard_count: int, seq: int) -> None:
+        if self.seqs is None:
+            self.seqs = [0] * shard_count
+        self.seqs[shard] = max(self.seqs[shard], seq)
+
+    def merge(self, other: "WrittenPositions") -> None:
+        if other.seqs is not None:
+            for shard, seq in enumerate(other.seqs):
+                self.record(shard, len(other.seqs), seq)
+
+    def token(self) -> Optional[str]:
+        return None if self.seqs is None else encode_cursor(*self.seqs)
+
+
+# Set by the middleware for the lifetime of a request, like the query stats.
+_current_writes: ContextVar[Optional[WrittenPositions]] = ContextVar("written_positions", default=None)
+
+
+def parse_write_token(token: str) -> Tuple[int, ...]:
+    """Decode an X-Write-Token. Raises ValueError if malformed."""
+    seqs = decode_cursor(token)
+    if not all(isinstance(seq, int) and not isinstance(seq, bool) and seq >= 0 for seq in seqs):
+        raise ValueError("Invalid write token")
+    return tuple(seqs)
+
+
+def require_position(db: Session, position: Tuple[int, ...]) -> None:
+    """Mark `db` as serving a read that sent an X-Write-Token for `position`."""
+    db.info[_WRITE_POSITION] = position
+
+
+def reads_own_writes(db: Session) -> bool:
+    """
+    Whether `db` serves a read that must see the client's earlier writes, so
+    caches that may predate them are bypassed.
+    """
+    return _WRITE_POSITION in db.info
+
+
+@contextmanager
+def track_writes() -> Iterator[WrittenPositions]:
+    """Record commits made in this block into a fresh WrittenPositions."""
+    written = WrittenPositions()
+    token = _current_writes.set(written)
+    try:
+        yield written
+    finally:
+        _current_writes.reset(token)
+
+
+def record_writes(written: WrittenPositions) -> None:
+    """Credit commits made on another thread (the group-commit writer) to the current request."""
+    current = _current_writes.get()
+    if current is not None:
+        current.merge(written)
+
+
+def install_write_tracking(shards: List[Engine]) -> None:
+    """
+    Note the change log position every committed write leaves behind in each
+    of `shards`, for the current request's X-Write-Token. Only SQLite keeps
+    a change log.
+    """
+    for index, shard in enumerate(shards):
+        if shard.dialect.name == "sqlite":
+            _track(shard, index, len(shards))
+
+
+def _track(engine: Engine, index: int, shard_count: int) -> None:
+    def changes(conn) -> int:
+        # Rows inserted, updated or deleted on this connection so far,
+        # triggers included. An attribute of the driver, so no query.
+        return conn.connection.driver_connection.total_changes
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.info["changes_at_begin"] = changes(conn)
+
+    @event.listens_for(engine, "commit")
+    def _on_commit(conn):
+        # Runs just before COMMIT, so this is the transaction's own last entry
+        # (or a later one, which is just as good for the token). Only read
+        # when the transaction changed rows: an upsert that matched nothing
+        # or a write that failed wrote no change log entry to point at.
+        before = conn.info.pop("changes_at_begin", None)
+        written = _current_writes.get()
+        if written is not None and before is not None and changes(conn) != before:
+            seq = conn.exec_driver_sql(
+                f"SELECT seq FROM sqlite_sequence WHERE name = '{CHANGE_LOG}'"
+            ).scalar()
+            written.record(index, shard_count, seq or 0)
+
+    @event.listens_for(engine, "rollback")
+    def _on_rollback(conn):
+        conn.info.pop("changes_at_begin", None)
+
+
+class WriteTokenMiddleware:
+    """
+    Send an `X-Write-Token` with every response to a request that committed
+    a write. A client that sends it back on a later read is guaranteed to
+    see that write, whichever database the read would otherwise go to.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        written = WrittenPositions()
+        token = _current_writes.set(written)
+
+        async def send_with_token(message: Message) -> None:
+            if message["type"] == "http.response.start" and written.seqs is not None:
+                MutableHeaders(scope=message).append(WRITE_TOKEN_HEADER, written.token())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _current_writes.reset(token)
@@ -1,17 +1,79 @@
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.instrumentation import DB_QUERIES_HEADER, SQLInstrumentationMiddleware
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_response
 from app.api.v1 import api_router
-from app.db.base import engine, Base
+from app.db.base import engine, shards
+from app.db.changes import prune_change_log
+from app.db.migrate import ensure_schema
+from app.db.sqlite import effective_pragmas
+from app.db.write_tokens import WRITE_TOKEN_HEADER, WriteTokenMiddleware
+from app.services.access_index import access_index
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def prune_change_logs() -> None:
+    pruned = sum(
+        prune_change_log(shard, settings.change_log_retention_days) for shard in shards
+    )
+    if pruned:
+        logger.info(
+            "Pruned %d change log entries older than %d days",
+            pruned, settings.change_log_retention_days
+        )
+
+
+async def prune_change_logs_periodically() -> None:
+    """Keep pruning while the worker runs, so the log doesn't grow until the next restart."""
+    while True:
+        await asyncio.sleep(settings.change_log_prune_interval)
+        try:
+            await run_in_threadpool(prune_change_logs)
+        except Exception:
+            logger.exception("Change log pruning failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_schema()
+    pragmas = effective_pragmas(engine)
+    if pragmas:
+        logger.info(
+            "SQLite PRAGMAs: %s",
+            ", ".join(f"{name}={value}" for name, value in pragmas.items())
+        )
+    prune_change_logs()
+    # A fresh context keeps the pruning queries out of any request's
+    # instrumentation.
+    pruner = asyncio.get_running_loop().create_task(
+        prune_change_logs_periodically(), context=contextvars.Context()
+    )
+    await access_index.start()
+    yield
+    await access_index.stop()
+    pruner.cancel()
+    try:
+        await pruner
+    except asyncio.CancelledError:
+        pass
+    mark_process_dead()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description=settings.app_description,
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -21,10 +83,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, DB_QUERIES_HEADER, WRITE_TOKEN_HEADER, "Server-Timing", "ETag"],
 )
 
+# Metrics is added first so it runs inside the SQL instrumentation and can
+# read the request's query stats.
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_response, include_in_schema=False)
+
+if settings.sql_instrumentation:
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+app.add_middleware(WriteTokenMiddleware)
+
 # Include API router
-app.include_router(api_router, prefix="/api/v1")
+api_router.mount(app.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -3,5 +3,6 @@ from .faculty import Faculty
 from .it_staff import ITStaff
 from .staff import Staff
 from .patient import Patient
+from .change_log import ChangeLog
 
-__all__ = ["Student", "Faculty", "ITStaff", "Staff", "Patient"]
\ No newline at end of file
+__all__ = ["Student", "Faculty", "ITStaff", "Staff", "Patient", "ChangeLog"]
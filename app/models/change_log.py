@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.db.base import Base
+
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    # AUTOINCREMENT so a sequence number is never handed out twice, even
+    # after old entries are pruned.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    domain = Column(String, nullable=False)  # students, faculty, it-staff, staff, patients
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # insert, update, delete
+    changed_at = Column(DateTime(timezone=True), nullable=False)
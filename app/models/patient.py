@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, utcnow
 
 
 class Patient(Base):
     __tablename__ = "patients"
+    # Each filter column leads two indexes: alone, so filtered rows come back
+    # in id order, and followed by last_name for the last_name sort. Further
+    # filters are checked row by row, so no combination needs a sort step.
+    __table_args__ = (
+        Index("ix_patients_is_active", "is_active"),
+        Index("ix_patients_is_active_last_name", "is_active", "last_name"),
+        Index("ix_patients_last_name", "last_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(String, unique=True, index=True, nullable=False)
@@ -15,5 +23,5 @@ class Patient(Base):
     address = Column(String, nullable=True)
     date_of_birth = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
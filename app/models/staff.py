@@ -1,10 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, utcnow
 
 
 class Staff(Base):
     __tablename__ = "staff"
+    # Each filter column leads two indexes: alone, so filtered rows come back
+    # in id order, and followed by last_name for the last_name sort. Further
+    # filters are checked row by row, so no combination needs a sort step.
+    __table_args__ = (
+        Index("ix_staff_department", "department"),
+        Index("ix_staff_department_last_name", "department", "last_name"),
+        Index("ix_staff_role", "role"),
+        Index("ix_staff_role_last_name", "role", "last_name"),
+        Index("ix_staff_is_active", "is_active"),
+        Index("ix_staff_is_active_last_name", "is_active", "last_name"),
+        Index("ix_staff_last_name", "last_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     staff_id = Column(String, unique=True, index=True, nullable=False)
@@ -15,5 +27,5 @@ class Staff(Base):
     department = Column(String, nullable=True)
     role = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
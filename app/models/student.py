@@ -1,10 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, utcnow
 
 
 class Student(Base):
     __tablename__ = "students"
+    # Each filter column leads two indexes: alone, so filtered rows come back
+    # in id order, and followed by last_name for the last_name sort. Further
+    # filters are checked row by row, so no combination needs a sort step.
+    __table_args__ = (
+        Index("ix_students_major", "major"),
+        Index("ix_students_major_last_name", "major", "last_name"),
+        Index("ix_students_year", "year"),
+        Index("ix_students_year_last_name", "year", "last_name"),
+        Index("ix_students_is_active", "is_active"),
+        Index("ix_students_is_active_last_name", "is_active", "last_name"),
+        Index("ix_students_last_name", "last_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(String, unique=True, index=True, nullable=False)
@@ -16,5 +28,5 @@ class Student(Base):
     year = Column(Integer, nullable=True)  # 1=Freshman, 2=Sophomore, 3=Junior, 4=Senior
     gpa = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
\ No newline at end of file
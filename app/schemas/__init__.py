@@ -1,13 +1,24 @@
-from .student import StudentCreate, StudentUpdate, StudentResponse
-from .faculty import FacultyCreate, FacultyUpdate, FacultyResponse
-from .it_staff import ITStaffCreate, ITStaffUpdate, ITStaffResponse
-from .staff import StaffCreate, StaffUpdate, StaffResponse
-from .patient import PatientCreate, PatientUpdate, PatientResponse
+from .student import StudentCreate, StudentUpdate, StudentResponse, StudentFilter, StudentLookup
+from .faculty import FacultyCreate, FacultyUpdate, FacultyResponse, FacultyFilter, FacultyLookup
+from .it_staff import ITStaffCreate, ITStaffUpdate, ITStaffResponse, ITStaffFilter, ITStaffLookup
+from .staff import StaffCreate, StaffUpdate, StaffResponse, StaffFilter, StaffLookup
+from .patient import PatientCreate, PatientUpdate, PatientResponse, PatientFilter, PatientLookup
+from .people import PersonDomain, PersonSearchResult
+from .change import ChangeEntry, ChangeFeed, ChangeFeedHead
+from .access import AccessDecision
+from .bulk import (
+    BulkItemResult, BulkCreateResponse, BulkUpsertResponse, ImportRowError, ImportReport, BulkLookup,
+)
 
 __all__ = [
-    "StudentCreate", "StudentUpdate", "StudentResponse",
-    "FacultyCreate", "FacultyUpdate", "FacultyResponse",
-    "ITStaffCreate", "ITStaffUpdate", "ITStaffResponse",
-    "StaffCreate", "StaffUpdate", "StaffResponse",
-    "PatientCreate", "PatientUpdate", "PatientResponse",
+    "StudentCreate", "StudentUpdate", "StudentResponse", "StudentFilter", "StudentLookup",
+    "FacultyCreate", "FacultyUpdate", "FacultyResponse", "FacultyFilter", "FacultyLookup",
+    "ITStaffCreate", "ITStaffUpdate", "ITStaffResponse", "ITStaffFilter", "ITStaffLookup",
+    "StaffCreate", "StaffUpdate", "StaffResponse", "StaffFilter", "StaffLookup",
+    "PatientCreate", "PatientUpdate", "PatientResponse", "PatientFilter", "PatientLookup",
+    "PersonDomain", "PersonSearchResult",
+    "ChangeEntry", "ChangeFeed", "ChangeFeedHead",
+    "AccessDecision",
+    "BulkItemResult", "BulkCreateResponse", "BulkUpsertResponse",
+    "ImportRowError", "ImportReport", "BulkLookup",
 ]
\ No newline at end of file
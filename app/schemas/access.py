@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class AccessDecision(BaseModel):
+    """
+    What the access index knows about one identifier. `domain` and `id` are
+    null when nobody has it, so `is_active` alone is a safe allow/deny signal.
+    """
+    identifier: str
+    domain: Optional[str] = None
+    id: Optional[int] = None
+    is_active: bool = False
+    access_level: Optional[str] = None  # IT staff only
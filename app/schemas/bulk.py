@@ -0,0 +1,67 @@
+from pydantic import BaseModel, model_validator
+from typing import Any, ClassVar, List, Optional, Tuple
+from app.core.config import settings
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+    @classmethod
+    def from_results(cls, results: List[BulkItemResult]) -> "BulkCreateResponse":
+        failed = sum(1 for result in results if result.error is not None)
+        return cls(created=len(results) - failed, failed=failed, results=results)
+
+
+class BulkUpsertResponse(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[BulkItemResult] = []
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+
+
+class BulkLookup(BaseModel):
+    """
+    Body of the POST /{domain}/lookup routes: either database `ids` or the
+    domain's natural IDs (added by each subclass as `<natural_key>s`).
+    """
+    natural_key: ClassVar[str]
+
+    ids: Optional[List[int]] = None
+
+    @model_validator(mode="after")
+    def _exactly_one_key(self) -> "BulkLookup":
+        given = [name for name in self.model_fields if getattr(self, name) is not None]
+        if len(given) != 1:
+            raise ValueError(f"Provide exactly one of: {', '.join(self.model_fields)}")
+        if len(getattr(self, given[0])) > settings.lookup_max_items:
+            raise ValueError(f"At most {settings.lookup_max_items} keys can be looked up at once")
+        return self
+
+    def lookup_key(self) -> Tuple[str, List[Any]]:
+        """The column to match on and the requested values, in request order."""
+        if self.ids is not None:
+            return "id", self.ids
+        return self.natural_key, getattr(self, f"{self.natural_key}s")
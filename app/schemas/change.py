@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class ChangeEntry(BaseModel):
+    seq: int
+    domain: str
+    id: int
+    op: str  # insert, update, delete
+    changed_at: datetime
+    # Current state of the record; None for deletes and for records that
+    # have been deleted since (a later delete entry follows).
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeEntry]
+    next_cursor: str
+    has_more: bool
+
+
+class ChangeFeedHead(BaseModel):
+    cursor: str
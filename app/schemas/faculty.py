@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import ClassVar, List, Optional
 from datetime import datetime
+from app.schemas.bulk import BulkLookup
 
 
 class FacultyBase(BaseModel):
@@ -38,4 +39,18 @@ class FacultyResponse(FacultyBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class FacultyFilter(BaseModel):
+    """Query parameters accepted as filters by GET /faculty/ and /faculty/export."""
+    department: Optional[str] = None
+    position: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class FacultyLookup(BulkLookup):
+    """Body of POST /faculty/lookup: `ids` or `faculty_ids`."""
+    natural_key: ClassVar[str] = "faculty_id"
+
+    faculty_ids: Optional[List[str]] = None
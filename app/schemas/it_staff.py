@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import ClassVar, List, Optional
 from datetime import datetime
+from app.schemas.bulk import BulkLookup
 
 
 class ITStaffBase(BaseModel):
@@ -38,4 +39,19 @@ class ITStaffResponse(ITStaffBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ITStaffFilter(BaseModel):
+    """Query parameters accepted as filters by GET /it-staff/ and /it-staff/export."""
+    department: Optional[str] = None
+    role: Optional[str] = None
+    access_level: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class ITStaffLookup(BulkLookup):
+    """Body of POST /it-staff/lookup: `ids` or `staff_ids`."""
+    natural_key: ClassVar[str] = "staff_id"
+
+    staff_ids: Optional[List[str]] = None
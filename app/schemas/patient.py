@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import ClassVar, List, Optional
 from datetime import datetime
+from app.schemas.bulk import BulkLookup
 
 
 class PatientBase(BaseModel):
@@ -35,3 +36,16 @@ class PatientResponse(PatientBase):
 
     class Config:
         from_attributes = True
+
+
+
+class PatientFilter(BaseModel):
+    """Query parameters accepted as filters by GET /patients/ and /patients/export."""
+    is_active: Optional[bool] = None
+
+
+class PatientLookup(BulkLookup):
+    """Body of POST /patients/lookup: `ids` or `patient_ids`."""
+    natural_key: ClassVar[str] = "patient_id"
+
+    patient_ids: Optional[List[str]] = None
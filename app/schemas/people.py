@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from enum import Enum
+
+
+class PersonDomain(str, Enum):
+    students = "students"
+    faculty = "faculty"
+    it_staff = "it-staff"
+    staff = "staff"
+    patients = "patients"
+
+
+class PersonSearchResult(BaseModel):
+    """One search hit; `domain` and `id` locate the full record (/api/v1/{domain}/{id})."""
+    domain: str
+    id: int
+    person_id: str
+    first_name: str
+    last_name: str
+    email: str
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import ClassVar, List, Optional
 from datetime import datetime
+from app.schemas.bulk import BulkLookup
 
 
 class StaffBase(BaseModel):
@@ -35,3 +36,18 @@ class StaffResponse(StaffBase):
 
     class Config:
         from_attributes = True
+
+
+
+class StaffFilter(BaseModel):
+    """Query parameters accepted as filters by GET /staff/ and /staff/export."""
+    department: Optional[str] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class StaffLookup(BulkLookup):
+    """Body of POST /staff/lookup: `ids` or `staff_ids`."""
+    natural_key: ClassVar[str] = "staff_id"
+
+    staff_ids: Optional[List[str]] = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import ClassVar, List, Optional
 from datetime import datetime
+from app.schemas.bulk import BulkLookup
 
 
 class StudentBase(BaseModel):
@@ -36,4 +37,18 @@ class StudentResponse(StudentBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class StudentFilter(BaseModel):
+    """Query parameters accepted as filters by GET /students/ and /students/export."""
+    major: Optional[str] = None
+    year: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class StudentLookup(BulkLookup):
+    """Body of POST /students/lookup: `ids` or `student_ids`."""
+    natural_key: ClassVar[str] = "student_id"
+
+    student_ids: Optional[List[str]] = None
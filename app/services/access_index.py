@@ -0,0 +1,506 @@
+import asyncio
+import contextvars
+import logging
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+from sqlalchemy import event, func, null, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional, Tuple, Union
+from app.core.config import settings
+from app.core.metrics import ACCESS_INDEX_ENTRIES
+from app.db.base import AsyncReadSessionLocal, ReadSessionLocal, read_table_engines
+from app.models.faculty import Faculty
+from app.models.it_staff import ITStaff
+from app.models.patient import Patient
+from app.models.staff import Staff
+from app.models.student import Student
+from app.services.change_service import (
+    ChangeService, CursorExpiredError, Position, change_log_available, read_changes,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+# (domain as exposed by the API, model, natural id column). An entity is
+# addressed by ref = id * REF_STRIDE + its position here.
+ACCESS_SOURCES = (
+    ("students", Student, "student_id"),
+    ("faculty", Faculty, "faculty_id"),
+    ("it-staff", ITStaff, "staff_id"),
+    ("staff", Staff, "staff_id"),
+    ("patients", Patient, "patient_id"),
+)
+REF_STRIDE = 8
+_SOURCE_INDEX = {domain: index for index, (domain, _, _) in enumerate(ACCESS_SOURCES)}
+
+# (domain, is_active, access_level). There are only a handful of distinct
+# decisions, so each is stored once and people refer to it by its position
+# in AccessIndex._decisions.
+Decision = Tuple[str, bool, Optional[str]]
+# (natural id, lowercased email, decision code)
+Entity = Tuple[str, str, int]
+# Overlay keys: identifier -> ref, or a tuple of refs when several people share it
+Keys = Dict[str, Union[int, Tuple[int, ...]]]
+# The overlay holds people changed since the columns were packed; past this
+# share of the columns it is folded into a fresh set.
+COMPACT_MIN = 1024
+COMPACT_RATIO = 8
+
+_MISSING = object()
+
+
+def normalize_identifier(identifier: str) -> str:
+    """Natural ids match exactly; emails match case-insensitively."""
+    identifier = identifier.strip()
+    return identifier.lower() if "@" in identifier else identifier
+
+
+class _PackedEntries:
+    """Sorted byte strings in one buffer, as a sequence bisect can search."""
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: bytes, offsets: array):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]]
+
+
+class _Columns:
+    """
+    The bulk of the index, packed so that it holds no Python object per
+    person. Each key entry is the UTF-8 identifier, a NUL and the
+    big-endian ref of the person holding it, so sorting the entries sorts
+    by identifier and a shared identifier is a run of entries. refs is
+    sorted and codes[i] is the decision of refs[i].
+
+    Every SAMPLE_EVERY-th entry is also kept in a plain list, so a search
+    bisects that in C and only the last few steps go through
+    _PackedEntries.__getitem__.
+    """
+
+    __slots__ = ("keys", "samples", "refs", "codes")
+
+    SAMPLE_EVERY = 32
+
+    def __init__(self, keys: _PackedEntries, refs: array, codes: array):
+        self.keys = keys
+        self.samples = [keys[position] for position in range(0, len(keys), self.SAMPLE_EVERY)]
+        self.refs = refs
+        self.codes = codes
+
+    def refs_for(self, key: str) -> List[int]:
+        prefix = key.encode() + b"\0"
+        refs = []
+        # Entries sharing the key follow the first; there are rarely more than two
+        for position in range(self._search(prefix), len(self.keys)):
+            entry = self.keys[position]
+            if not entry.startswith(prefix):
+                break
+            refs.append(_entry_ref(entry))
+        return refs
+
+    def _search(self, target: bytes) -> int:
+        """bisect_left(self.keys, target)"""
+        block = bisect_left(self.samples, target)
+        # keys[(block - 1) * SAMPLE_EVERY] < target <= keys[block * SAMPLE_EVERY]
+        low = max(0, (block - 1) * self.SAMPLE_EVERY + 1)
+        high = min(len(self.keys), block * self.SAMPLE_EVERY)
+        return bisect_left(self.keys, target, low, high)
+
+    def code(self, ref: int) -> Optional[int]:
+        position = bisect_left(self.refs, ref)
+        if position < len(self.refs) and self.refs[position] == ref:
+            return self.codes[position]
+        return None
+
+    def nbytes(self) -> int:
+        arrays = (self.keys.offsets, self.refs, self.codes)
+        samples = sys.getsizeof(self.samples) + sum(sys.getsizeof(sample) for sample in self.samples)
+        return len(self.keys.blob) + samples + sum(column.itemsize * len(column) for column in arrays)
+
+
+def _entry_ref(entry: bytes) -> int:
+    return int.from_bytes(entry[-8:], "big")
+
+
+class _ColumnsBuilder:
+    """Collects people in any order and packs them into _Columns."""
+
+    def __init__(self):
+        self._entries: List[bytes] = []
+        self._refs = array("q")
+        self._codes = array("I")
+
+    def add(self, ref: int, person_id: str, email: str, code: int) -> None:
+        self.add_person(ref, code)
+        suffix = b"\0" + ref.to_bytes(8, "big")
+        self._entries.append(person_id.encode() + suffix)
+        if email != person_id:
+            self._entries.append(email.encode() + suffix)
+
+    def add_person(self, ref: int, code: int) -> None:
+        self._refs.append(ref)
+        self._codes.append(code)
+
+    def add_entry(self, entry: bytes) -> None:
+        self._entries.append(entry)
+
+    def finish(self) -> _Columns:
+        entries, self._entries = self._entries, []
+        entries.sort()
+        keys = _PackedEntries(b"".join(entries), array("q", accumulate(map(len, entries), initial=0)))
+        del entries
+        order = sorted(range(len(self._refs)), key=self._refs.__getitem__)
+        refs = array("q", (self._refs[i] for i in order))
+        codes = array("I", (self._codes[i] for i in order))
+        return _Columns(keys, refs, codes)
+
+
+class AccessIndex:
+    """
+    In-memory map from natural id or email to an access decision, for every
+    person in every domain.
+
+    Built once at startup, then kept current by replaying the change log: a
+    background task applies new entries as they appear, woken straight away
+    by this worker's own commits and polling for everyone else's. The build
+    runs in that task too, so startup doesn't wait for it; callers await
+    ready() before their first lookup. Lookups never touch the database.
+    Mutations and lookups both run on the event loop, so a lookup never sees
+    an entity half-updated.
+
+    The build packs everyone into sorted columns (see _Columns), searched
+    with bisect. Changes replayed from the log go in a small dict overlay
+    that masks the columns for the people it holds; once it holds more than
+    1/COMPACT_RATIO of them it is folded into new columns off the loop.
+
+    Without a change log (see change_log_available) there is nothing to keep
+    the index current, so it is never built and find() queries the
+    databases instead.
+    """
+
+    def __init__(self):
+        self._columns = _ColumnsBuilder().finish()
+        # ref -> entity as it is now, or None once deleted, for every person
+        # changed since the columns were packed
+        self._changed: Dict[int, Optional[Entity]] = {}
+        self._changed_keys: Keys = {}
+        self._count = 0
+        self._decisions: List[Decision] = []
+        self._codes: Dict[Decision, int] = {}
+        self._position: Position = ()
+        self._task: Optional[asyncio.Task] = None
+        self._compaction: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    def lookup(self, identifier: str, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        key = normalize_identifier(identifier)
+        found: Dict[int, int] = {}
+        for ref in self._columns.refs_for(key):
+            if ref not in self._changed:
+                found[ref] = self._columns.code(ref)
+        refs = self._changed_keys.get(key)
+        if refs is not None:
+            for ref in (refs,) if isinstance(refs, int) else refs:
+                found[ref] = self._changed[ref][2]
+        matches = []
+        # In domain order, as the databases would answer
+        for ref in sorted(found, key=lambda ref: (ref % REF_STRIDE, ref)):
+            match_domain, is_active, access_level = self._decisions[found[ref]]
+            if domain is None or match_domain == domain:
+                matches.append({
+                    "identifier": identifier,
+                    "domain": match_domain,
+                    "id": ref // REF_STRIDE,
+                    "is_active": is_active,
+                    "access_level": access_level,
+                })
+        return matches
+
+    async def find(self, identifiers: List[str], domain: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """lookup() for each of `identifiers`, from memory when the index is running."""
+        if self._task is None:
+            return await read_matches(identifiers, domain)
+        await self.ready()
+        return [self.lookup(identifier, domain) for identifier in identifiers]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the index, for benchmarks."""
+        overlay = sys.getsizeof(self._changed) + sys.getsizeof(self._changed_keys) + sum(
+            sys.getsizeof(entity) + sys.getsizeof(entity[0]) + sys.getsizeof(entity[1])
+            for entity in self._changed.values() if entity is not None
+        )
+        return self._columns.nbytes() + overlay
+
+    async def ready(self) -> None:
+        """Wait for the initial build. Returns at once if the index was never started."""
+        if self._ready is not None:
+            await self._ready.wait()
+
+    async def start(self) -> None:
+        """Start building the index in the background, then follow the change log."""
+        await self.stop()
+        if not change_log_available():
+            logger.info("No change log to follow; access checks will query the database")
+            return
+        self._ready = asyncio.Event()
+        self._wake = asyncio.Event()
+        # A fresh context keeps the refresh queries out of any request's
+        # instrumentation.
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), context=contextvars.Context()
+        )
+
+    async def stop(self) -> None:
+        for task in (self._compaction, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._compaction = None
+
+    def notify(self) -> None:
+        """Apply new changes now rather than on the next poll. Safe to call from any thread."""
+        task, wake = self._task, self._wake
+        if task is None or task.done() or wake is None:
+            return
+        loop = task.get_loop()
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def _decision(self, domain: str, is_active: Optional[bool], access_level: Optional[str]) -> int:
+        decision = (domain, bool(is_active), access_level)
+        code = self._codes.get(decision)
+        if code is None:
+            self._decisions.append(decision)
+            code = self._codes[decision] = len(self._decisions) - 1
+        return code
+
+    async def _load(self) -> None:
+        # Built off the loop, swapped in on it
+        if self._compaction is not None:
+            self._compaction.cancel()
+            self._compaction = None
+        columns, position = await run_in_threadpool(self._build)
+        self._columns, self._position = columns, position
+        self._changed, self._changed_keys = {}, {}
+        self._count = len(columns.refs)
+        ACCESS_INDEX_ENTRIES.set(self._count)
+
+    def _build(self) -> Tuple[_Columns, Position]:
+        # Read the head first: a write landing during the scan is then both
+        # in the scan and replayed afterwards, and replaying is idempotent.
+        with ReadSessionLocal() as db:
+            position = ChangeService(db).get_head()
+
+        builder = _ColumnsBuilder()
+        add = builder.add
+        for index, (domain, model, id_column) in enumerate(ACCESS_SOURCES):
+            engine = read_table_engines[model.__tablename__]
+            stmt = select(
+                model.id, getattr(model, id_column), model.email,
+                model.is_active, getattr(model, "access_level", null()),
+            )
+            # A raw DBAPI cursor: building a Row per person would double the
+            # time this takes over a large table.
+            connection = engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(str(stmt.compile(dialect=engine.dialect)))
+                codes: Dict[Tuple[Any, Any], int] = {}
+                while rows := cursor.fetchmany(settings.export_batch_size):
+                    for id, person_id, email, is_active, access_level in rows:
+                        code = codes.get((is_active, access_level))
+                        if code is None:
+                            code = codes[is_active, access_level] = self._decision(domain, is_active, access_level)
+                        add(id * REF_STRIDE + index, person_id, email.lower(), code)
+                cursor.close()
+            finally:
+                connection.close()
+        return builder.finish(), position
+
+    def _present(self, ref: int) -> bool:
+        entity = self._changed.get(ref, _MISSING)
+        if entity is _MISSING:
+            return self._columns.code(ref) is not None
+        return entity is not None
+
+    def _apply(self, domain: str, id: int, data: Optional[Dict[str, Any]]) -> None:
+        index = _SOURCE_INDEX[domain]
+        ref = id * REF_STRIDE + index
+        self._count -= self._present(ref)
+        old = self._changed.get(ref)
+        if old is not None:
+            _unlink(self._changed_keys, old[0], ref)
+            _unlink(self._changed_keys, old[1], ref)
+        entity = None
+        if data is not None:
+            id_column = ACCESS_SOURCES[index][2]
+            entity = (
+                data[id_column],
+                data["email"].lower(),
+                self._decision(domain, data["is_active"], data.get("access_level")),
+            )
+            _link(self._changed_keys, entity[0], ref)
+            _link(self._changed_keys, entity[1], ref)
+            self._count += 1
+        self._changed[ref] = entity
+
+    def _should_compact(self) -> bool:
+        return (
+            self._compaction is None
+            and len(self._changed) > max(COMPACT_MIN, len(self._columns.refs) // COMPACT_RATIO)
+        )
+
+    async def _compact(self) -> None:
+        """Fold the overlay into new columns. Changes applied meanwhile stay in the overlay."""
+        try:
+            columns, changed = self._columns, dict(self._changed)
+            self._columns = await run_in_threadpool(_merge, columns, changed)
+            for ref, entity in changed.items():
+                if self._changed.get(ref, _MISSING) is entity:
+                    del self._changed[ref]
+                    if entity is not None:
+                        _unlink(self._changed_keys, entity[0], ref)
+                        _unlink(self._changed_keys, entity[1], ref)
+        except Exception:
+            logger.exception("Access index compaction failed")
+        finally:
+            self._compaction = None
+
+    async def _refresh(self) -> None:
+        while True:
+            try:
+                changes, has_more = await read_changes(
+                    self._position, settings.change_feed_max_limit
+                )
+            except CursorExpiredError:
+                logger.warning("Access index fell behind the change log; rebuilding")
+                await self._load()
+                return
+            for change in changes:
+                # data is the row as it is now, or None once it is gone
+                self._apply(change["domain"], change["id"], change["data"])
+            if changes:
+                self._position = changes[-1]["position"]
+                ACCESS_INDEX_ENTRIES.set(self._count)
+            if self._should_compact():
+                self._compaction = asyncio.get_running_loop().create_task(self._compact())
+            if not has_more:
+                return
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._load()
+                break
+            except Exception:
+                logger.exception("Access index build failed; retrying")
+                await asyncio.sleep(settings.access_index_refresh_interval)
+        self._ready.set()
+
+        while True:
+            # Cleared before refreshing so a commit during the refresh isn't missed
+            self._wake.clear()
+            try:
+                await self._refresh()
+            except Exception:
+                logger.exception("Access index refresh failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.access_index_refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _merge(columns: _Columns, changed: Dict[int, Optional[Entity]]) -> _Columns:
+    builder = _ColumnsBuilder()
+    for position in range(len(columns.keys)):
+        entry = columns.keys[position]
+        if _entry_ref(entry) not in changed:
+            builder.add_entry(entry)
+    for ref, code in zip(columns.refs, columns.codes):
+        if ref not in changed:
+            builder.add_person(ref, code)
+    for ref, entity in changed.items():
+        if entity is not None:
+            builder.add(ref, *entity)
+    return builder.finish()
+
+
+def _link(keys: Keys, key: str, ref: int) -> None:
+    refs = keys.get(key)
+    if refs is None:
+        keys[key] = ref
+    elif isinstance(refs, int):
+        if refs != ref:
+            keys[key] = (refs, ref)
+    elif ref not in refs:
+        keys[key] = refs + (ref,)
+
+
+def _unlink(keys: Keys, key: str, ref: int) -> None:
+    refs = keys.get(key)
+    if refs is None:
+        return
+    if isinstance(refs, int):
+        if refs == ref:
+            del keys[key]
+        return
+    remaining = tuple(r for r in refs if r != ref)
+    keys[key] = remaining[0] if len(remaining) == 1 else remaining
+
+
+def _query_matches(db: Session, identifiers: List[str], domain: Optional[str]) -> List[List[Dict[str, Any]]]:
+    """lookup() answered by the databases: one query per domain for all of `identifiers`."""
+    keys = {normalize_identifier(identifier) for identifier in identifiers}
+    person_ids = [key for key in keys if "@" not in key]
+    emails = [key for key in keys if "@" in key]
+    found: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for source_domain, model, id_column in ACCESS_SOURCES:
+        if domain is not None and source_domain != domain:
+            continue
+        person_id_column = getattr(model, id_column)
+        stmt = select(
+            model.id, person_id_column, model.email,
+            model.is_active, getattr(model, "access_level", null()),
+        ).where(or_(person_id_column.in_(person_ids), func.lower(model.email).in_(emails)))
+        for id, person_id, email, is_active, access_level in db.execute(stmt):
+            match = {"domain": source_domain, "id": id, "is_active": bool(is_active), "access_level": access_level}
+            for key in {person_id, email.lower()} & keys:
+                found[key].append(match)
+    return [
+        [{"identifier": identifier, **match} for match in found.get(normalize_identifier(identifier), ())]
+        for identifier in identifiers
+    ]
+
+
+def _read_matches(identifiers: List[str], domain: Optional[str]) -> List[List[Dict[str, Any]]]:
+    with ReadSessionLocal() as db:
+        return _query_matches(db, identifiers, domain)
+
+
+async def read_matches(identifiers: List[str], domain: Optional[str]) -> List[List[Dict[str, Any]]]:
+    if settings.async_database:
+        async with AsyncReadSessionLocal() as db:
+            return await db.run_sync(lambda session: _query_matches(session, identifiers, domain))
+    return await run_in_threadpool(_read_matches, identifiers, domain)
+
+
+access_index = AccessIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_access_index(session: Session) -> None:
+    access_index.notify()
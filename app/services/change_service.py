@@ -0,0 +1,176 @@
+import heapq
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Set, Tuple
+from app.core.config import settings
+from app.db.base import AsyncReadSessionLocal, ReadSessionLocal, shards
+from app.db.changes import change_log_head, has_change_log
+from app.models.change_log import ChangeLog
+from app.models.faculty import Faculty
+from app.models.it_staff import ITStaff
+from app.models.patient import Patient
+from app.models.staff import Staff
+from app.models.student import Student
+from app.schemas.faculty import FacultyResponse
+from app.schemas.it_staff import ITStaffResponse
+from app.schemas.patient import PatientResponse
+from app.schemas.staff import StaffResponse
+from app.schemas.student import StudentResponse
+from app.utils.serialization import RowSerializer
+
+
+_DOMAINS: Dict[str, Tuple[Any, RowSerializer]] = {
+    "students": (Student, RowSerializer(StudentResponse)),
+    "faculty": (Faculty, RowSerializer(FacultyResponse)),
+    "it-staff": (ITStaff, RowSerializer(ITStaffResponse)),
+    "staff": (Staff, RowSerializer(StaffResponse)),
+    "patients": (Patient, RowSerializer(PatientResponse)),
+}
+
+
+# How far a reader has got: one sequence number per database, in the order of
+# the session's shards. With all domains in one database it is just (seq,).
+Position = Tuple[int, ...]
+
+
+class CursorExpiredError(Exception):
+    """The entries after a cursor were pruned; the client has to resync."""
+
+
+class ChangeLogUnavailableError(Exception):
+    """Some database holding domain tables keeps no change log (see has_change_log)."""
+
+
+def change_log_available() -> bool:
+    """Whether every database holding domain tables keeps a change log."""
+    return all(has_change_log(shard) for shard in shards)
+
+
+class ChangeService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_head(self) -> Position:
+        """Sequence number of the newest change ever logged in each database (0 if none)."""
+        return tuple(self._head(shard) for shard in self._shards())
+
+    def _shards(self) -> List[Engine]:
+        shards = self.db.shards
+        if not all(has_change_log(shard) for shard in shards):
+            raise ChangeLogUnavailableError()
+        return shards
+
+    def _head(self, shard: Engine) -> int:
+        return change_log_head(self.db, shard)
+
+    def get_changes(self, since: Position, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Changes after `since`, oldest first, each with the record's current
+        state attached. Returns the entries and whether more are waiting.
+        Besides the feed fields, each entry carries the index of the database
+        it came from (`shard`) and the position just after it (`position`).
+
+        Each database's log is read in seq order and the logs are merged by
+        changed_at. Costs one range scan per database plus one primary-key
+        lookup per domain, whatever the size of the tables.
+        """
+        shards = self._shards()
+        if len(since) != len(shards):
+            # A cursor from before the databases were split up or merged
+            raise CursorExpiredError()
+        logs = [
+            self._read_log(index, shard, seq, limit)
+            for index, (shard, seq) in enumerate(zip(shards, since))
+        ]
+        entries = list(heapq.merge(*logs, key=lambda entry: entry["changed_at"]))
+
+        has_more = len(entries) > limit
+        changes = entries[:limit]
+        position = list(since)
+        for change in changes:
+            position[change["shard"]] = change["seq"]
+            change["position"] = tuple(position)
+        current = self._current_rows(changes)
+        for change in changes:
+            change["data"] = current.get((change["domain"], change["id"]))
+        return changes, has_more
+
+    def _read_log(self, index: int, shard: Engine, since: int, limit: int) -> List[Dict[str, Any]]:
+        entries = self.db.execute(
+            select(
+                ChangeLog.seq, ChangeLog.domain, ChangeLog.entity_id.label("id"),
+                ChangeLog.op, ChangeLog.changed_at,
+            )
+            .where(ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit + 1),
+            bind_arguments={"bind": shard},
+        ).all()
+
+        # Sequence numbers have no gaps (a rolled-back write rolls its entry
+        # back too), so a jump means entries after `since` were pruned.
+        first = entries[0].seq if entries else self._head(shard) + 1
+        if first != since + 1:
+            raise CursorExpiredError()
+        return [{**entry._asdict(), "shard": index} for entry in entries]
+
+    def _current_rows(self, changes: List[Dict[str, Any]]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        ids: Dict[str, Set[int]] = defaultdict(set)
+        for change in changes:
+            if change["op"] != "delete":
+                ids[change["domain"]].add(change["id"])
+
+        current = {}
+        for domain, domain_ids in ids.items():
+            model, serializer = _DOMAINS[domain]
+            columns = [getattr(model, name) for name in serializer.fields]
+            rows = [row._asdict() for row in self.db.execute(
+                select(*columns).where(model.id.in_(domain_ids))
+            )]
+            for row in serializer.to_jsonable(rows):
+                current[(domain, row["id"])] = row
+        return current
+
+
+class AsyncChangeService:
+    """Runs ChangeService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_head(self) -> Position:
+        return await self.db.run_sync(lambda db: ChangeService(db).get_head())
+
+    async def get_changes(self, since: Position, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        return await self.db.run_sync(lambda db: ChangeService(db).get_changes(since, limit))
+
+
+# For background tasks, which have no request session: each call opens its
+# own read session on whichever engine the endpoints use.
+
+def _read_changes(since: Position, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    with ReadSessionLocal() as db:
+        return ChangeService(db).get_changes(since, limit)
+
+
+def _read_head() -> Position:
+    with ReadSessionLocal() as db:
+        return ChangeService(db).get_head()
+
+
+async def read_changes(since: Position, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    if settings.async_database:
+        async with AsyncReadSessionLocal() as db:
+            return await AsyncChangeService(db).get_changes(since, limit)
+    return await run_in_threadpool(_read_changes, since, limit)
+
+
+async def read_head() -> Position:
+    if settings.async_database:
+        async with AsyncReadSessionLocal() as db:
+            return await AsyncChangeService(db).get_head()
+    return await run_in_threadpool(_read_head)
@@ -0,0 +1,219 @@
+import asyncio
+import contextvars
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.metrics import CHANGE_STREAM_DROPPED, CHANGE_STREAM_SUBSCRIBERS
+from app.schemas.change import ChangeEntry
+from app.services.change_service import Position, read_changes, read_head
+from app.utils.pagination import encode_cursor
+
+logger = logging.getLogger("uvicorn.error")
+
+# (index of the database the change came from, seq, domain, encoded SSE
+# event), serialized once per change and shared by every subscriber
+Event = Tuple[int, int, str, str]
+
+HEARTBEAT = ": heartbeat\n\n"
+
+
+def _events(changes: List[Dict[str, Any]]) -> List[Event]:
+    events = []
+    for change in changes:
+        entry = ChangeEntry.model_validate(change)
+        events.append((
+            change["shard"],
+            entry.seq,
+            entry.domain,
+            f"id: {encode_cursor(*change['position'])}\ndata: {entry.model_dump_json()}\n\n",
+        ))
+    return events
+
+
+class ChangeBroadcaster:
+    """
+    Fans new change log entries out to every stream subscriber in the worker.
+
+    A single task polls the change log (one indexed range read per tick, no
+    matter how many clients are connected) and puts each batch on the
+    subscribers' queues. It runs only while someone is subscribed. Commits made
+    by this worker wake it straight away; writes from other workers are picked
+    up on the next poll.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._position: Position = ()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._start_lock = asyncio.Lock()
+
+    async def subscribe(self) -> Tuple[asyncio.Queue, Position]:
+        """
+        Register a subscriber. Returns its queue and the position the
+        broadcaster has reached: everything after it will arrive on the queue.
+        """
+        async with self._start_lock:
+            if not self._running():
+                self._position = await read_head()
+                self._wake = asyncio.Event()
+                # Started from inside a request; a fresh context keeps the
+                # poller's queries out of that request's instrumentation.
+                self._task = asyncio.get_running_loop().create_task(
+                    self._run(), context=contextvars.Context()
+                )
+            queue: asyncio.Queue = asyncio.Queue(maxsize=settings.change_stream_queue_size)
+            self._subscribers.add(queue)
+        CHANGE_STREAM_SUBSCRIBERS.inc()
+        return queue, self._position
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        CHANGE_STREAM_SUBSCRIBERS.dec()
+
+    def notify(self) -> None:
+        """Wake the poller early. Safe to call from any thread."""
+        task, wake = self._task, self._wake
+        if task is None or task.done() or wake is None:
+            return
+        loop = task.get_loop()
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def _running(self) -> bool:
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is asyncio.get_running_loop()
+        )
+
+    def _drop(self, queue: asyncio.Queue) -> None:
+        # The client fell too far behind. Its stream ends and it reconnects
+        # with Last-Event-ID, catching up from the log instead of from memory.
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        CHANGE_STREAM_DROPPED.inc()
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            # Cleared before reading, so a commit that lands mid-read still
+            # triggers another pass instead of waiting for the next poll.
+            self._wake.clear()
+            try:
+                changes, has_more = await read_changes(
+                    self._position, settings.change_feed_max_limit
+                )
+            except Exception:
+                logger.exception("Change stream poll failed")
+                changes, has_more = [], False
+
+            if changes:
+                self._position = changes[-1]["position"]
+                batch = _events(changes)
+                for queue in list(self._subscribers):
+                    try:
+                        queue.put_nowait(batch)
+                    except asyncio.QueueFull:
+                        self._drop(queue)
+            if has_more:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.change_stream_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+broadcaster = ChangeBroadcaster()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_broadcaster(session: Session) -> None:
+    broadcaster.notify()
+
+
+class ChangeStream:
+    """One client's stream: replay from its cursor, then follow the broadcaster."""
+
+    def __init__(self, queue: asyncio.Queue, position: Position, since: Position, domains: Optional[Set[str]]):
+        self.queue = queue
+        self.position = position
+        self.last = list(since)
+        self.domains = domains
+        self._backlog: List[Dict[str, Any]] = []
+        self._backlog_has_more = False
+        self._closed = False
+
+    @classmethod
+    async def open(cls, since: Optional[Position], domains: Optional[Set[str]] = None) -> "ChangeStream":
+        """
+        Subscribe and, when resuming, read the first page of missed changes
+        so an expired cursor raises CursorExpiredError before the response starts.
+        Without a cursor the stream starts with the next change.
+        """
+        queue, position = await broadcaster.subscribe()
+        stream = cls(queue, position, position if since is None else since, domains)
+        try:
+            if not stream._caught_up():
+                stream._backlog, stream._backlog_has_more = await read_changes(
+                    tuple(stream.last), settings.change_feed_max_limit
+                )
+        except BaseException:
+            stream.close()
+            raise
+        return stream
+
+    def close(self) -> None:
+        """Unsubscribe. Idempotent, so it can also run as the response's background task."""
+        if not self._closed:
+            self._closed = True
+            broadcaster.unsubscribe(self.queue)
+
+    async def events(self) -> AsyncIterator[str]:
+        try:
+            # Catch up from the log until the broadcaster's starting point;
+            # the queue holds everything after it.
+            changes, has_more = self._backlog, self._backlog_has_more
+            self._backlog = []
+            while True:
+                for chunk in self._filter(_events(changes)):
+                    yield chunk
+                if not has_more or self._caught_up():
+                    break
+                changes, has_more = await read_changes(tuple(self.last), settings.change_feed_max_limit)
+
+            while True:
+                try:
+                    batch = await asyncio.wait_for(
+                        self.queue.get(), settings.change_stream_heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if batch is None:
+                    return
+                for chunk in self._filter(batch):
+                    yield chunk
+        finally:
+            self.close()
+
+    def _caught_up(self) -> bool:
+        """Whether the replay has reached the broadcaster's starting point in every database."""
+        return len(self.last) == len(self.position) and all(
+            last >= position for last, position in zip(self.last, self.position)
+        )
+
+    def _filter(self, events: List[Event]) -> List[str]:
+        chunks = []
+        for shard, seq, domain, chunk in events:
+            # Replay and the queue can overlap by a few entries
+            if seq <= self.last[shard]:
+                continue
+            self.last[shard] = seq
+            if self.domains is None or domain in self.domains:
+                chunks.append(chunk)
+        return chunks
@@ -1,43 +1,166 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.db.group_commit import commit_write
+from app.db.sqlite import async_retry_on_locked, retry_on_locked
+from app.db.versions import table_version
+from app.db.write_tokens import reads_own_writes
 from app.models.faculty import Faculty
-from app.schemas.faculty import FacultyCreate, FacultyUpdate
+from app.schemas.bulk import BulkItemResult, BulkUpsertResponse, ImportReport
+from app.schemas.faculty import FacultyCreate, FacultyLookup, FacultyUpdate
+from app.utils.bulk import bulk_insert, bulk_lookup, bulk_upsert
+from app.utils.cache import EntityCache
+from app.utils.importer import import_file
+from app.utils.pagination import PageParams, apply_filters, paginate
+from app.utils.serialization import FileFormat
+
+
+_cache = EntityCache("faculty")
+
+
+def _constraint_message(error: IntegrityError) -> str:
+    if "UNIQUE constraint failed: faculty.email" in str(error):
+        return "Email already exists"
+    elif "UNIQUE constraint failed: faculty.faculty_id" in str(error):
+        return "Faculty ID already exists"
+    return "Database constraint violation"
 
 
 class FacultyService:
     def __init__(self, db: Session):
         self.db = db
 
+    @retry_on_locked
     def create_faculty(self, faculty_data: FacultyCreate) -> Faculty:
-        db_faculty = Faculty(**faculty_data.dict())
-        self.db.add(db_faculty)
-        self.db.commit()
-        self.db.refresh(db_faculty)
+        db_faculty = commit_write(self.db, Faculty, lambda db: db.scalar(
+            insert(Faculty).values(**faculty_data.dict()).returning(Faculty)
+        ))
         return db_faculty
 
+    @retry_on_locked
+    def create_faculty_bulk(self, items: List[FacultyCreate]) -> List[BulkItemResult]:
+        rows = [item.dict() for item in items]
+        return bulk_insert(self.db, Faculty, rows, _constraint_message)
+
+    def import_faculty(self, file: BinaryIO, format: FileFormat) -> ImportReport:
+        return import_file(self.db, Faculty, FacultyCreate, file, format, _constraint_message)
+
+    @retry_on_locked
+    def upsert_faculty(self, items: List[FacultyCreate]) -> BulkUpsertResponse:
+        rows = [item.dict() for item in items]
+        result = bulk_upsert(self.db, Faculty, "faculty_id", rows, _constraint_message)
+        _cache.clear()
+        return result
+
     def get_faculty(self, faculty_id: int) -> Optional[Faculty]:
-        return self.db.query(Faculty).filter(Faculty.id == faculty_id).first()
+        return _cache.get_or_load(
+            faculty_id, lambda: self._load_faculty(faculty_id), refresh=reads_own_writes(self.db)
+        )
+
+    def _load_faculty(self, faculty_id: int) -> Optional[Faculty]:
+        faculty = self.db.query(Faculty).filter(Faculty.id == faculty_id).first()
+        if faculty is not None:
+            self.db.expunge(faculty)
+        return faculty
 
     def get_faculty_by_faculty_id(self, faculty_id: str) -> Optional[Faculty]:
         return self.db.query(Faculty).filter(Faculty.faculty_id == faculty_id).first()
 
-    def get_faculty_list(self, skip: int = 0, limit: int = 100) -> List[Faculty]:
-        return self.db.query(Faculty).offset(skip).limit(limit).all()
+    def get_faculty_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Faculty]:
+        page = PageParams(skip=skip, limit=limit, after=None if after_id is None else (after_id,))
+        return self.db.scalars(paginate(select(Faculty), Faculty, page)).all()
+
+    def get_faculty_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """One filtered, sorted page of plain column dicts; no ORM objects are built."""
+        columns = [getattr(Faculty, name) for name in fields]
+        stmt = paginate(apply_filters(select(*columns), Faculty, filters), Faculty, page)
+        return [row._asdict() for row in self.db.execute(stmt)]
+
+    def lookup_faculty_rows(self, fields: List[str], lookup: FacultyLookup) -> List[Optional[Dict[str, Any]]]:
+        """Rows for the requested keys, in request order; None where no record matches."""
+        column, keys = lookup.lookup_key()
+        return bulk_lookup(self.db, Faculty, column, keys, fields)
 
+    def iter_faculty_rows(
+        self,
+        fields: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every matching row in id order, one batch at a time, from a single streamed query."""
+        columns = [getattr(Faculty, name) for name in fields]
+        stmt = apply_filters(select(*columns), Faculty, filters).order_by(Faculty.id).execution_options(
+            yield_per=batch_size or settings.export_batch_size
+        )
+        for partition in self.db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    def get_faculty_version(self) -> Optional[int]:
+        """Write counter for the faculty table; changes whenever any row does."""
+        return table_version(self.db, "faculty")
+
+    @retry_on_locked
     def update_faculty(self, faculty_id: int, faculty_data: FacultyUpdate) -> Optional[Faculty]:
-        db_faculty = self.get_faculty(faculty_id)
-        if db_faculty:
-            update_data = faculty_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_faculty, field, value)
-            self.db.commit()
-            self.db.refresh(db_faculty)
+        update_data = faculty_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.get_faculty(faculty_id)
+        db_faculty = commit_write(self.db, Faculty, lambda db: db.scalar(
+            update(Faculty)
+            .where(Faculty.id == faculty_id)
+            .values(**update_data)
+            .returning(Faculty)
+        ))
+        _cache.invalidate(faculty_id)
         return db_faculty
 
+    @retry_on_locked
     def delete_faculty(self, faculty_id: int) -> bool:
-        db_faculty = self.get_faculty(faculty_id)
-        if db_faculty:
-            self.db.delete(db_faculty)
-            self.db.commit()
-            return True
-        return False
\ No newline at end of file
+        deleted_id = commit_write(self.db, Faculty, lambda db: db.scalar(
+            delete(Faculty).where(Faculty.id == faculty_id).returning(Faculty.id)
+        ))
+        _cache.invalidate(faculty_id)
+        return deleted_id is not None
+
+
+class AsyncFacultyService:
+    """Runs FacultyService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @async_retry_on_locked
+    async def create_faculty(self, faculty_data: FacultyCreate) -> Faculty:
+        return await self.db.run_sync(lambda db: FacultyService(db).create_faculty(faculty_data))
+
+    async def get_faculty(self, faculty_id: int) -> Optional[Faculty]:
+        return await self.db.run_sync(lambda db: FacultyService(db).get_faculty(faculty_id))
+
+    async def get_faculty_by_faculty_id(self, faculty_id: str) -> Optional[Faculty]:
+        return await self.db.run_sync(lambda db: FacultyService(db).get_faculty_by_faculty_id(faculty_id))
+
+    async def get_faculty_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Faculty]:
+        return await self.db.run_sync(lambda db: FacultyService(db).get_faculty_list(skip=skip, limit=limit, after_id=after_id))
+
+    async def get_faculty_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: FacultyService(db).get_faculty_rows(fields, page, filters))
+
+    async def lookup_faculty_rows(self, fields: List[str], lookup: FacultyLookup) -> List[Optional[Dict[str, Any]]]:
+        return await self.db.run_sync(lambda db: FacultyService(db).lookup_faculty_rows(fields, lookup))
+
+    async def get_faculty_version(self) -> Optional[int]:
+        return await self.db.run_sync(lambda db: FacultyService(db).get_faculty_version())
+
+    @async_retry_on_locked
+    async def update_faculty(self, faculty_id: int, faculty_data: FacultyUpdate) -> Optional[Faculty]:
+        return await self.db.run_sync(lambda db: FacultyService(db).update_faculty(faculty_id, faculty_data))
+
+    @async_retry_on_locked
+    async def delete_faculty(self, faculty_id: int) -> bool:
+        return await self.db.run_sync(lambda db: FacultyService(db).delete_faculty(faculty_id))
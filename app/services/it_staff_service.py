@@ -1,43 +1,159 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.db.group_commit import commit_write
+from app.db.sqlite import async_retry_on_locked, retry_on_locked
+from app.db.versions import table_version
+from app.db.write_tokens import reads_own_writes
 from app.models.it_staff import ITStaff
-from app.schemas.it_staff import ITStaffCreate, ITStaffUpdate
+from app.schemas.bulk import BulkItemResult, ImportReport
+from app.schemas.it_staff import ITStaffCreate, ITStaffLookup, ITStaffUpdate
+from app.utils.bulk import bulk_insert, bulk_lookup
+from app.utils.cache import EntityCache
+from app.utils.importer import import_file
+from app.utils.pagination import PageParams, apply_filters, paginate
+from app.utils.serialization import FileFormat
+
+
+_cache = EntityCache("it_staff")
+
+
+def _constraint_message(error: IntegrityError) -> str:
+    if "UNIQUE constraint failed: it_staff.email" in str(error):
+        return "Email already exists"
+    elif "UNIQUE constraint failed: it_staff.staff_id" in str(error):
+        return "IT Staff ID already exists"
+    return "Database constraint violation"
 
 
 class ITStaffService:
     def __init__(self, db: Session):
         self.db = db
 
+    @retry_on_locked
     def create_it_staff(self, staff_data: ITStaffCreate) -> ITStaff:
-        db_staff = ITStaff(**staff_data.dict())
-        self.db.add(db_staff)
-        self.db.commit()
-        self.db.refresh(db_staff)
+        db_staff = commit_write(self.db, ITStaff, lambda db: db.scalar(
+            insert(ITStaff).values(**staff_data.dict()).returning(ITStaff)
+        ))
         return db_staff
 
+    @retry_on_locked
+    def create_it_staff_bulk(self, items: List[ITStaffCreate]) -> List[BulkItemResult]:
+        rows = [item.dict() for item in items]
+        return bulk_insert(self.db, ITStaff, rows, _constraint_message)
+
+    def import_it_staff(self, file: BinaryIO, format: FileFormat) -> ImportReport:
+        return import_file(self.db, ITStaff, ITStaffCreate, file, format, _constraint_message)
+
     def get_it_staff(self, staff_id: int) -> Optional[ITStaff]:
-        return self.db.query(ITStaff).filter(ITStaff.id == staff_id).first()
+        return _cache.get_or_load(
+            staff_id, lambda: self._load_it_staff(staff_id), refresh=reads_own_writes(self.db)
+        )
+
+    def _load_it_staff(self, staff_id: int) -> Optional[ITStaff]:
+        staff = self.db.query(ITStaff).filter(ITStaff.id == staff_id).first()
+        if staff is not None:
+            self.db.expunge(staff)
+        return staff
 
     def get_it_staff_by_staff_id(self, staff_id: str) -> Optional[ITStaff]:
         return self.db.query(ITStaff).filter(ITStaff.staff_id == staff_id).first()
 
-    def get_it_staff_list(self, skip: int = 0, limit: int = 100) -> List[ITStaff]:
-        return self.db.query(ITStaff).offset(skip).limit(limit).all()
+    def get_it_staff_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[ITStaff]:
+        page = PageParams(skip=skip, limit=limit, after=None if after_id is None else (after_id,))
+        return self.db.scalars(paginate(select(ITStaff), ITStaff, page)).all()
+
+    def get_it_staff_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """One filtered, sorted page of plain column dicts; no ORM objects are built."""
+        columns = [getattr(ITStaff, name) for name in fields]
+        stmt = paginate(apply_filters(select(*columns), ITStaff, filters), ITStaff, page)
+        return [row._asdict() for row in self.db.execute(stmt)]
+
+    def lookup_it_staff_rows(self, fields: List[str], lookup: ITStaffLookup) -> List[Optional[Dict[str, Any]]]:
+        """Rows for the requested keys, in request order; None where no record matches."""
+        column, keys = lookup.lookup_key()
+        return bulk_lookup(self.db, ITStaff, column, keys, fields)
 
+    def iter_it_staff_rows(
+        self,
+        fields: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every matching row in id order, one batch at a time, from a single streamed query."""
+        columns = [getattr(ITStaff, name) for name in fields]
+        stmt = apply_filters(select(*columns), ITStaff, filters).order_by(ITStaff.id).execution_options(
+            yield_per=batch_size or settings.export_batch_size
+        )
+        for partition in self.db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    def get_it_staff_version(self) -> Optional[int]:
+        """Write counter for the it_staff table; changes whenever any row does."""
+        return table_version(self.db, "it_staff")
+
+    @retry_on_locked
     def update_it_staff(self, staff_id: int, staff_data: ITStaffUpdate) -> Optional[ITStaff]:
-        db_staff = self.get_it_staff(staff_id)
-        if db_staff:
-            update_data = staff_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_staff, field, value)
-            self.db.commit()
-            self.db.refresh(db_staff)
+        update_data = staff_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.get_it_staff(staff_id)
+        db_staff = commit_write(self.db, ITStaff, lambda db: db.scalar(
+            update(ITStaff)
+            .where(ITStaff.id == staff_id)
+            .values(**update_data)
+            .returning(ITStaff)
+        ))
+        _cache.invalidate(staff_id)
         return db_staff
 
+    @retry_on_locked
     def delete_it_staff(self, staff_id: int) -> bool:
-        db_staff = self.get_it_staff(staff_id)
-        if db_staff:
-            self.db.delete(db_staff)
-            self.db.commit()
-            return True
-        return False
\ No newline at end of file
+        deleted_id = commit_write(self.db, ITStaff, lambda db: db.scalar(
+            delete(ITStaff).where(ITStaff.id == staff_id).returning(ITStaff.id)
+        ))
+        _cache.invalidate(staff_id)
+        return deleted_id is not None
+
+
+class AsyncITStaffService:
+    """Runs ITStaffService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @async_retry_on_locked
+    async def create_it_staff(self, staff_data: ITStaffCreate) -> ITStaff:
+        return await self.db.run_sync(lambda db: ITStaffService(db).create_it_staff(staff_data))
+
+    async def get_it_staff(self, staff_id: int) -> Optional[ITStaff]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).get_it_staff(staff_id))
+
+    async def get_it_staff_by_staff_id(self, staff_id: str) -> Optional[ITStaff]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).get_it_staff_by_staff_id(staff_id))
+
+    async def get_it_staff_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[ITStaff]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).get_it_staff_list(skip=skip, limit=limit, after_id=after_id))
+
+    async def get_it_staff_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).get_it_staff_rows(fields, page, filters))
+
+    async def lookup_it_staff_rows(self, fields: List[str], lookup: ITStaffLookup) -> List[Optional[Dict[str, Any]]]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).lookup_it_staff_rows(fields, lookup))
+
+    async def get_it_staff_version(self) -> Optional[int]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).get_it_staff_version())
+
+    @async_retry_on_locked
+    async def update_it_staff(self, staff_id: int, staff_data: ITStaffUpdate) -> Optional[ITStaff]:
+        return await self.db.run_sync(lambda db: ITStaffService(db).update_it_staff(staff_id, staff_data))
+
+    @async_retry_on_locked
+    async def delete_it_staff(self, staff_id: int) -> bool:
+        return await self.db.run_sync(lambda db: ITStaffService(db).delete_it_staff(staff_id))
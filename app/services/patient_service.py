@@ -1,53 +1,162 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.db.group_commit import commit_write
+from app.db.sqlite import async_retry_on_locked, retry_on_locked
+from app.db.versions import table_version
+from app.db.write_tokens import reads_own_writes
 from app.models.patient import Patient
-from app.schemas.patient import PatientCreate, PatientUpdate
+from app.schemas.bulk import BulkItemResult, ImportReport
+from app.schemas.patient import PatientCreate, PatientLookup, PatientUpdate
+from app.utils.bulk import bulk_insert, bulk_lookup
+from app.utils.cache import EntityCache
+from app.utils.importer import import_file
+from app.utils.pagination import PageParams, apply_filters, paginate
+from app.utils.serialization import FileFormat
+
+
+_cache = EntityCache("patients")
+
+
+def _constraint_message(error: IntegrityError) -> str:
+    if "UNIQUE constraint failed: patients.email" in str(error):
+        return "Email already exists"
+    elif "UNIQUE constraint failed: patients.patient_id" in str(error):
+        return "Patient ID already exists"
+    return "Database constraint violation"
 
 
 class PatientService:
     def __init__(self, db: Session):
         self.db = db
 
+    @retry_on_locked
     def create_patient(self, patient_data: PatientCreate) -> Patient:
-        db_patient = Patient(**patient_data.dict())
-        self.db.add(db_patient)
         try:
-            self.db.commit()
-            self.db.refresh(db_patient)
+            db_patient = commit_write(self.db, Patient, lambda db: db.scalar(
+                insert(Patient).values(**patient_data.dict()).returning(Patient)
+            ))
             return db_patient
         except IntegrityError as e:
-            self.db.rollback()
-            if "UNIQUE constraint failed: patients.email" in str(e):
-                raise ValueError("Email already exists")
-            elif "UNIQUE constraint failed: patients.patient_id" in str(e):
-                raise ValueError("Patient ID already exists")
-            else:
-                raise ValueError("Database constraint violation")
+            raise ValueError(_constraint_message(e))
+
+    @retry_on_locked
+    def create_patients_bulk(self, items: List[PatientCreate]) -> List[BulkItemResult]:
+        rows = [item.dict() for item in items]
+        return bulk_insert(self.db, Patient, rows, _constraint_message)
+
+    def import_patients(self, file: BinaryIO, format: FileFormat) -> ImportReport:
+        return import_file(self.db, Patient, PatientCreate, file, format, _constraint_message)
 
     def get_patient(self, patient_id: int) -> Optional[Patient]:
-        return self.db.query(Patient).filter(Patient.id == patient_id).first()
+        return _cache.get_or_load(
+            patient_id, lambda: self._load_patient(patient_id), refresh=reads_own_writes(self.db)
+        )
+
+    def _load_patient(self, patient_id: int) -> Optional[Patient]:
+        patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
+        if patient is not None:
+            self.db.expunge(patient)
+        return patient
 
     def get_patient_by_patient_id(self, patient_id: str) -> Optional[Patient]:
         return self.db.query(Patient).filter(Patient.patient_id == patient_id).first()
 
-    def get_patients(self, skip: int = 0, limit: int = 100) -> List[Patient]:
-        return self.db.query(Patient).offset(skip).limit(limit).all()
+    def get_patients(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Patient]:
+        page = PageParams(skip=skip, limit=limit, after=None if after_id is None else (after_id,))
+        return self.db.scalars(paginate(select(Patient), Patient, page)).all()
+
+    def get_patient_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """One filtered, sorted page of plain column dicts; no ORM objects are built."""
+        columns = [getattr(Patient, name) for name in fields]
+        stmt = paginate(apply_filters(select(*columns), Patient, filters), Patient, page)
+        return [row._asdict() for row in self.db.execute(stmt)]
+
+    def lookup_patient_rows(self, fields: List[str], lookup: PatientLookup) -> List[Optional[Dict[str, Any]]]:
+        """Rows for the requested keys, in request order; None where no record matches."""
+        column, keys = lookup.lookup_key()
+        return bulk_lookup(self.db, Patient, column, keys, fields)
 
+    def iter_patient_rows(
+        self,
+        fields: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every matching row in id order, one batch at a time, from a single streamed query."""
+        columns = [getattr(Patient, name) for name in fields]
+        stmt = apply_filters(select(*columns), Patient, filters).order_by(Patient.id).execution_options(
+            yield_per=batch_size or settings.export_batch_size
+        )
+        for partition in self.db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    def get_patients_version(self) -> Optional[int]:
+        """Write counter for the patients table; changes whenever any row does."""
+        return table_version(self.db, "patients")
+
+    @retry_on_locked
     def update_patient(self, patient_id: int, patient_data: PatientUpdate) -> Optional[Patient]:
-        db_patient = self.get_patient(patient_id)
-        if db_patient:
-            update_data = patient_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_patient, field, value)
-            self.db.commit()
-            self.db.refresh(db_patient)
+        update_data = patient_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.get_patient(patient_id)
+        db_patient = commit_write(self.db, Patient, lambda db: db.scalar(
+            update(Patient)
+            .where(Patient.id == patient_id)
+            .values(**update_data)
+            .returning(Patient)
+        ))
+        _cache.invalidate(patient_id)
         return db_patient
 
+    @retry_on_locked
     def delete_patient(self, patient_id: int) -> bool:
-        db_patient = self.get_patient(patient_id)
-        if db_patient:
-            self.db.delete(db_patient)
-            self.db.commit()
-            return True
-        return False
+        deleted_id = commit_write(self.db, Patient, lambda db: db.scalar(
+            delete(Patient).where(Patient.id == patient_id).returning(Patient.id)
+        ))
+        _cache.invalidate(patient_id)
+        return deleted_id is not None
+
+
+class AsyncPatientService:
+    """Runs PatientService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @async_retry_on_locked
+    async def create_patient(self, patient_data: PatientCreate) -> Patient:
+        return await self.db.run_sync(lambda db: PatientService(db).create_patient(patient_data))
+
+    async def get_patient(self, patient_id: int) -> Optional[Patient]:
+        return await self.db.run_sync(lambda db: PatientService(db).get_patient(patient_id))
+
+    async def get_patient_by_patient_id(self, patient_id: str) -> Optional[Patient]:
+        return await self.db.run_sync(lambda db: PatientService(db).get_patient_by_patient_id(patient_id))
+
+    async def get_patients(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Patient]:
+        return await self.db.run_sync(lambda db: PatientService(db).get_patients(skip=skip, limit=limit, after_id=after_id))
+
+    async def get_patient_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: PatientService(db).get_patient_rows(fields, page, filters))
+
+    async def lookup_patient_rows(self, fields: List[str], lookup: PatientLookup) -> List[Optional[Dict[str, Any]]]:
+        return await self.db.run_sync(lambda db: PatientService(db).lookup_patient_rows(fields, lookup))
+
+    async def get_patients_version(self) -> Optional[int]:
+        return await self.db.run_sync(lambda db: PatientService(db).get_patients_version())
+
+    @async_retry_on_locked
+    async def update_patient(self, patient_id: int, patient_data: PatientUpdate) -> Optional[Patient]:
+        return await self.db.run_sync(lambda db: PatientService(db).update_patient(patient_id, patient_data))
+
+    @async_retry_on_locked
+    async def delete_patient(self, patient_id: int) -> bool:
+        return await self.db.run_sync(lambda db: PatientService(db).delete_patient(patient_id))
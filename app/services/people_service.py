@@ -0,0 +1,99 @@
+import heapq
+import itertools
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from app.db.search import PEOPLE_FTS, RANK_WEIGHTS, SEARCH_SOURCES
+from app.schemas.people import PersonDomain
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Only word characters are kept, so user input can't inject FTS5 syntax;
+    "smi jo" becomes '"smi"* "jo"*' and an email splits into its parts.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+_MATCH = f"{PEOPLE_FTS} MATCH :match{{domain_filter}}"
+
+_SEARCH_SQL = (
+    f"SELECT domain, entity_id AS id, person_id, first_name, last_name, email, "
+    f"bm25({PEOPLE_FTS}, {', '.join(str(w) for w in RANK_WEIGHTS)}) AS score, rowid "
+    f"FROM {PEOPLE_FTS} WHERE {_MATCH} "
+    f"ORDER BY score, rowid "
+    f"LIMIT :limit OFFSET :skip"
+)
+
+
+class PeopleService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self, query: str, skip: int = 0, limit: int = 20, domain: Optional[PersonDomain] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank people across every domain by how well they match `query`.
+
+        Every match is scored; with LIMIT, SQLite keeps only the best
+        `skip + limit` rows while it sorts, so broad queries cost one pass
+        over their matches rather than a full sort.
+
+        When the domains live in separate databases, each one is searched and
+        the results are merged by score. bm25 weighs a term by how rare it is
+        in the index it is scored against, so the merged order is close to,
+        but not exactly, what one shared index would give.
+        """
+        match = _match_expression(query)
+        if match is None:
+            return []
+        shards = list(dict.fromkeys(
+            self.db.engine_for(table)
+            for source_domain, table, _, _ in SEARCH_SOURCES
+            if domain is None or source_domain == domain.value
+        ))
+        if len(shards) == 1:
+            rows = self._search(shards[0], match, skip, limit, domain)
+        else:
+            ranked = heapq.merge(
+                *(self._search(shard, match, 0, skip + limit, domain) for shard in shards),
+                key=lambda row: (row["score"], row["rowid"]),
+            )
+            rows = list(itertools.islice(ranked, skip, skip + limit))
+        for row in rows:
+            del row["score"], row["rowid"]
+        return rows
+
+    def _search(
+        self, shard: Engine, match: str, skip: int, limit: int, domain: Optional[PersonDomain]
+    ) -> List[Dict[str, Any]]:
+        bind_arguments = {"bind": shard}
+        params = {"match": match, "limit": limit, "skip": skip}
+        domain_filter = ""
+        if domain is not None:
+            domain_filter = " AND domain = :domain"
+            params["domain"] = domain.value
+
+        stmt = text(_SEARCH_SQL.format(domain_filter=domain_filter))
+        return [row._asdict() for row in self.db.execute(stmt, params, bind_arguments=bind_arguments)]
+
+
+class AsyncPeopleService:
+    """Runs PeopleService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 20, domain: Optional[PersonDomain] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: PeopleService(db).search(query, skip, limit, domain))
@@ -1,53 +1,169 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.db.group_commit import commit_write
+from app.db.sqlite import async_retry_on_locked, retry_on_locked
+from app.db.versions import table_version
+from app.db.write_tokens import reads_own_writes
 from app.models.staff import Staff
-from app.schemas.staff import StaffCreate, StaffUpdate
+from app.schemas.bulk import BulkItemResult, BulkUpsertResponse, ImportReport
+from app.schemas.staff import StaffCreate, StaffLookup, StaffUpdate
+from app.utils.bulk import bulk_insert, bulk_lookup, bulk_upsert
+from app.utils.cache import EntityCache
+from app.utils.importer import import_file
+from app.utils.pagination import PageParams, apply_filters, paginate
+from app.utils.serialization import FileFormat
+
+
+_cache = EntityCache("staff")
+
+
+def _constraint_message(error: IntegrityError) -> str:
+    if "UNIQUE constraint failed: staff.email" in str(error):
+        return "Email already exists"
+    elif "UNIQUE constraint failed: staff.staff_id" in str(error):
+        return "Staff ID already exists"
+    return "Database constraint violation"
 
 
 class StaffService:
     def __init__(self, db: Session):
         self.db = db
 
+    @retry_on_locked
     def create_staff(self, staff_data: StaffCreate) -> Staff:
-        db_staff = Staff(**staff_data.dict())
-        self.db.add(db_staff)
         try:
-            self.db.commit()
-            self.db.refresh(db_staff)
+            db_staff = commit_write(self.db, Staff, lambda db: db.scalar(
+                insert(Staff).values(**staff_data.dict()).returning(Staff)
+            ))
             return db_staff
         except IntegrityError as e:
-            self.db.rollback()
-            if "UNIQUE constraint failed: staff.email" in str(e):
-                raise ValueError("Email already exists")
-            elif "UNIQUE constraint failed: staff.staff_id" in str(e):
-                raise ValueError("Staff ID already exists")
-            else:
-                raise ValueError("Database constraint violation")
+            raise ValueError(_constraint_message(e))
+
+    @retry_on_locked
+    def create_staff_bulk(self, items: List[StaffCreate]) -> List[BulkItemResult]:
+        rows = [item.dict() for item in items]
+        return bulk_insert(self.db, Staff, rows, _constraint_message)
+
+    def import_staff(self, file: BinaryIO, format: FileFormat) -> ImportReport:
+        return import_file(self.db, Staff, StaffCreate, file, format, _constraint_message)
+
+    @retry_on_locked
+    def upsert_staff(self, items: List[StaffCreate]) -> BulkUpsertResponse:
+        rows = [item.dict() for item in items]
+        result = bulk_upsert(self.db, Staff, "staff_id", rows, _constraint_message)
+        _cache.clear()
+        return result
 
     def get_staff(self, staff_id: int) -> Optional[Staff]:
-        return self.db.query(Staff).filter(Staff.id == staff_id).first()
+        return _cache.get_or_load(
+            staff_id, lambda: self._load_staff(staff_id), refresh=reads_own_writes(self.db)
+        )
+
+    def _load_staff(self, staff_id: int) -> Optional[Staff]:
+        staff = self.db.query(Staff).filter(Staff.id == staff_id).first()
+        if staff is not None:
+            self.db.expunge(staff)
+        return staff
 
     def get_staff_by_staff_id(self, staff_id: str) -> Optional[Staff]:
         return self.db.query(Staff).filter(Staff.staff_id == staff_id).first()
 
-    def get_staff_list(self, skip: int = 0, limit: int = 100) -> List[Staff]:
-        return self.db.query(Staff).offset(skip).limit(limit).all()
+    def get_staff_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Staff]:
+        page = PageParams(skip=skip, limit=limit, after=None if after_id is None else (after_id,))
+        return self.db.scalars(paginate(select(Staff), Staff, page)).all()
+
+    def get_staff_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """One filtered, sorted page of plain column dicts; no ORM objects are built."""
+        columns = [getattr(Staff, name) for name in fields]
+        stmt = paginate(apply_filters(select(*columns), Staff, filters), Staff, page)
+        return [row._asdict() for row in self.db.execute(stmt)]
+
+    def lookup_staff_rows(self, fields: List[str], lookup: StaffLookup) -> List[Optional[Dict[str, Any]]]:
+        """Rows for the requested keys, in request order; None where no record matches."""
+        column, keys = lookup.lookup_key()
+        return bulk_lookup(self.db, Staff, column, keys, fields)
 
+    def iter_staff_rows(
+        self,
+        fields: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every matching row in id order, one batch at a time, from a single streamed query."""
+        columns = [getattr(Staff, name) for name in fields]
+        stmt = apply_filters(select(*columns), Staff, filters).order_by(Staff.id).execution_options(
+            yield_per=batch_size or settings.export_batch_size
+        )
+        for partition in self.db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    def get_staff_version(self) -> Optional[int]:
+        """Write counter for the staff table; changes whenever any row does."""
+        return table_version(self.db, "staff")
+
+    @retry_on_locked
     def update_staff(self, staff_id: int, staff_data: StaffUpdate) -> Optional[Staff]:
-        db_staff = self.get_staff(staff_id)
-        if db_staff:
-            update_data = staff_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_staff, field, value)
-            self.db.commit()
-            self.db.refresh(db_staff)
+        update_data = staff_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.get_staff(staff_id)
+        db_staff = commit_write(self.db, Staff, lambda db: db.scalar(
+            update(Staff)
+            .where(Staff.id == staff_id)
+            .values(**update_data)
+            .returning(Staff)
+        ))
+        _cache.invalidate(staff_id)
         return db_staff
 
+    @retry_on_locked
     def delete_staff(self, staff_id: int) -> bool:
-        db_staff = self.get_staff(staff_id)
-        if db_staff:
-            self.db.delete(db_staff)
-            self.db.commit()
-            return True
-        return False
+        deleted_id = commit_write(self.db, Staff, lambda db: db.scalar(
+            delete(Staff).where(Staff.id == staff_id).returning(Staff.id)
+        ))
+        _cache.invalidate(staff_id)
+        return deleted_id is not None
+
+
+class AsyncStaffService:
+    """Runs StaffService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @async_retry_on_locked
+    async def create_staff(self, staff_data: StaffCreate) -> Staff:
+        return await self.db.run_sync(lambda db: StaffService(db).create_staff(staff_data))
+
+    async def get_staff(self, staff_id: int) -> Optional[Staff]:
+        return await self.db.run_sync(lambda db: StaffService(db).get_staff(staff_id))
+
+    async def get_staff_by_staff_id(self, staff_id: str) -> Optional[Staff]:
+        return await self.db.run_sync(lambda db: StaffService(db).get_staff_by_staff_id(staff_id))
+
+    async def get_staff_list(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Staff]:
+        return await self.db.run_sync(lambda db: StaffService(db).get_staff_list(skip=skip, limit=limit, after_id=after_id))
+
+    async def get_staff_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: StaffService(db).get_staff_rows(fields, page, filters))
+
+    async def lookup_staff_rows(self, fields: List[str], lookup: StaffLookup) -> List[Optional[Dict[str, Any]]]:
+        return await self.db.run_sync(lambda db: StaffService(db).lookup_staff_rows(fields, lookup))
+
+    async def get_staff_version(self) -> Optional[int]:
+        return await self.db.run_sync(lambda db: StaffService(db).get_staff_version())
+
+    @async_retry_on_locked
+    async def update_staff(self, staff_id: int, staff_data: StaffUpdate) -> Optional[Staff]:
+        return await self.db.run_sync(lambda db: StaffService(db).update_staff(staff_id, staff_data))
+
+    @async_retry_on_locked
+    async def delete_staff(self, staff_id: int) -> bool:
+        return await self.db.run_sync(lambda db: StaffService(db).delete_staff(staff_id))
@@ -1,53 +1,169 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.db.group_commit import commit_write
+from app.db.sqlite import async_retry_on_locked, retry_on_locked
+from app.db.versions import table_version
+from app.db.write_tokens import reads_own_writes
 from app.models.student import Student
-from app.schemas.student import StudentCreate, StudentUpdate
+from app.schemas.bulk import BulkItemResult, BulkUpsertResponse, ImportReport
+from app.schemas.student import StudentCreate, StudentLookup, StudentUpdate
+from app.utils.bulk import bulk_insert, bulk_lookup, bulk_upsert
+from app.utils.cache import EntityCache
+from app.utils.importer import import_file
+from app.utils.pagination import PageParams, apply_filters, paginate
+from app.utils.serialization import FileFormat
+
+
+_cache = EntityCache("students")
+
+
+def _constraint_message(error: IntegrityError) -> str:
+    if "UNIQUE constraint failed: students.email" in str(error):
+        return "Email already exists"
+    elif "UNIQUE constraint failed: students.student_id" in str(error):
+        return "Student ID already exists"
+    return "Database constraint violation"
 
 
 class StudentService:
     def __init__(self, db: Session):
         self.db = db
 
+    @retry_on_locked
     def create_student(self, student_data: StudentCreate) -> Student:
-        db_student = Student(**student_data.dict())
-        self.db.add(db_student)
         try:
-            self.db.commit()
-            self.db.refresh(db_student)
+            db_student = commit_write(self.db, Student, lambda db: db.scalar(
+                insert(Student).values(**student_data.dict()).returning(Student)
+            ))
             return db_student
         except IntegrityError as e:
-            self.db.rollback()
-            if "UNIQUE constraint failed: students.email" in str(e):
-                raise ValueError("Email already exists")
-            elif "UNIQUE constraint failed: students.student_id" in str(e):
-                raise ValueError("Student ID already exists")
-            else:
-                raise ValueError("Database constraint violation")
+            raise ValueError(_constraint_message(e))
+
+    @retry_on_locked
+    def create_students_bulk(self, items: List[StudentCreate]) -> List[BulkItemResult]:
+        rows = [item.dict() for item in items]
+        return bulk_insert(self.db, Student, rows, _constraint_message)
+
+    def import_students(self, file: BinaryIO, format: FileFormat) -> ImportReport:
+        return import_file(self.db, Student, StudentCreate, file, format, _constraint_message)
+
+    @retry_on_locked
+    def upsert_students(self, items: List[StudentCreate]) -> BulkUpsertResponse:
+        rows = [item.dict() for item in items]
+        result = bulk_upsert(self.db, Student, "student_id", rows, _constraint_message)
+        _cache.clear()
+        return result
 
     def get_student(self, student_id: int) -> Optional[Student]:
-        return self.db.query(Student).filter(Student.id == student_id).first()
+        return _cache.get_or_load(
+            student_id, lambda: self._load_student(student_id), refresh=reads_own_writes(self.db)
+        )
+
+    def _load_student(self, student_id: int) -> Optional[Student]:
+        student = self.db.query(Student).filter(Student.id == student_id).first()
+        if student is not None:
+            self.db.expunge(student)
+        return student
 
     def get_student_by_student_id(self, student_id: str) -> Optional[Student]:
         return self.db.query(Student).filter(Student.student_id == student_id).first()
 
-    def get_students(self, skip: int = 0, limit: int = 100) -> List[Student]:
-        return self.db.query(Student).offset(skip).limit(limit).all()
+    def get_students(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Student]:
+        page = PageParams(skip=skip, limit=limit, after=None if after_id is None else (after_id,))
+        return self.db.scalars(paginate(select(Student), Student, page)).all()
+
+    def get_student_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """One filtered, sorted page of plain column dicts; no ORM objects are built."""
+        columns = [getattr(Student, name) for name in fields]
+        stmt = paginate(apply_filters(select(*columns), Student, filters), Student, page)
+        return [row._asdict() for row in self.db.execute(stmt)]
+
+    def lookup_student_rows(self, fields: List[str], lookup: StudentLookup) -> List[Optional[Dict[str, Any]]]:
+        """Rows for the requested keys, in request order; None where no record matches."""
+        column, keys = lookup.lookup_key()
+        return bulk_lookup(self.db, Student, column, keys, fields)
 
+    def iter_student_rows(
+        self,
+        fields: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every matching row in id order, one batch at a time, from a single streamed query."""
+        columns = [getattr(Student, name) for name in fields]
+        stmt = apply_filters(select(*columns), Student, filters).order_by(Student.id).execution_options(
+            yield_per=batch_size or settings.export_batch_size
+        )
+        for partition in self.db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    def get_students_version(self) -> Optional[int]:
+        """Write counter for the students table; changes whenever any row does."""
+        return table_version(self.db, "students")
+
+    @retry_on_locked
     def update_student(self, student_id: int, student_data: StudentUpdate) -> Optional[Student]:
-        db_student = self.get_student(student_id)
-        if db_student:
-            update_data = student_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_student, field, value)
-            self.db.commit()
-            self.db.refresh(db_student)
+        update_data = student_data.dict(exclude_unset=True)
+        if not update_data:
+            return self.get_student(student_id)
+        db_student = commit_write(self.db, Student, lambda db: db.scalar(
+            update(Student)
+            .where(Student.id == student_id)
+            .values(**update_data)
+            .returning(Student)
+        ))
+        _cache.invalidate(student_id)
         return db_student
 
+    @retry_on_locked
     def delete_student(self, student_id: int) -> bool:
-        db_student = self.get_student(student_id)
-        if db_student:
-            self.db.delete(db_student)
-            self.db.commit()
-            return True
-        return False
\ No newline at end of file
+        deleted_id = commit_write(self.db, Student, lambda db: db.scalar(
+            delete(Student).where(Student.id == student_id).returning(Student.id)
+        ))
+        _cache.invalidate(student_id)
+        return deleted_id is not None
+
+
+class AsyncStudentService:
+    """Runs StudentService on an AsyncSession so endpoints don't tie up a worker thread."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @async_retry_on_locked
+    async def create_student(self, student_data: StudentCreate) -> Student:
+        return await self.db.run_sync(lambda db: StudentService(db).create_student(student_data))
+
+    async def get_student(self, student_id: int) -> Optional[Student]:
+        return await self.db.run_sync(lambda db: StudentService(db).get_student(student_id))
+
+    async def get_student_by_student_id(self, student_id: str) -> Optional[Student]:
+        return await self.db.run_sync(lambda db: StudentService(db).get_student_by_student_id(student_id))
+
+    async def get_students(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Student]:
+        return await self.db.run_sync(lambda db: StudentService(db).get_students(skip=skip, limit=limit, after_id=after_id))
+
+    async def get_student_rows(
+        self, fields: List[str], page: PageParams, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.db.run_sync(lambda db: StudentService(db).get_student_rows(fields, page, filters))
+
+    async def lookup_student_rows(self, fields: List[str], lookup: StudentLookup) -> List[Optional[Dict[str, Any]]]:
+        return await self.db.run_sync(lambda db: StudentService(db).lookup_student_rows(fields, lookup))
+
+    async def get_students_version(self) -> Optional[int]:
+        return await self.db.run_sync(lambda db: StudentService(db).get_students_version())
+
+    @async_retry_on_locked
+    async def update_student(self, student_id: int, student_data: StudentUpdate) -> Optional[Student]:
+        return await self.db.run_sync(lambda db: StudentService(db).update_student(student_id, student_data))
+
+    @async_retry_on_locked
+    async def delete_student(self, student_id: int) -> bool:
+        return await self.db.run_sync(lambda db: StudentService(db).delete_student(student_id))
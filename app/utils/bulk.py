@@ -0,0 +1,195 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import utcnow
+from app.db.sqlite import begin_immediate
+from app.schemas.bulk import BulkItemResult, BulkUpsertResponse
+
+
+def bulk_insert(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    error_message: Callable[[IntegrityError], str],
+    batch_size: Optional[int] = None,
+) -> List[BulkItemResult]:
+    """
+    Insert `rows` into `model`'s table inside a single transaction.
+
+    Each batch is sent as one multi-row INSERT ... RETURNING id under a
+    SAVEPOINT. If a batch violates a constraint it is rolled back and replayed
+    row by row so the error can be pinned to the item that caused it; the
+    remaining rows are still inserted. Results are returned in input order.
+    """
+    batch_size = batch_size or settings.bulk_batch_size
+    # SQLite has no insert sentinel, so asking SQLAlchemy to keep RETURNING in
+    # parameter order makes it send one INSERT per row. Return the natural key
+    # alongside the id and match rows up by that instead.
+    key = _natural_key(model)
+    stmt = insert(model).returning(model.id, getattr(model, key))
+    results: List[BulkItemResult] = []
+
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                with db.begin_nested():
+                    ids = {value: new_id for new_id, value in db.execute(stmt, batch)}
+            except IntegrityError:
+                for offset, row in enumerate(batch):
+                    results.append(_insert_one(db, stmt, row, start + offset, error_message))
+            else:
+                results.extend(
+                    BulkItemResult(index=start + offset, id=ids[row[key]])
+                    for offset, row in enumerate(batch)
+                )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return results
+
+
+def _natural_key(model: Any) -> str:
+    """Name of the first unique, non-primary-key column (student_id, staff_id, ...)."""
+    for column in model.__table__.columns:
+        if column.unique and not column.primary_key:
+            return column.key
+    raise ValueError(f"{model.__name__} has no unique column to match RETURNING rows on")
+
+
+def _insert_one(
+    db: Session,
+    stmt: Any,
+    row: Dict[str, Any],
+    index: int,
+    error_message: Callable[[IntegrityError], str],
+) -> BulkItemResult:
+    try:
+        with db.begin_nested():
+            new_id = db.execute(stmt, row).one()[0]
+    except IntegrityError as e:
+        return BulkItemResult(index=index, error=error_message(e))
+    return BulkItemResult(index=index, id=new_id)
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    key: str,
+    rows: List[Dict[str, Any]],
+    error_message: Callable[[IntegrityError], str],
+    batch_size: Optional[int] = None,
+) -> BulkUpsertResponse:
+    """
+    Insert or update `rows` by the unique natural-key column `key`.
+
+    Each batch is one INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING.
+    The update only fires when a column actually differs and is the only
+    write that sets updated_at, so the returned rows tell inserted (NULL) and
+    updated rows apart, and keys that come back empty were unchanged. The
+    transaction takes the write lock up front, so a reconcile running beside
+    API writes waits its turn instead of failing with "database is locked".
+
+    When a key appears more than once in `rows` the last occurrence wins and
+    the earlier ones count as unchanged, so the counts add up to len(rows).
+    """
+    if not rows:
+        return BulkUpsertResponse()
+
+    batch_size = batch_size or settings.bulk_batch_size
+    key_column = getattr(model, key)
+
+    latest: Dict[Any, int] = {}
+    for index, row in enumerate(rows):
+        latest[row[key]] = index
+    indexes = sorted(latest.values())
+
+    stmt = _dialect_insert(db)(model)
+    update_columns = [name for name in rows[0] if name != key]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column],
+        set_={
+            **{name: getattr(stmt.excluded, name) for name in update_columns},
+            "updated_at": utcnow(),
+        },
+        where=or_(*[
+            getattr(model, name).is_distinct_from(getattr(stmt.excluded, name))
+            for name in update_columns
+        ]),
+    ).returning(key_column, model.updated_at)
+
+    result = BulkUpsertResponse(unchanged=len(rows) - len(indexes))
+    begin_immediate(db)
+    try:
+        for start in range(0, len(indexes), batch_size):
+            batch_indexes = indexes[start:start + batch_size]
+            batch = [rows[index] for index in batch_indexes]
+            keys = [row[key] for row in batch]
+            try:
+                with db.begin_nested():
+                    changed = dict(db.execute(stmt, batch).all())
+            except IntegrityError:
+                changed = {}
+                for index, row in zip(batch_indexes, batch):
+                    try:
+                        with db.begin_nested():
+                            changed.update(db.execute(stmt, [row]).all())
+                    except IntegrityError as e:
+                        result.errors.append(BulkItemResult(index=index, error=error_message(e)))
+                        keys.remove(row[key])
+
+            for value in keys:
+                if value not in changed:
+                    result.unchanged += 1
+                elif changed[value] is None:
+                    result.inserted += 1
+                else:
+                    result.updated += 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    result.failed = len(result.errors)
+    return result
+
+
+def _dialect_insert(db: Session) -> Callable[[Any], Any]:
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def bulk_lookup(
+    db: Session,
+    model: Any,
+    column: str,
+    keys: List[Any],
+    fields: List[str],
+    batch_size: Optional[int] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Plain column dicts for the rows whose `column` matches each of `keys`.
+
+    Keys are deduplicated and fetched with one `IN (...)` query per batch.
+    The result lines up with `keys`: the row for each key, or None where
+    there is no such row.
+    """
+    batch_size = batch_size or settings.bulk_batch_size
+    key_column = getattr(model, column)
+    columns = [getattr(model, name) for name in fields]
+
+    unique_keys = list(dict.fromkeys(keys))
+    found: Dict[Any, Dict[str, Any]] = {}
+    for start in range(0, len(unique_keys), batch_size):
+        batch = unique_keys[start:start + batch_size]
+        for key, *values in db.execute(select(key_column, *columns).where(key_column.in_(batch))):
+            found[key] = dict(zip(fields, values))
+    return [found.get(key) for key in keys]
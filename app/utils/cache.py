@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import ENTITY_CACHE_EVICTIONS, ENTITY_CACHE_REQUESTS, ENTITY_CACHE_SIZE
+
+T = TypeVar("T")
+
+
+class EntityCache:
+    """
+    Bounded LRU cache with a per-entry TTL for rows looked up by primary key.
+
+    Shared by every request in the process, so it is guarded by a lock, and
+    cached ORM instances must be expunged from the session that loaded them
+    (a rollback there would otherwise expire them under other requests). Each
+    worker process has its own cache; the TTL bounds how long a write made
+    through another worker can go unseen.
+    """
+
+    def __init__(self, name: str, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize or settings.entity_cache_size
+        self.ttl = ttl or settings.entity_cache_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a load that raced a write can tell
+        # its result may be stale and skip caching it.
+        self._generation = 0
+        self._hits = ENTITY_CACHE_REQUESTS.labels(name, "hit")
+        self._misses = ENTITY_CACHE_REQUESTS.labels(name, "miss")
+        self._size = ENTITY_CACHE_SIZE.labels(name)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Optional[T]], refresh: bool = False) -> Optional[T]:
+        """
+        Return the cached value for `key`, calling `load` on a miss. None is
+        never cached. With `refresh`, `load` is called and its result cached
+        whatever the cache holds.
+        """
+        if not settings.entity_cache_enabled:
+            return load()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = None if refresh else self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._hits.inc()
+                    return entry[1]
+                del self._entries[key]
+                ENTITY_CACHE_EVICTIONS.labels(self.name, "expired").inc()
+            generation = self._generation
+        self._misses.inc()
+
+        value = load()
+        if value is None:
+            return None
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    ENTITY_CACHE_EVICTIONS.labels(self.name, "size").inc()
+            self._size.set(len(self._entries))
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+            self._size.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size.set(0)
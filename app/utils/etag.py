@@ -0,0 +1,38 @@
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def row_etag(row: Any) -> str:
+    """Strong ETag for one row, from its id and last write time."""
+    stamp = row.updated_at or row.created_at
+    return f'"{row.id}-{stamp.isoformat() if stamp else ""}"'
+
+
+def table_etag(table: str, version: Optional[int]) -> Optional[str]:
+    """ETag for any read of `table` that only depends on its contents and the URL."""
+    if version is None:
+        return None
+    return f'"{table}-v{version}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """True when the client's If-None-Match already covers `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if etag is None or not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    if etag is not None:
+        response.headers["ETag"] = etag
@@ -0,0 +1,67 @@
+import csv
+import io
+from typing import Any, Callable, Dict, Iterator, List
+
+from sqlalchemy.orm import Session
+from starlette.responses import StreamingResponse
+
+from app.db.base import ReadSessionLocal
+from app.utils.serialization import FileFormat, RowSerializer
+
+
+MEDIA_TYPES = {
+    FileFormat.ndjson: "application/x-ndjson",
+    FileFormat.csv: "text/csv",  # Starlette appends "; charset=utf-8"
+}
+
+
+def stream_export(
+    fetch: Callable[[Session], Iterator[List[Dict[str, Any]]]],
+    serializer: RowSerializer,
+    format: FileFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream the row batches produced by `fetch` as NDJSON or CSV.
+
+    `fetch` is called with a session owned by the stream itself, so the
+    query stays open for exactly as long as the client is reading and only
+    one batch of rows is held in memory at a time.
+    """
+    encode = _encode_ndjson if format == FileFormat.ndjson else _encode_csv
+
+    def body() -> Iterator[bytes]:
+        db = ReadSessionLocal()
+        try:
+            yield from encode(fetch(db), serializer)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'},
+    )
+
+
+def _encode_ndjson(batches: Iterator[List[Dict[str, Any]]], serializer: RowSerializer) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(serializer.dump_row(row) + b"\n" for row in batch)
+
+
+def _encode_csv(batches: Iterator[List[Dict[str, Any]]], serializer: RowSerializer) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(serializer.fields)
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    for batch in batches:
+        for row in serializer.to_jsonable(batch):
+            writer.writerow(
+                "" if value is None else str(value).lower() if isinstance(value, bool) else value
+                for value in row.values()
+            )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.sqlite import run_with_lock_retry
+from app.schemas.bulk import ImportReport, ImportRowError
+from app.utils.bulk import bulk_insert
+from app.utils.serialization import FileFormat
+
+
+def import_file(
+    db: Session,
+    model: Any,
+    schema: Type[BaseModel],
+    file: BinaryIO,
+    format: FileFormat,
+    error_message: Callable[[IntegrityError], str],
+    batch_size: Optional[int] = None,
+) -> ImportReport:
+    """
+    Import a CSV or NDJSON upload into `model`'s table.
+
+    The file is read one record at a time and validated against `schema`.
+    Valid rows are inserted `batch_size` at a time, each batch in its own
+    transaction, so memory use is bounded by the batch size and the write
+    lock is released between batches. Rows that fail parsing, validation or
+    a constraint are reported by line number; everything else is imported.
+    """
+    batch_size = batch_size or settings.import_batch_size
+    report = ImportReport()
+    batch: List[Dict[str, Any]] = []
+    lines: List[int] = []
+
+    def flush() -> None:
+        results = run_with_lock_retry(
+            db, lambda: bulk_insert(db, model, batch, error_message)
+        )
+        report.batches += 1
+        for line, result in zip(lines, results):
+            if result.error is None:
+                report.imported += 1
+            else:
+                _add_error(report, line, result.error)
+        batch.clear()
+        lines.clear()
+
+    for line, record in _iter_records(file, format):
+        report.total_rows += 1
+        if isinstance(record, str):
+            _add_error(report, line, record)
+            continue
+        try:
+            item = schema.model_validate(record)
+        except ValidationError as e:
+            _add_error(report, line, _validation_message(e))
+            continue
+        batch.append(item.dict())
+        lines.append(line)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
+
+
+def _iter_records(file: BinaryIO, format: FileFormat) -> Iterator[Tuple[int, Union[Dict[str, Any], str]]]:
+    """Yield (line number, record) pairs; unparseable lines yield an error string instead."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if format == FileFormat.csv:
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Empty cells mean "not given" so schema defaults apply.
+                yield reader.line_num, {
+                    key: value for key, value in row.items()
+                    if key is not None and value != ""
+                }
+        else:
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError as e:
+                    yield line, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line, "Expected a JSON object"
+                    continue
+                yield line, record
+    except UnicodeDecodeError:
+        yield 0, "File is not valid UTF-8"
+    finally:
+        # Leave the upload's underlying file open for its owner to close.
+        text.detach()
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _add_error(report: ImportReport, line: int, message: str) -> None:
+    report.failed += 1
+    if len(report.errors) < settings.import_max_errors:
+        report.errors.append(ImportRowError(line=line, error=message))
+    else:
+        report.errors_truncated = True
@@ -0,0 +1,160 @@
+import base64
+import inspect
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from app.core.config import settings
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class SortKey(str, Enum):
+    """Allowed list orderings. A leading '-' sorts descending; id breaks ties."""
+
+    id = "id"
+    id_desc = "-id"
+    last_name = "last_name"
+    last_name_desc = "-last_name"
+
+    @property
+    def column(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+
+@dataclass
+class PageParams:
+    skip: int = 0
+    limit: int = 100
+    sort: SortKey = SortKey.id
+    # Sort key of the last row already seen: (id,) or (sort value, id)
+    after: Optional[Tuple[Any, ...]] = None
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _cursor_key(values: List[Any], sort: SortKey) -> Optional[Tuple[Any, ...]]:
+    """Validate decoded cursor values against the requested sort."""
+    if sort.column == "id":
+        if len(values) != 1:
+            return None
+        key = (values[0],)
+    else:
+        # Cursors for other sorts carry the sort they were issued for, so a
+        # cursor can't silently be replayed against a different ordering.
+        if len(values) != 3 or values[0] != sort.value or not isinstance(values[1], str):
+            return None
+        key = (values[1], values[2])
+    last_id = key[-1]
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        return None
+    return key
+
+
+async def page_params(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    sort: SortKey = SortKey.id,
+    cursor: Optional[str] = None,
+) -> PageParams:
+    """
+    Common pagination and sorting parameters for list endpoints.
+
+    When a cursor is given the page starts right after the row it points at
+    (keyset pagination) and `skip` is ignored. Declared async so FastAPI
+    resolves it on the event loop instead of the threadpool.
+    """
+    if cursor is None:
+        return PageParams(skip=skip, limit=limit, sort=sort)
+    try:
+        after = _cursor_key(decode_cursor(cursor), sort)
+    except ValueError:
+        after = None
+    if after is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return PageParams(skip=0, limit=limit, sort=sort, after=after)
+
+
+def filter_params(schema: Type[BaseModel]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """
+    Build a dependency that reads the fields of `schema` as optional query
+    parameters and returns only the ones the client actually sent.
+
+    The schema is the per-domain allowlist: anything not declared on it is
+    never turned into a WHERE clause.
+    """
+    async def dependency(**values: Any) -> Dict[str, Any]:
+        return {name: value for name, value in values.items() if value is not None}
+
+    dependency.__signature__ = inspect.Signature([
+        inspect.Parameter(
+            name, inspect.Parameter.KEYWORD_ONLY, default=Query(None), annotation=field.annotation
+        )
+        for name, field in schema.model_fields.items()
+    ])
+    return dependency
+
+
+def apply_filters(stmt: Select, model: Any, filters: Optional[Dict[str, Any]]) -> Select:
+    """Add an equality condition for every filter; keys must be model columns."""
+    if filters:
+        stmt = stmt.where(*(getattr(model, name) == value for name, value in filters.items()))
+    return stmt
+
+
+def paginate(stmt: Select, model: Any, page: PageParams) -> Select:
+    """Order, window and limit a select over `model` according to `page`."""
+    keys = [model.id] if page.sort.column == "id" else [getattr(model, page.sort.column), model.id]
+    if page.sort.descending:
+        stmt = stmt.order_by(*(key.desc() for key in keys))
+    else:
+        stmt = stmt.order_by(*keys)
+    if page.after is not None:
+        # Row-value comparison, so SQLite can seek straight into the index.
+        current = keys[0] if len(keys) == 1 else tuple_(*keys)
+        last = page.after[0] if len(keys) == 1 else tuple_(*page.after)
+        stmt = stmt.where(current < last if page.sort.descending else current > last)
+    elif page.skip:
+        stmt = stmt.offset(page.skip)
+    return stmt.limit(page.limit)
+
+
+def set_next_cursor(response: Response, items: List[Any], page: PageParams) -> None:
+    """Advertise the cursor for the next page when the current page is full."""
+    if len(items) == page.limit:
+        last = items[-1]
+        if not isinstance(last, dict):
+            last = {"id": last.id, page.sort.column: getattr(last, page.sort.column)}
+        if page.sort.column == "id":
+            cursor = encode_cursor(last["id"])
+        else:
+            cursor = encode_cursor(page.sort.value, last[page.sort.column], last["id"])
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,38 @@
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Tuple
+
+from fastapi import APIRouter
+
+
+class RouteSpec(NamedTuple):
+    path: str
+    endpoint: Callable[..., Any]
+    kwargs: Dict[str, Any]
+
+    @property
+    def key(self) -> Tuple[str, FrozenSet[str]]:
+        return self.path, frozenset(self.kwargs.get("methods") or ())
+
+
+class LazyRouter(APIRouter):
+    """
+    An APIRouter that records its routes instead of building them.
+
+    FastAPI builds a route (dependency graph, request and response models)
+    when it is declared and again each time its router is included, so a
+    route declared in an endpoint module, included under /{domain} and then
+    under /api/v1 was built three times, and the async variants were built
+    even in sync mode. Recorded routes are built once, by mount(), at their
+    final path, and only if they are mounted at all.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.specs: List[RouteSpec] = []
+
+    def add_api_route(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self.specs.append(RouteSpec(path, endpoint, kwargs))
+
+    def mount(self, target: APIRouter, prefix: str = "") -> None:
+        """Build every recorded route on `target`, under `prefix`."""
+        for spec in self.specs:
+            target.add_api_route(prefix + spec.path, spec.endpoint, **spec.kwargs)
@@ -0,0 +1,60 @@
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+from typing_extensions import TypedDict
+
+
+class FileFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @classmethod
+    def from_filename(cls, filename: str) -> "FileFormat":
+        return cls.csv if (filename or "").lower().endswith(".csv") else cls.ndjson
+
+
+class JSONBytesResponse(Response):
+    """JSON response whose body has already been encoded to bytes."""
+
+    media_type = "application/json"
+
+
+class RowSerializer:
+    """
+    Serialize plain database rows with the field layout of a response schema.
+
+    FastAPI's default pipeline hydrates ORM objects, validates each one into
+    the response model and then re-encodes the result. Rows selected straight
+    from the table are already trusted and correctly typed, so they are dumped
+    through a TypeAdapter over a TypedDict mirror of the schema instead: no
+    validation pass, and the output is byte-identical to the default encoder.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.fields: List[str] = list(schema.model_fields)
+        row_type = TypedDict(
+            f"{schema.__name__}Row",
+            {name: field.annotation for name, field in schema.model_fields.items()},
+        )
+        self._row_adapter = TypeAdapter(row_type)
+        self._adapter = TypeAdapter(List[row_type])
+        self._lookup_adapter = TypeAdapter(List[Optional[row_type]])
+
+    def dump(self, rows: List[Mapping[str, Any]]) -> bytes:
+        return self._adapter.dump_json(rows)
+
+    def dump_row(self, row: Mapping[str, Any]) -> bytes:
+        return self._row_adapter.dump_json(row)
+
+    def to_jsonable(self, rows: List[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows with values converted to JSON-compatible Python types."""
+        return self._adapter.dump_python(rows, mode="json")
+
+    def response(self, rows: List[Dict[str, Any]], **kwargs: Any) -> JSONBytesResponse:
+        return JSONBytesResponse(self.dump(rows), **kwargs)
+
+    def lookup_response(self, rows: List[Optional[Dict[str, Any]]], **kwargs: Any) -> JSONBytesResponse:
+        """Like response(), with null standing in for keys that matched nothing."""
+        return JSONBytesResponse(self._lookup_adapter.dump_json(rows), **kwargs)
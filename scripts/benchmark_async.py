@@ -0,0 +1,148 @@
+"""
+Compare the sync (threadpool) and async (AsyncEngine) database paths.
+
+Starts the app under uvicorn once per mode against a fresh SQLite file, seeds
+it through the bulk endpoint, then hammers GET /students/{id} and
+GET /students/ with a fixed number of concurrent clients and reports
+throughput and latency percentiles.
+
+    python scripts/benchmark_async.py --concurrency 256 --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(port, db_path, async_mode):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        DATABASE_URLS="{}",
+        ASYNC_DATABASE="true" if async_mode else "false",
+        DEBUG="false",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_ready(client):
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def seed(client, rows):
+    for start in range(0, rows, 1000):
+        batch = [
+            {
+                "student_id": f"BENCH{i:08d}",
+                "first_name": "Bench",
+                "last_name": f"Student{i}",
+                "email": f"bench{i}@example.edu",
+                "major": "Computer Science",
+                "year": i % 4 + 1,
+            }
+            for i in range(start, min(rows, start + 1000))
+        ]
+        response = await client.post("/api/v1/students/bulk", json=batch)
+        response.raise_for_status()
+
+
+async def run_load(client, paths, concurrency, total):
+    latencies = []
+    errors = 0
+    queue = iter(paths[i % len(paths)] for i in range(total))
+
+    async def worker():
+        nonlocal errors
+        for path in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def bench_mode(args, async_mode, port):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(port, os.path.join(tmp, "bench.db"), async_mode)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client)
+                await seed(client, args.rows)
+                rng = random.Random(42)
+                scenarios = {
+                    "GET /students/{id}": [
+                        f"/api/v1/students/{rng.randint(1, args.rows)}" for _ in range(1000)
+                    ],
+                    "GET /students/?limit=50": ["/api/v1/students/?limit=50"],
+                }
+                results = {}
+                for name, paths in scenarios.items():
+                    await run_load(client, paths, args.concurrency, min(args.requests, 500))
+                    results[name] = await run_load(client, paths, args.concurrency, args.requests)
+                return results
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'scenario':<26} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for async_mode in (False, True):
+        results = asyncio.run(bench_mode(args, async_mode, args.port))
+        for name, stats in results.items():
+            print(
+                f"{'async' if async_mode else 'sync':<6} {name:<26} {stats['rps']:>9.0f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
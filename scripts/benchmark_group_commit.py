@@ -0,0 +1,153 @@
+"""
+Compare per-request commits with group commit for single-row writes.
+
+Starts the app under uvicorn once per combination of GROUP_COMMIT and SQLite
+synchronous level against a fresh database file, then sends concurrent
+POST /students/ and PUT /students/{id} requests and reports write throughput,
+latency percentiles and failed requests. synchronous=FULL fsyncs on every
+commit, which is where sharing commits pays off most; NORMAL (the default in
+WAL mode) only syncs at checkpoints.
+
+    python scripts/benchmark_group_commit.py --concurrency 64 --requests 5000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(port, db_path, group_commit, synchronous, workers):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        DATABASE_URLS="{}",
+        GROUP_COMMIT="true" if group_commit else "false",
+        SQLITE_SYNCHRONOUS=synchronous,
+        DEBUG="false",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_ready(client):
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def create_body(i):
+    return {
+        "student_id": f"GC{i:08d}",
+        "first_name": "Group",
+        "last_name": f"Commit{i}",
+        "email": f"gc{i}@example.edu",
+        "major": "Computer Science",
+        "year": i % 4 + 1,
+    }
+
+
+async def run_load(client, requests, concurrency):
+    """`requests` yields (method, path, json) tuples; runs them `concurrency` at a time."""
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for method, path, body in requests:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "wps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def bench_mode(args, group_commit, synchronous):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(
+            args.port, os.path.join(tmp, "bench.db"), group_commit, synchronous, args.workers
+        )
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client)
+                creates = (
+                    ("POST", "/api/v1/students/", create_body(i)) for i in range(args.requests)
+                )
+                updates = (
+                    ("PUT", f"/api/v1/students/{i % args.requests + 1}", {"year": i % 4 + 1, "gpa": str(i)})
+                    for i in itertools.count(1)
+                )
+                return {
+                    "POST /students/": await run_load(client, creates, args.concurrency),
+                    "PUT /students/{id}": await run_load(
+                        client, itertools.islice(updates, args.requests), args.concurrency
+                    ),
+                }
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    print(
+        f"{'sync':<7} {'group':<6} {'scenario':<20} {'writes/s':>9} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    )
+    for synchronous in args.synchronous:
+        for group_commit in (False, True):
+            results = asyncio.run(bench_mode(args, group_commit, synchronous))
+            for name, stats in results.items():
+                print(
+                    f"{synchronous:<7} {'on' if group_commit else 'off':<6} {name:<20} "
+                    f"{stats['wps']:>9.0f} {stats['p50_ms']:>9.1f} {stats['p99_ms']:>9.1f} "
+                    f"{stats['errors']:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
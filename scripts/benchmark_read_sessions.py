@@ -0,0 +1,146 @@
+"""
+Compare reads sharing the write pool with reads on a pool of their own.
+
+For each mode a child process points the app at a fresh database file
+(READ_SESSIONS turns the read pool on or off), seeds some students, and
+then runs reader threads fetching student pages alongside writer threads
+updating students. Readers take their session the way the GET routes do,
+from ReadSessionLocal, which is the primary's SessionLocal when
+READ_SESSIONS is off. The services are called straight from threads, like
+the app's threadpool calls them.
+
+Sharing one pool (5 connections plus 10 overflow by default), readers
+queue for connections behind writers waiting on SQLite's write lock; with
+their own pool they only wait for the CPU.
+
+    python scripts/benchmark_read_sessions.py --readers 24 --writers 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(args, read_sessions):
+    """Runs in a child process, so the app picks up this mode's settings."""
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["DATABASE_URLS"] = "{}"
+    os.environ["READ_SESSIONS"] = "true" if read_sessions else "false"
+    os.environ["SQL_INSTRUMENTATION"] = "false"
+    sys.path.insert(0, ROOT)
+    from app.db.base import ReadSessionLocal, SessionLocal
+    from app.db.migrate import migrate
+    from app.schemas.student import StudentCreate, StudentUpdate
+    from app.services.student_service import StudentService
+
+    migrate()
+    with SessionLocal() as db:
+        StudentService(db).create_students_bulk([
+            StudentCreate(
+                student_id=f"RS{i:08d}", first_name="Read", last_name=f"Student{i}",
+                email=f"rs{i}@example.edu",
+            )
+            for i in range(args.students)
+        ])
+
+    done = threading.Event()
+    reads, writes = [], []
+    failures = {"reads": 0, "writes": 0}
+
+    def read(worker):
+        i = worker
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                with ReadSessionLocal() as db:
+                    StudentService(db).get_students(
+                        skip=i * args.page_size % args.students, limit=args.page_size
+                    )
+            except Exception:
+                failures["reads"] += 1
+            reads.append(time.perf_counter() - started)
+            i += args.readers
+
+    def write(worker):
+        i = worker
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    StudentService(db).update_student(
+                        i % args.students + 1, StudentUpdate(year=i % 4 + 1)
+                    )
+            except Exception:
+                failures["writes"] += 1
+            writes.append(time.perf_counter() - started)
+            i += args.writers
+
+    threads = [threading.Thread(target=read, args=(n,)) for n in range(args.readers)]
+    threads += [threading.Thread(target=write, args=(n,)) for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        name: {
+            "per_s": len(latencies) / args.seconds,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "failed": failures[name],
+        }
+        for name, latencies in (("reads", reads), ("writes", writes))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=24, help="threads fetching student pages")
+    parser.add_argument("--writers", type=int, default=8, help="threads updating students")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--mode", choices=["shared", "separate"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        json.dump(run_mode(args, args.mode == "separate"), sys.stdout)
+        return
+
+    print(
+        f"{'read pool':<10} {'ops':<7} {'per s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'failed':>7}"
+    )
+    for mode in ("shared", "separate"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode,
+             "--readers", str(args.readers), "--writers", str(args.writers),
+             "--students", str(args.students), "--page-size", str(args.page_size),
+             "--seconds", str(args.seconds)],
+            check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        for name, stats in json.loads(output).items():
+            print(
+                f"{mode:<10} {name:<7} {stats['per_s']:>8.0f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f} {stats['failed']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
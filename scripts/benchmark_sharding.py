@@ -0,0 +1,160 @@
+"""
+Compare one shared database with patients split into a database of its own.
+
+For each layout a child process points the app at fresh database files
+(DATABASE_URLS gives patients their own file in the split layout), seeds
+some students and then runs a bulk patient import, one bulk insert after
+another, while several threads keep updating students. Each layout runs
+once with the import and once without it, for reference. The services are
+called straight from threads, the way the app's threadpool calls them, so
+the numbers show SQLite's write lock rather than HTTP overhead.
+
+With one shared file the import and the updates take turns on the write
+lock; with patients split off they only share the CPU.
+
+    python scripts/benchmark_sharding.py --threads 8 --batches 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_layout(args, split):
+    """Runs in a child process, so the app picks up this layout's settings."""
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    urls = {"patients": f"sqlite:///{os.path.join(tmp, 'patients.db')}"} if split else {}
+    os.environ["DATABASE_URLS"] = json.dumps(urls)
+    os.environ["SQL_INSTRUMENTATION"] = "false"
+    sys.path.insert(0, ROOT)
+    from app.db.base import SessionLocal
+    from app.db.migrate import migrate
+    from app.schemas.patient import PatientCreate
+    from app.schemas.student import StudentCreate, StudentUpdate
+    from app.services.patient_service import PatientService
+    from app.services.student_service import StudentService
+
+    migrate()
+    with SessionLocal() as db:
+        StudentService(db).create_students_bulk([
+            StudentCreate(
+                student_id=f"SH{i:08d}", first_name="Shard", last_name=f"Student{i}",
+                email=f"sh{i}@example.edu",
+            )
+            for i in range(args.students)
+        ])
+
+    results = {}
+    for imported in (False, True):
+        done = threading.Event()
+        latencies = []
+        failures = {"updates": 0, "patients": 0}
+
+        def update_students(worker):
+            i = worker
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    with SessionLocal() as db:
+                        StudentService(db).update_student(
+                            i % args.students + 1, StudentUpdate(year=i % 4 + 1)
+                        )
+                except Exception:
+                    failures["updates"] += 1
+                latencies.append(time.perf_counter() - started)
+                i += args.threads
+
+        def import_patients(offset):
+            for batch in range(args.batches):
+                first = offset + batch * args.batch_size
+                items = [
+                    PatientCreate(
+                        patient_id=f"SH{i:09d}", first_name="Shard", last_name=f"Patient{i}",
+                        email=f"sh{i}@example.org", date_of_birth="1990-01-01",
+                    )
+                    for i in range(first, first + args.batch_size)
+                ]
+                try:
+                    with SessionLocal() as db:
+                        PatientService(db).create_patients_bulk(items)
+                except Exception:
+                    failures["patients"] += args.batch_size
+
+        updaters = [threading.Thread(target=update_students, args=(n,)) for n in range(args.threads)]
+        started = time.perf_counter()
+        for thread in updaters:
+            thread.start()
+        if imported:
+            import_patients(0)
+        else:
+            time.sleep(args.idle_seconds)
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in updaters:
+            thread.join()
+
+        patients = args.batches * args.batch_size - failures["patients"] if imported else 0
+        results["bulk import" if imported else "idle"] = {
+            "seconds": elapsed,
+            "updates_per_s": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "failed_updates": failures["updates"],
+            "patients_per_s": patients / elapsed,
+            "failed_patients": failures["patients"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="threads updating students")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--batches", type=int, default=10, help="bulk inserts in the import")
+    parser.add_argument("--batch-size", type=int, default=5000, help="patients per bulk insert")
+    parser.add_argument("--idle-seconds", type=float, default=5.0,
+                        help="how long to run the updates without the import")
+    parser.add_argument("--layout", choices=["shared", "split"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        json.dump(run_layout(args, args.layout == "split"), sys.stdout)
+        return
+
+    print(
+        f"{'layout':<7} {'alongside':<12} {'seconds':>8} {'updates/s':>10} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'failed':>7} {'patients/s':>11} {'failed':>7}"
+    )
+    for layout in ("shared", "split"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--layout", layout,
+             "--threads", str(args.threads), "--students", str(args.students),
+             "--batches", str(args.batches), "--batch-size", str(args.batch_size),
+             "--idle-seconds", str(args.idle_seconds)],
+            check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        for name, stats in json.loads(output).items():
+            print(
+                f"{layout:<7} {name:<12} {stats['seconds']:>8.1f} {stats['updates_per_s']:>10.0f} "
+                f"{stats['p50_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f} "
+                f"{stats['failed_updates']:>7} {stats['patients_per_s']:>11.0f} "
+                f"{stats['failed_patients']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Benchmark every API route against seeded tables and record the results.
+
+For each table size, seeds all five domains with that many rows into a fresh
+SQLite file with seed_data.py, then drives each route, reads first and
+writes after, with a fixed number of concurrent clients: once in-process
+through the httpx ASGI transport, and once over HTTP against uvicorn. Each transport starts from
+its own copy of the seeded file. Reports throughput and p50/p95/p99 latency
+per route and writes everything to a JSON file that can be diffed, or
+compared with --compare, between commits.
+
+    python scripts/benchmark_suite.py --sizes 10000 100000 --output bench.json
+    python scripts/benchmark_suite.py --compare bench.json --output bench-new.json
+
+GET /changes/stream is left out: it holds its connection open rather than
+answering.
+
+Each size also records how long the access index takes to build and how much
+memory it holds, and the run fails when that passes
+--max-access-index-bytes per person.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from seed_data import LAST_NAMES, SOURCES, person
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+
+# route prefix -> (lookup field, has /upsert)
+DOMAINS = {
+    "students": ("student_ids", True),
+    "faculty": ("faculty_ids", True),
+    "it-staff": ("staff_ids", False),
+    "staff": ("staff_ids", True),
+    "patients": ("patient_ids", False),
+}
+BATCH = 100  # rows per bulk, upsert, import, lookup and access check request
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Scenarios
+
+def scenarios(rows, requests, heavy_requests, head):
+    """
+    (name, count, request factory) for every route, reads before writes.
+    A factory takes a running index and returns (method, path, httpx kwargs).
+    """
+    sys.path.insert(0, ROOT)
+    from app.utils.pagination import encode_cursor
+
+    rng = random.Random(42)
+    # Seeded person i has id i; rows created by the write scenarios come after
+    created = rows + 1
+
+    def random_ids(n):
+        return [rng.randint(1, rows) for _ in range(n)]
+
+    reads, writes = [], []
+    for domain, (lookup_field, has_upsert) in DOMAINS.items():
+        base = f"{API}/{domain}"
+        reads += [
+            (f"GET /{domain}/", requests, lambda i, base=base: ("GET", f"{base}/?limit=50", {})),
+            (f"GET /{domain}/?is_active&sort", requests, lambda i, base=base: (
+                "GET", f"{base}/?is_active=false&sort=last_name&limit=50", {})),
+            (f"GET /{domain}/{{id}}", requests, lambda i, base=base: (
+                "GET", f"{base}/{rng.randint(1, rows)}", {})),
+            (f"POST /{domain}/lookup", requests, lambda i, base=base: (
+                "POST", f"{base}/lookup", {"json": {"ids": random_ids(BATCH)}})),
+            (f"POST /{domain}/lookup natural", requests, lambda i, base=base, domain=domain, lookup_field=lookup_field: (
+                "POST", f"{base}/lookup",
+                {"json": {lookup_field: [person(domain, n)[SOURCES[domain][0]] for n in random_ids(BATCH)]}})),
+            (f"GET /{domain}/export", heavy_requests, lambda i, base=base: (
+                "GET", f"{base}/export?is_active=false", {})),
+        ]
+
+        writes += [
+            (f"POST /{domain}/", requests, lambda i, base=base, domain=domain: (
+                "POST", f"{base}/", {"json": person(domain, 10 ** 8 + i)})),
+            (f"PUT /{domain}/{{id}}", requests, lambda i, base=base: (
+                "PUT", f"{base}/{rng.randint(1, rows)}", {"json": {"phone": f"555-{i:06d}"}})),
+            # Removes the rows POST just created, in the order they got their ids
+            (f"DELETE /{domain}/{{id}}", requests, lambda i, base=base: (
+                "DELETE", f"{base}/{created + i}", {})),
+            (f"POST /{domain}/bulk", heavy_requests, lambda i, base=base, domain=domain: (
+                "POST", f"{base}/bulk",
+                {"json": [person(domain, 2 * 10 ** 8 + i * BATCH + n) for n in range(BATCH)]})),
+            (f"POST /{domain}/import", heavy_requests, lambda i, base=base, domain=domain: (
+                "POST", f"{base}/import",
+                {"files": {"file": ("people.ndjson", "\n".join(
+                    json.dumps(person(domain, 3 * 10 ** 8 + i * BATCH + n)) for n in range(BATCH)
+                ), "application/x-ndjson")}})),
+        ]
+        if has_upsert:
+            writes.append((f"POST /{domain}/upsert", heavy_requests, lambda i, base=base, domain=domain: (
+                "POST", f"{base}/upsert",
+                {"json": [dict(person(domain, n), phone=f"555-{i:06d}") for n in random_ids(BATCH)]})))
+
+    reads += [
+        ("GET /people/search", requests, lambda i: (
+            "GET", f"{API}/people/search?q={rng.choice(LAST_NAMES)}&limit=20", {})),
+        ("GET /changes/", requests, lambda i: (
+            "GET", f"{API}/changes/?since={encode_cursor(max(0, head - 100))}&limit=100", {})),
+        ("GET /changes/head", requests, lambda i: ("GET", f"{API}/changes/head", {})),
+        ("GET /access/{identifier}", requests, lambda i: (
+            "GET", f"{API}/access/{person('students', rng.randint(1, rows))['email']}", {})),
+        ("POST /access/check", requests, lambda i: (
+            "POST", f"{API}/access/check",
+            {"json": [person(rng.choice(list(DOMAINS)), n)["email"] for n in random_ids(BATCH)]})),
+        ("GET /", requests, lambda i: ("GET", "/", {})),
+        ("GET /health", requests, lambda i: ("GET", "/health", {})),
+        ("GET /metrics", requests, lambda i: ("GET", "/metrics", {})),
+    ]
+    return reads + writes
+
+
+async def run_load(client, make_request, count, concurrency):
+    latencies = []
+    errors = 0
+    indexes = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            method, path, kwargs = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": count,
+        "rps": round(count / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+    }
+
+
+async def run_scenarios(client, args, rows):
+    head = (await client.get(f"{API}/changes/head")).json()
+    sys.path.insert(0, ROOT)
+    from app.utils.pagination import decode_cursor
+    results = {}
+    for name, count, make_request in scenarios(rows, args.requests, args.heavy_requests, decode_cursor(head["cursor"])[0]):
+        results[name] = await run_load(client, make_request, count, args.concurrency)
+        if not args.quiet:
+            print_row(args.transport_label, rows, name, results[name], file=sys.stderr)
+    return results
+
+
+# Transports
+
+async def bench_asgi(db_path, args, rows):
+    """Runs in a child process, so the app binds to this size's database."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120
+        ) as client:
+            return await run_scenarios(client, args, rows)
+
+
+async def wait_ready(client):
+    for _ in range(300):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def bench_uvicorn(db_path, args, rows):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DEBUG="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=120
+        ) as client:
+            await wait_ready(client)
+            return await run_scenarios(client, args, rows)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def bench_access_index(db_path):
+    """Runs in a child process, so the index reads this size's database."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+    from app.services.access_index import AccessIndex
+
+    index = AccessIndex()
+    started = time.perf_counter()
+    index._columns, _ = index._build()
+    seconds = time.perf_counter() - started
+    people = len(index._columns.refs)
+    return {
+        "people": people,
+        "build_seconds": round(seconds, 2),
+        "bytes": index.nbytes(),
+        "bytes_per_person": round(index.nbytes() / max(people, 1), 1),
+    }
+
+
+def child_command(args, *extra):
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--requests", str(args.requests), "--heavy-requests", str(args.heavy_requests),
+        "--concurrency", str(args.concurrency), *extra,
+    ]
+    return command + (["--quiet"] if args.quiet else [])
+
+
+def bench_size(args, rows, tmp):
+    seeded = os.path.join(tmp, f"seed-{rows}.db")
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "scripts", "seed_data.py"), "--rows", str(rows),
+         "--rebuild-indexes", "--database-url", f"sqlite:///{seeded}"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    seconds = time.perf_counter() - started
+    if not args.quiet:
+        print(f"seeded {rows} rows per domain in {seconds:.1f}s", file=sys.stderr)
+
+    access_index = json.loads(subprocess.run(
+        child_command(args, "--access-index", seeded), check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout)
+    if not args.quiet:
+        print(
+            f"access index: {access_index['people']} people in {access_index['build_seconds']}s, "
+            f"{access_index['bytes'] / 2**20:.1f} MiB ({access_index['bytes_per_person']} bytes/person)",
+            file=sys.stderr,
+        )
+
+    results = {}
+    for transport in args.transports:
+        db_path = os.path.join(tmp, f"{transport}-{rows}.db")
+        shutil.copyfile(seeded, db_path)
+        if transport == "asgi":
+            output = subprocess.run(
+                child_command(args, "--asgi", db_path, "--rows", str(rows)),
+                check=True, stdout=subprocess.PIPE, text=True,
+            ).stdout
+            results[transport] = json.loads(output)
+        else:
+            args.transport_label = transport
+            results[transport] = asyncio.run(bench_uvicorn(db_path, args, rows))
+        os.remove(db_path)
+    os.remove(seeded)
+    return {"seed_seconds": round(seconds, 1), "access_index": access_index, "transports": results}
+
+
+# Reporting
+
+def print_row(transport, rows, name, stats, file=sys.stdout):
+    print(
+        f"{transport:<8} {rows:>8} {name:<36} {stats['rps']:>9.0f} {stats['p50_ms']:>8.1f} "
+        f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>7}",
+        file=file,
+    )
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(baseline, current):
+    """Print the change in throughput and p99 for every route both runs measured."""
+    print(f"\n{'transport':<10} {'rows':>8} {'scenario':<36} {'req/s':>9} {'p99':>9}")
+    for rows, size in current["sizes"].items():
+        for transport, routes in size["transports"].items():
+            before = baseline.get("sizes", {}).get(rows, {}).get("transports", {}).get(transport, {})
+            for name, stats in routes.items():
+                if name not in before:
+                    continue
+                rps = (stats["rps"] / before[name]["rps"] - 1) * 100 if before[name]["rps"] else 0.0
+                p99 = (stats["p99_ms"] / before[name]["p99_ms"] - 1) * 100 if before[name]["p99_ms"] else 0.0
+                print(f"{transport:<10} {rows:>8} {name:<36} {rps:>+8.1f}% {p99:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000],
+                        help="rows per domain, e.g. 10000 100000 1000000")
+    parser.add_argument("--transports", nargs="+", choices=["asgi", "uvicorn"], default=["asgi", "uvicorn"])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per route")
+    parser.add_argument("--heavy-requests", type=int, default=20,
+                        help="requests for export, bulk, import and upsert routes")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file from an earlier run")
+    parser.add_argument("--quiet", action="store_true", help="no per-route progress on stderr")
+    parser.add_argument("--max-access-index-bytes", type=float, default=160,
+                        help="fail when the access index holds more than this per person")
+    # Child process modes
+    parser.add_argument("--asgi", help=argparse.SUPPRESS)
+    parser.add_argument("--access-index", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Every domain goes in the one seeded file that each transport copies;
+    # inherited by the seeding, ASGI and server child processes.
+    os.environ["DATABASE_URLS"] = "{}"
+
+    if args.asgi:
+        args.transport_label = "asgi"
+        json.dump(asyncio.run(bench_asgi(args.asgi, args, args.rows)), sys.stdout)
+        return
+    if args.access_index:
+        json.dump(bench_access_index(args.access_index), sys.stdout)
+        return
+
+    report = {"environment": environment(), "settings": {
+        "requests": args.requests, "heavy_requests": args.heavy_requests,
+        "concurrency": args.concurrency, "workers": args.workers,
+    }, "sizes": {}}
+    if not args.quiet:
+        print(
+            f"{'transport':<8} {'rows':>8} {'scenario':<36} {'req/s':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}",
+            file=sys.stderr,
+        )
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            report["sizes"][str(rows)] = bench_size(args, rows, tmp)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+    oversized = [
+        f"{rows} rows: {size['access_index']['bytes_per_person']} bytes/person"
+        for rows, size in report["sizes"].items()
+        if size["access_index"]["bytes_per_person"] > args.max_access_index_bytes
+    ]
+    if oversized:
+        sys.exit(f"access index over {args.max_access_index_bytes:g} bytes/person: {', '.join(oversized)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Generate synthetic people and bulk-load them straight into the database.
+
+Every domain gets `--rows` people that validate against its *Create schema.
+Person number i is always the same person for a given --seed, with a natural
+ID and email derived from i, so they never collide. By default rows are
+appended after the table's highest id, so running it again adds more people.
+
+Rows go in with batched executemany inserts on one connection with
+synchronous=OFF and a large page cache. With --rebuild-indexes the table's
+indexes and triggers are dropped for the load and put back afterwards; the
+search index, change log and table version the triggers would have
+maintained are then brought up to date in one statement each, which is
+several times faster than firing three triggers per row.
+
+Nothing is loaded when any domain already holds people from the requested
+range: with its unique indexes dropped the load would otherwise insert
+duplicates and the indexes could not be put back. An index or trigger that
+still fails to come back is reported with its SQL, and the script exits
+with an error, while the rest are restored.
+
+    python scripts/seed_data.py --rows 1000000 --rebuild-indexes
+    python scripts/seed_data.py --rows 50000 --domains students patients --seed 7
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+    "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+    "Charles", "Karen", "Wei", "Priya", "Mohammed", "Fatima", "Hiroshi", "Yuki", "Carlos", "Lucia",
+    "Olga", "Dmitri", "Aisha", "Kwame", "Sofia", "Mateo", "Chloe", "Liam", "Noah", "Emma",
+    "Zoe", "Ananya", "Arjun", "Mei", "Jin", "Ngozi", "Amara", "Lars", "Ingrid", "Pedro", "Ana",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+    "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore",
+    "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez",
+    "Lewis", "Robinson", "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen",
+    "Hill", "Flores", "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell",
+    "Carter", "Roberts", "Patel", "Chen", "Wang", "Kim", "Singh", "Kumar", "Okafor", "Mensah",
+    "Ivanova", "Schmidt", "Muller", "Rossi", "Silva", "Santos", "Tanaka", "Suzuki", "Sato",
+)
+SUBJECTS = (
+    "Computer Science", "Biology", "Chemistry", "Physics", "Mathematics", "History", "English",
+    "Economics", "Psychology", "Nursing", "Mechanical Engineering", "Music", "Philosophy",
+)
+POSITIONS = ("Professor", "Associate Professor", "Assistant Professor", "Lecturer", "Adjunct")
+IT_ROLES = ("Help Desk Technician", "System Administrator", "Network Engineer", "Security Analyst", "DBA")
+ACCESS_LEVELS = ("standard", "standard", "standard", "elevated", "admin")
+STAFF_DEPARTMENTS = ("Facilities", "Admissions", "Finance", "Human Resources", "Library", "Dining")
+STAFF_ROLES = ("Coordinator", "Assistant", "Manager", "Technician", "Advisor")
+STREETS = ("Main St", "Oak Ave", "Maple Dr", "Cedar Ln", "Park Rd", "Elm St", "Lake View")
+
+# domain as exposed by the API -> (natural id column, id prefix, email host)
+SOURCES = {
+    "students": ("student_id", "STU", "students.example.edu"),
+    "faculty": ("faculty_id", "FAC", "faculty.example.edu"),
+    "it-staff": ("staff_id", "ITS", "it.example.edu"),
+    "staff": ("staff_id", "STF", "staff.example.edu"),
+    "patients": ("patient_id", "PAT", "patients.example.org"),
+}
+
+
+def person(domain, i, seed=0):
+    """Person number `i` of `domain` as a *Create body. Pure function of (domain, i, seed)."""
+    id_column, prefix, host = SOURCES[domain]
+    # Cheap integer mixing instead of a Random per row: same fields for the
+    # same i however the rows are batched
+    h = (i * 2654435761 + seed * 40503 + 12345) & 0xFFFFFFFF
+    first = FIRST_NAMES[h % len(FIRST_NAMES)]
+    last = LAST_NAMES[(h >> 6) % len(LAST_NAMES)]
+    body = {
+        id_column: f"{prefix}{i:09d}",
+        "first_name": first,
+        "last_name": last,
+        "email": f"{first}.{last}.{i}@{host}".lower(),
+        "phone": f"555-{(h >> 12) % 1000:03d}-{(h >> 3) % 10000:04d}",
+        "is_active": (h >> 20) % 20 != 0,
+    }
+    if domain == "students":
+        body["major"] = SUBJECTS[(h >> 14) % len(SUBJECTS)]
+        body["year"] = (h >> 18) % 4 + 1
+        body["gpa"] = f"{2 + (h >> 9) % 21 / 10:.1f}"
+    elif domain == "faculty":
+        body["department"] = SUBJECTS[(h >> 14) % len(SUBJECTS)]
+        body["position"] = POSITIONS[(h >> 18) % len(POSITIONS)]
+        body["office_location"] = f"Building {(h >> 22) % 20 + 1}, Room {(h >> 8) % 400 + 100}"
+        body["specialization"] = None
+    elif domain == "it-staff":
+        body["department"] = "Information Technology"
+        body["role"] = IT_ROLES[(h >> 14) % len(IT_ROLES)]
+        body["access_level"] = ACCESS_LEVELS[(h >> 18) % len(ACCESS_LEVELS)]
+        body["office_location"] = f"IT Center, Room {(h >> 8) % 100 + 1}"
+    elif domain == "staff":
+        body["department"] = STAFF_DEPARTMENTS[(h >> 14) % len(STAFF_DEPARTMENTS)]
+        body["role"] = STAFF_ROLES[(h >> 18) % len(STAFF_ROLES)]
+    else:
+        body["address"] = f"{(h >> 8) % 9000 + 100} {STREETS[(h >> 14) % len(STREETS)]}"
+        body["date_of_birth"] = f"{1930 + (h >> 4) % 90}-{(h >> 11) % 12 + 1:02d}-{(h >> 15) % 28 + 1:02d}"
+    return body
+
+
+def _saved_schema(conn, table):
+    return conn.exec_driver_sql(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,),
+    ).all()
+
+
+def first_index(conn, domain, table, rows, start):
+    """
+    Index of the first person to load into `domain`: `start`, or after the
+    table's highest id. Raises ValueError if people in the range are
+    already there.
+    """
+    id_column = SOURCES[domain][0]
+    with conn.begin():
+        if start is None:
+            start = conn.exec_driver_sql(f"SELECT coalesce(max(id), 0) FROM {table}").scalar() + 1
+        # Natural IDs are zero-padded, so the range is a string range too
+        taken = conn.exec_driver_sql(
+            f"SELECT count(*) FROM {table} WHERE {id_column} BETWEEN ? AND ?",
+            (person(domain, start)[id_column], person(domain, start + rows - 1)[id_column]),
+        ).scalar()
+    if taken:
+        raise ValueError(
+            f"{domain}: {taken} of people #{start}-#{start + rows - 1} already exist; "
+            f"pass a --start past them"
+        )
+    return start
+
+
+def seed_domain(conn, domain, rows, seed, start, batch_size, rebuild_indexes):
+    """
+    Load people #`start` onwards into `domain`'s table. Returns the
+    (kind, name, sql, error) of every index or trigger that could not be
+    put back.
+    """
+    from app.db.changes import log_inserts
+    from app.db.search import index_people
+    from app.db.versions import bump_table_version
+    from app.schemas import FacultyCreate, ITStaffCreate, PatientCreate, StaffCreate, StudentCreate
+
+    schema, table = {
+        "students": (StudentCreate, "students"),
+        "faculty": (FacultyCreate, "faculty"),
+        "it-staff": (ITStaffCreate, "it_staff"),
+        "staff": (StaffCreate, "staff"),
+        "patients": (PatientCreate, "patients"),
+    }[domain]
+    columns = list(schema.model_fields)
+    insert = (
+        f"INSERT INTO {table} ({', '.join(columns)}, created_at) "
+        f"VALUES ({', '.join('?' for _ in columns)}, CURRENT_TIMESTAMP)"
+    )
+
+    with conn.begin():
+        last_id = conn.exec_driver_sql(f"SELECT coalesce(max(id), 0) FROM {table}").scalar()
+
+    saved = []
+    if rebuild_indexes:
+        with conn.begin():
+            saved = _saved_schema(conn, table)
+            for kind, name, _ in saved:
+                conn.exec_driver_sql(f"DROP {kind.upper()} {name}")
+    failed = []
+    try:
+        for offset in range(0, rows, batch_size):
+            first = start + offset
+            batch = [person(domain, i, seed) for i in range(first, min(start + rows, first + batch_size))]
+            # One row per batch is enough to catch the generator drifting from the schema
+            schema.model_validate(batch[0])
+            with conn.begin():
+                conn.exec_driver_sql(insert, [tuple(row[c] for c in columns) for row in batch])
+    finally:
+        if saved:
+            # Catch up on what the triggers missed before putting them back,
+            # all in one transaction so readers see the load land at once.
+            # Each statement gets a savepoint of its own, so one that fails
+            # doesn't keep the others from coming back.
+            def restore(kind, name, sql):
+                try:
+                    with conn.begin_nested():
+                        conn.exec_driver_sql(sql)
+                except Exception as e:
+                    failed.append((kind, name, sql, str(e)))
+
+            with conn.begin():
+                for kind, name, sql in saved:
+                    if kind == "index":
+                        restore(kind, name, sql)
+                index_people(conn, table, last_id)
+                log_inserts(conn, table, last_id)
+                bump_table_version(conn, table)
+                for kind, name, sql in saved:
+                    if kind == "trigger":
+                        restore(kind, name, sql)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, required=True, help="people per domain")
+    parser.add_argument("--domains", nargs="+", choices=list(SOURCES), default=list(SOURCES))
+    parser.add_argument("--seed", type=int, default=0, help="varies names and attributes, not IDs")
+    parser.add_argument("--start", type=int,
+                        help="index of the first person (default: after the table's highest id)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="rows per transaction")
+    parser.add_argument("--rebuild-indexes", action="store_true",
+                        help="drop indexes and triggers for the load and rebuild them after")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / the app setting")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, ROOT)
+    import app.models  # noqa: F401  (registers the tables with Base)
+    from app.core.config import settings
+    from app.db.base import shards, table_engines
+    from app.db.changes import CHANGE_SOURCES
+    from app.db.migrate import migrate
+
+    if any(shard.dialect.name != "sqlite" for shard in shards):
+        parser.error("seed_data.py loads SQLite databases only")
+    migrate()
+
+    tables = dict(CHANGE_SOURCES)
+    # Every domain is checked before any is loaded or has its indexes dropped
+    starts = {}
+    for domain in args.domains:
+        with table_engines[tables[domain]].connect() as conn:
+            try:
+                starts[domain] = first_index(conn, domain, tables[domain], args.rows, args.start)
+            except ValueError as e:
+                parser.error(str(e))
+
+    failed = []
+    total_started = time.perf_counter()
+    for domain in args.domains:
+        # Each domain's table may live in a database of its own (DATABASE_URLS)
+        with table_engines[tables[domain]].connect() as conn:
+            # Straight on the driver connection: SQLAlchemy would open a
+            # transaction first, and synchronous can't change inside one.
+            # Durability only matters once the load is done; the checkpoint
+            # at the end writes everything out.
+            pragma = conn.connection.driver_connection.execute
+            pragma("PRAGMA synchronous = OFF")
+            pragma("PRAGMA cache_size = -1048576")
+            started = time.perf_counter()
+            first = starts[domain]
+            failed += seed_domain(
+                conn, domain, args.rows, args.seed, first, args.batch_size, args.rebuild_indexes
+            )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{domain:<9} {args.rows:>10} rows (#{first}-#{first + args.rows - 1}) "
+                f"in {elapsed:6.1f}s, {args.rows / elapsed * 60:>12,.0f} rows/min"
+            )
+            pragma(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+            pragma(f"PRAGMA cache_size = {int(settings.sqlite_cache_size)}")
+            pragma("PRAGMA wal_checkpoint(TRUNCATE)")
+    for shard in shards:
+        shard.dispose()
+
+    elapsed = time.perf_counter() - total_started
+    total = args.rows * len(args.domains)
+    print(f"{'total':<9} {total:>10} rows in {elapsed:6.1f}s, {total / elapsed * 60:>12,.0f} rows/min")
+
+    if failed:
+        for kind, name, sql, error in failed:
+            print(f"could not restore {kind} {name}: {error}\n  {sql}", file=sys.stderr)
+        sys.exit(f"{len(failed)} index(es)/trigger(s) were not restored; fix the data and run the SQL above")
+
+
+if __name__ == "__main__":
+    main()
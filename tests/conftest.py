@@ -0,0 +1,51 @@
+"""
+The app builds its engines from the settings when it is first imported, so
+the environment is pointed at a scratch database here, before any test
+module imports it. Tests that need other settings (sharding, async mode,
+group commit, replicas) run their code in a fresh interpreter through
+`run_isolated`.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from typing import Any, Dict, Optional
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH = tempfile.mkdtemp(prefix="access-api-tests-")
+
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(SCRATCH, 'test.db')}",
+    "DATABASE_URLS": "{}",
+    "READ_DATABASE_URLS": "{}",
+    "ASYNC_DATABASE": "false",
+    "GROUP_COMMIT": "false",
+    "READ_SESSIONS": "true",
+    "AUTO_MIGRATE": "true",
+    "ENTITY_CACHE_ENABLED": "true",
+})
+
+
+@pytest.fixture
+def run_isolated(tmp_path):
+    """
+    Run `code` in a fresh interpreter whose database lives in `tmp_path`,
+    with `env` on top of the test settings, and return the JSON it prints
+    last. Paths in `env` may use {tmp} for `tmp_path`.
+    """
+    def run(code: str, env: Optional[Dict[str, str]] = None) -> Any:
+        child_env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}")
+        child_env.update({name: value.format(tmp=tmp_path) for name, value in (env or {}).items()})
+        result = subprocess.run(
+            [sys.executable, "-c", textwrap.dedent(code)],
+            cwd=ROOT, env=child_env, capture_output=True, text=True, timeout=300,
+        )
+        assert result.returncode == 0, result.stderr[-4000:]
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    return run
@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clean_tables(client):
+    """Every test starts with empty domain tables and empty entity caches."""
+    from app.db.base import shard_tables, shards
+    from app.services import (
+        faculty_service, it_staff_service, patient_service, staff_service, student_service,
+    )
+
+    for shard in shards:
+        with shard.begin() as conn:
+            for table in shard_tables(shard):
+                conn.exec_driver_sql(f"DELETE FROM {table}")
+    for service in (student_service, faculty_service, it_staff_service, staff_service, patient_service):
+        service._cache.clear()
+    yield
@@ -0,0 +1,46 @@
+"""Valid create payloads for each domain, numbered so they never collide."""
+
+
+def student(n: int, **fields):
+    return {
+        "student_id": f"STU{n:05d}", "first_name": "Stu", "last_name": f"Dent{n:05d}",
+        "email": f"stu{n}@uni.edu", "major": "Physics", "year": 1, **fields,
+    }
+
+
+def faculty(n: int, **fields):
+    return {
+        "faculty_id": f"FAC{n:05d}", "first_name": "Fac", "last_name": f"Ulty{n:05d}",
+        "email": f"fac{n}@uni.edu", "department": "Physics", **fields,
+    }
+
+
+def it_staff(n: int, **fields):
+    return {
+        "staff_id": f"ITS{n:05d}", "first_name": "Its", "last_name": f"Taff{n:05d}",
+        "email": f"its{n}@uni.edu", "role": "Support", **fields,
+    }
+
+
+def staff(n: int, **fields):
+    return {
+        "staff_id": f"STF{n:05d}", "first_name": "Sta", "last_name": f"Ff{n:05d}",
+        "email": f"stf{n}@uni.edu", "department": "Facilities", "role": "Porter", **fields,
+    }
+
+
+def patient(n: int, **fields):
+    return {
+        "patient_id": f"PAT{n:05d}", "first_name": "Pat", "last_name": f"Ient{n:05d}",
+        "email": f"pat{n}@mail.org", "date_of_birth": "1990-01-01", **fields,
+    }
+
+
+# (URL prefix, payload factory, natural key)
+DOMAINS = [
+    ("/api/v1/students", student, "student_id"),
+    ("/api/v1/faculty", faculty, "faculty_id"),
+    ("/api/v1/it-staff", it_staff, "staff_id"),
+    ("/api/v1/staff", staff, "staff_id"),
+    ("/api/v1/patients", patient, "patient_id"),
+]
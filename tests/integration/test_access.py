@@ -0,0 +1,72 @@
+import time
+
+from app.core.config import settings
+from tests.integration.payloads import it_staff, staff, student
+
+
+def eventually(read, expected, timeout=5.0):
+    """The index applies writes in the background, within milliseconds; poll until `read()` catches up."""
+    deadline = time.monotonic() + timeout
+    while (actual := read()) != expected and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert actual == expected
+
+
+def decisions(client, identifier, **params):
+    response = client.get(f"/api/v1/access/{identifier}", params=params)
+    if response.status_code == 404:
+        return []
+    return [(match["domain"], match["is_active"], match["access_level"]) for match in response.json()]
+
+
+def test_ids_and_emails_resolve_to_the_person(client):
+    row = client.post("/api/v1/students/", json=student(1, email="Ada@Uni.edu")).json()
+
+    eventually(lambda: client.get("/api/v1/access/STU00001").json(), [{
+        "identifier": "STU00001", "domain": "students", "id": row["id"],
+        "is_active": True, "access_level": None,
+    }])
+    assert decisions(client, "ada@uni.edu") == decisions(client, "ADA@UNI.EDU") == [("students", True, None)]
+    assert client.get("/api/v1/access/stu00001").status_code == 404
+
+
+def test_shared_email_matches_each_domain(client):
+    client.post("/api/v1/it-staff/", json=it_staff(1, email="both@uni.edu", access_level="admin"))
+    client.post("/api/v1/students/", json=student(1, email="both@uni.edu"))
+
+    eventually(
+        lambda: decisions(client, "both@uni.edu"),
+        [("students", True, None), ("it-staff", True, "admin")],
+    )
+    assert decisions(client, "both@uni.edu", domain="it-staff") == [("it-staff", True, "admin")]
+    assert client.get("/api/v1/access/both@uni.edu", params={"domain": "patients"}).status_code == 404
+
+
+def test_check_answers_in_request_order_with_unknowns(client):
+    client.post("/api/v1/staff/", json=staff(1))
+    client.post("/api/v1/students/", json=student(1))
+
+    def check():
+        response = client.post("/api/v1/access/check", json=["nobody@uni.edu", "STF00001", "stu1@uni.edu"])
+        return [(d["identifier"], d["domain"], d["is_active"]) for d in response.json()]
+
+    eventually(check, [
+        ("nobody@uni.edu", None, False), ("STF00001", "staff", True), ("stu1@uni.edu", "students", True),
+    ])
+
+
+def test_writes_are_reflected(client):
+    row = client.post("/api/v1/students/", json=student(1)).json()
+    eventually(lambda: decisions(client, "STU00001"), [("students", True, None)])
+
+    client.put(f"/api/v1/students/{row['id']}", json={"is_active": False, "email": "moved@uni.edu"})
+    eventually(lambda: decisions(client, "moved@uni.edu"), [("students", False, None)])
+    assert decisions(client, "stu1@uni.edu") == []
+
+    client.delete(f"/api/v1/students/{row['id']}")
+    eventually(lambda: decisions(client, "STU00001"), [])
+
+
+def test_check_is_limited(client):
+    too_many = ["x"] * (settings.access_check_max_items + 1)
+    assert client.post("/api/v1/access/check", json=too_many).status_code == 422
@@ -0,0 +1,30 @@
+ASYNC_CRUD = """
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from tests.integration.payloads import DOMAINS
+
+    report = {}
+    with TestClient(app) as client:
+        for prefix, payload, key in DOMAINS:
+            created = client.post(f"{prefix}/", json=payload(1))
+            duplicate = client.post(f"{prefix}/", json=payload(1))
+            row_id = created.json()["id"]
+            updated = client.put(f"{prefix}/{row_id}", json={"first_name": "Renamed"})
+            listed = client.get(f"{prefix}/")
+            deleted = client.delete(f"{prefix}/{row_id}")
+            missing = client.get(f"{prefix}/{row_id}")
+            report[prefix] = [
+                created.status_code, duplicate.status_code, updated.json()["first_name"],
+                [row[key] for row in listed.json()], deleted.status_code, missing.status_code,
+            ]
+    print(json.dumps(report))
+"""
+
+
+def test_crud_routes_work_on_the_async_engine(run_isolated):
+    from tests.integration.payloads import DOMAINS
+
+    report = run_isolated(ASYNC_CRUD, env={"ASYNC_DATABASE": "true"})
+    for prefix, payload, key in DOMAINS:
+        assert report[prefix] == [201, 400, "Renamed", [payload(1)[key]], 204, 404]
@@ -0,0 +1,28 @@
+BENCHMARK_ONCE = """
+    import argparse, asyncio, json, os, re, subprocess, sys
+    sys.path.insert(0, "scripts")
+    import benchmark_suite
+
+    subprocess.run([sys.executable, "scripts/seed_data.py", "--rows", "50"], check=True, stdout=subprocess.DEVNULL)
+    args = argparse.Namespace(requests=3, heavy_requests=1, concurrency=2, quiet=True)
+    results = asyncio.run(benchmark_suite.bench_asgi(os.environ["DATABASE_URL"][len("sqlite:///"):], args, 50))
+
+    from app.main import app
+    def route(method, path):
+        return f"{method} {re.sub(r'{[^}]+}', '{}', path)}"
+    print(json.dumps({
+        "routes": sorted(
+            route(method, r.path[len(benchmark_suite.API):])
+            for r in app.routes if r.path.startswith(benchmark_suite.API) for method in r.methods
+        ),
+        "scenarios": sorted({route(*name.split(" ")[:2]).split("?")[0] for name in results}),
+        "errors": {name: stats["errors"] for name, stats in results.items() if stats["errors"]},
+    }))
+"""
+
+
+def test_every_route_is_benchmarked_without_errors(run_isolated):
+    report = run_isolated(BENCHMARK_ONCE)
+
+    assert set(report["routes"]) - set(report["scenarios"]) == {"GET /changes/stream"}
+    assert report["errors"] == {}
@@ -0,0 +1,55 @@
+import pytest
+
+from tests.integration.payloads import DOMAINS, student
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_bulk_create_returns_ids_in_input_order(client, prefix, payload, key):
+    response = client.post(f"{prefix}/bulk", json=[payload(n) for n in range(3)])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 3 and body["failed"] == 0
+    assert [result["index"] for result in body["results"]] == [0, 1, 2]
+    for n, result in enumerate(body["results"]):
+        assert client.get(f"{prefix}/{result['id']}").json()[key] == payload(n)[key]
+
+
+def test_constraint_violation_only_rejects_its_item(client):
+    client.post("/api/v1/students/", json=student(1))
+    items = [student(2), student(3, email="stu1@uni.edu"), student(4), student(2, email="other@uni.edu")]
+    body = client.post("/api/v1/students/bulk", json=items).json()
+
+    assert body["created"] == 2 and body["failed"] == 2
+    results = body["results"]
+    assert results[0]["id"] and results[2]["id"]
+    assert results[1] == {"index": 1, "id": None, "error": "Email already exists"}
+    assert results[3] == {"index": 3, "id": None, "error": "Student ID already exists"}
+    assert len(client.get("/api/v1/students/").json()) == 3
+
+
+def test_failed_batch_keeps_input_order_across_batches(client):
+    from app.core.config import settings
+
+    count = settings.bulk_batch_size + 20
+    items = [student(n) for n in range(count)]
+    items[settings.bulk_batch_size + 5] = student(0)  # duplicate of the first item
+    body = client.post("/api/v1/students/bulk", json=items).json()
+
+    assert body["created"] == count - 1 and body["failed"] == 1
+    assert [result["index"] for result in body["results"]] == list(range(count))
+    assert body["results"][settings.bulk_batch_size + 5]["error"].endswith("already exists")
+    ids = [result["id"] for result in body["results"] if result["id"]]
+    assert ids == sorted(ids)
+
+
+def test_invalid_item_rejects_the_request(client):
+    response = client.post("/api/v1/students/bulk", json=[student(1), {"student_id": "X"}])
+    assert response.status_code == 422
+    assert client.get("/api/v1/students/").json() == []
+
+
+def test_too_many_items_is_rejected(client):
+    from app.core.config import settings
+
+    items = [student(n) for n in range(settings.bulk_max_items + 1)]
+    assert client.post("/api/v1/students/bulk", json=items).status_code == 422
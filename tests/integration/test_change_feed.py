@@ -0,0 +1,134 @@
+import pytest
+
+from app.utils.pagination import encode_cursor
+from tests.integration.payloads import faculty, student
+
+
+def _head(client) -> str:
+    return client.get("/api/v1/changes/head").json()["cursor"]
+
+
+def _changes(client, since, **params):
+    response = client.get("/api/v1/changes/", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_feed_lists_changes_after_the_cursor_with_current_data(client):
+    since = _head(client)
+    row = client.post("/api/v1/students/", json=student(1)).json()
+    client.put(f"/api/v1/students/{row['id']}", json={"major": "Biology"})
+    other = client.post("/api/v1/faculty/", json=faculty(1)).json()
+    client.delete(f"/api/v1/faculty/{other['id']}")
+
+    feed = _changes(client, since)
+    assert [(c["domain"], c["id"], c["op"]) for c in feed["changes"]] == [
+        ("students", row["id"], "insert"),
+        ("students", row["id"], "update"),
+        ("faculty", other["id"], "insert"),
+        ("faculty", other["id"], "delete"),
+    ]
+    assert [c["data"]["major"] for c in feed["changes"][:2]] == ["Biology", "Biology"]
+    assert feed["changes"][2]["data"] is None and feed["changes"][3]["data"] is None
+    assert not feed["has_more"]
+    assert feed["next_cursor"] == _head(client)
+    assert _changes(client, feed["next_cursor"])["changes"] == []
+
+
+def test_feed_pages_with_next_cursor(client):
+    since = _head(client)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(7)])
+
+    seen, cursor = [], since
+    while True:
+        feed = _changes(client, cursor, limit=3)
+        seen += [change["data"]["student_id"] for change in feed["changes"]]
+        cursor = feed["next_cursor"]
+        if not feed["has_more"]:
+            break
+    assert seen == [student(n)["student_id"] for n in range(7)]
+
+
+def test_rolled_back_writes_leave_no_entries(client):
+    client.post("/api/v1/students/", json=student(1))
+    since = _head(client)
+    assert client.post("/api/v1/students/", json=student(1)).status_code == 400
+    assert _changes(client, since)["changes"] == []
+
+
+@pytest.mark.parametrize("since", ["garbage", encode_cursor(-1), encode_cursor("1"), encode_cursor(True)])
+def test_invalid_cursor_is_400(client, since):
+    response = client.get("/api/v1/changes/", params={"since": since})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_pruned_cursor_is_410(client):
+    from app.db.base import shards
+    from app.db.changes import prune_change_log
+
+    since = _head(client)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(3)])
+    for shard in shards:
+        prune_change_log(shard, retention_days=-1)
+
+    assert client.get("/api/v1/changes/", params={"since": since}).status_code == 410
+    assert _changes(client, _head(client))["changes"] == []
+
+
+NO_CHANGE_LOG = """
+    import json
+    import app.db.changes
+    app.db.changes.has_change_log = lambda engine: False  # as on PostgreSQL
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from tests.integration.payloads import student
+
+    with TestClient(app) as client:
+        client.post("/api/v1/students/", json=student(1, email="Mixed@Uni.edu"))
+        print(json.dumps({
+            "head": client.get("/api/v1/changes/head").status_code,
+            "changes": client.get("/api/v1/changes/").status_code,
+            "stream": client.get("/api/v1/changes/stream").status_code,
+            "access": client.get("/api/v1/access/STU00001").json(),
+            "check": client.post("/api/v1/access/check", json=["mixed@uni.edu", "nobody"]).json(),
+        }))
+"""
+
+
+def test_databases_without_a_change_log(run_isolated):
+    report = run_isolated(NO_CHANGE_LOG)
+
+    assert report["head"] == report["changes"] == report["stream"] == 501
+    assert [(match["domain"], match["is_active"]) for match in report["access"]] == [("students", True)]
+    assert [(match["identifier"], match["domain"]) for match in report["check"]] == [
+        ("mixed@uni.edu", "students"), ("nobody", None),
+    ]
+
+
+PRUNED_WHILE_RUNNING = """
+    import json, time
+    from fastapi.testclient import TestClient
+    from app.db.base import engine
+    from app.main import app
+    from tests.integration.payloads import student
+
+    with TestClient(app) as client:
+        client.post("/api/v1/students/bulk", json=[student(n) for n in range(3)])
+        with engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE change_log SET changed_at = '2000-01-01 00:00:00' WHERE entity_id < 3")
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            with engine.connect() as conn:
+                left = conn.exec_driver_sql("SELECT entity_id FROM change_log").scalars().all()
+            if len(left) < 3:
+                break
+            time.sleep(0.05)
+        print(json.dumps(left))
+"""
+
+
+def test_change_log_is_pruned_while_the_worker_runs(run_isolated):
+    left = run_isolated(PRUNED_WHILE_RUNNING, {"CHANGE_LOG_PRUNE_INTERVAL": "0.1"})
+    assert left == [3]
@@ -0,0 +1,101 @@
+"""
+The stream never ends, which TestClient can't read, so the tests drive
+ChangeStream on an event loop of their own and make writes from a thread,
+like a request would.
+"""
+import asyncio
+import json
+
+from app.api.v1.endpoints.changes import stream_since_param
+from app.services.change_stream import HEARTBEAT, ChangeStream
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.integration.payloads import faculty, student
+
+
+def _parse(chunk: str):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines["id"], json.loads(lines["data"])
+
+
+async def _take(chunks, count: int):
+    events = []
+    async for chunk in chunks:
+        if chunk != HEARTBEAT:
+            events.append(_parse(chunk))
+            if len(events) == count:
+                return events
+
+
+def _head(client):
+    return tuple(decode_cursor(client.get("/api/v1/changes/head").json()["cursor"]))
+
+
+def test_stream_replays_from_the_cursor_then_follows_new_writes(client):
+    since = _head(client)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(3)])
+
+    async def main():
+        chunks = (await ChangeStream.open(since)).events()
+        replayed = await _take(chunks, 3)
+        await asyncio.to_thread(client.post, "/api/v1/students/", json=student(3))
+        live = await _take(chunks, 1)
+        await chunks.aclose()
+        return replayed + live
+
+    events = asyncio.run(asyncio.wait_for(main(), 30))
+    assert [data["data"]["student_id"] for _, data in events] == [student(n)["student_id"] for n in range(4)]
+    seqs = [data["seq"] for _, data in events]
+    assert seqs == sorted(seqs)
+    assert [tuple(decode_cursor(event_id)) for event_id, _ in events] == [(seq,) for seq in seqs]
+
+
+def test_reconnect_resumes_after_the_last_event_id(client):
+    since = _head(client)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(4)])
+
+    async def main():
+        first = (await ChangeStream.open(since)).events()
+        seen = await _take(first, 2)
+        await first.aclose()
+        resumed = (await ChangeStream.open(tuple(decode_cursor(seen[-1][0])))).events()
+        rest = await _take(resumed, 2)
+        await resumed.aclose()
+        return seen + rest
+
+    events = asyncio.run(asyncio.wait_for(main(), 30))
+    assert [data["data"]["student_id"] for _, data in events] == [student(n)["student_id"] for n in range(4)]
+
+
+def test_stream_can_be_limited_to_some_domains(client):
+    since = _head(client)
+    client.post("/api/v1/students/", json=student(1))
+    client.post("/api/v1/faculty/", json=faculty(1))
+
+    async def main():
+        chunks = (await ChangeStream.open(since, {"faculty"})).events()
+        events = await _take(chunks, 1)
+        await chunks.aclose()
+        return events
+
+    [(_, data)] = asyncio.run(asyncio.wait_for(main(), 30))
+    assert data["domain"] == "faculty"
+
+
+def test_last_event_id_wins_over_since():
+    position = asyncio.run(stream_since_param(since=encode_cursor(1), last_event_id=encode_cursor(7)))
+    assert position == (7,)
+    assert asyncio.run(stream_since_param(since=None, last_event_id=None)) is None
+
+
+def test_bad_or_expired_resume_points_are_rejected_before_streaming(client):
+    from app.db.base import shards
+    from app.db.changes import prune_change_log
+
+    bad = client.get("/api/v1/changes/stream", headers={"Last-Event-ID": "garbage"})
+    assert bad.status_code == 400
+
+    since = encode_cursor(*_head(client))
+    client.post("/api/v1/students/", json=student(1))
+    for shard in shards:
+        prune_change_log(shard, retention_days=-1)
+    assert client.get("/api/v1/changes/stream", params={"since": since}).status_code == 410
@@ -0,0 +1,27 @@
+import pytest
+
+from app.core.instrumentation import DB_QUERIES_HEADER
+from tests.integration.payloads import DOMAINS
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_repeat_reads_skip_the_database_until_a_write(client, prefix, payload, key):
+    row = client.post(f"{prefix}/", json=payload(1)).json()
+    client.get(f"{prefix}/{row['id']}")
+
+    cached = client.get(f"{prefix}/{row['id']}")
+    assert cached.headers[DB_QUERIES_HEADER] == "0"
+
+    client.put(f"{prefix}/{row['id']}", json={"last_name": "Renamed"})
+    assert client.get(f"{prefix}/{row['id']}").json()["last_name"] == "Renamed"
+    client.delete(f"{prefix}/{row['id']}")
+    assert client.get(f"{prefix}/{row['id']}").status_code == 404
+
+
+def test_upsert_invalidates_cached_rows(client):
+    from tests.integration.payloads import student
+
+    row = client.post("/api/v1/students/", json=student(1)).json()
+    client.get(f"/api/v1/students/{row['id']}")
+    client.post("/api/v1/students/upsert", json=[student(1, major="Biology")])
+    assert client.get(f"/api/v1/students/{row['id']}").json()["major"] == "Biology"
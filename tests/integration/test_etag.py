@@ -0,0 +1,63 @@
+import pytest
+
+from tests.integration.payloads import DOMAINS, faculty, student
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_unchanged_row_is_304(client, prefix, payload, key):
+    row = client.post(f"{prefix}/", json=payload(1)).json()
+    first = client.get(f"{prefix}/{row['id']}")
+    etag = first.headers["ETag"]
+
+    cached = client.get(f"{prefix}/{row['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag and cached.content == b""
+
+    client.put(f"{prefix}/{row['id']}", json={"last_name": "Renamed"})
+    changed = client.get(f"{prefix}/{row['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_list_etag_changes_with_any_write_to_the_table(client, prefix, payload, key):
+    client.post(f"{prefix}/", json=payload(1))
+    etag = client.get(f"{prefix}/").headers["ETag"]
+    assert client.get(f"{prefix}/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"{prefix}/", json=payload(2))
+    response = client.get(f"{prefix}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and len(response.json()) == 2
+
+
+def test_list_etag_is_per_table(client):
+    etag = client.get("/api/v1/students/").headers["ETag"]
+    client.post("/api/v1/faculty/", json=faculty(1))
+    assert client.get("/api/v1/students/", headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("header", ["W/{etag}", '"other", {etag}', "*"])
+def test_if_none_match_forms(client, header):
+    row = client.post("/api/v1/students/", json=student(1)).json()
+    etag = client.get(f"/api/v1/students/{row['id']}").headers["ETag"]
+    headers = {"If-None-Match": header.format(etag=etag)}
+    assert client.get(f"/api/v1/students/{row['id']}", headers=headers).status_code == 304
+
+
+def test_stale_etag_gets_the_full_list(client):
+    client.post("/api/v1/students/", json=student(1))
+    response = client.get("/api/v1/students/", headers={"If-None-Match": '"students-v0"'})
+    assert response.status_code == 200 and len(response.json()) == 1
+
+
+def test_row_that_reuses_a_deleted_id_gets_a_new_etag(client):
+    first = client.post("/api/v1/students/", json=student(1)).json()
+    etag = client.get(f"/api/v1/students/{first['id']}").headers["ETag"]
+    client.delete(f"/api/v1/students/{first['id']}")
+
+    # Same second, and SQLite gives the new row the deleted one's id
+    second = client.post("/api/v1/students/", json=student(2)).json()
+    assert second["id"] == first["id"]
+    response = client.get(f"/api/v1/students/{second['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["student_id"] == student(2)["student_id"]
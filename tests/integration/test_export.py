@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+import pytest
+
+from tests.integration.payloads import DOMAINS, student
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_ndjson_export_matches_the_list_endpoint(client, prefix, payload, key):
+    client.post(f"{prefix}/bulk", json=[payload(n) for n in range(7)])
+    response = client.get(f"{prefix}/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get(f"{prefix}/").json()
+
+
+def test_csv_export_has_a_header_and_one_line_per_row(client):
+    client.post("/api/v1/students/bulk", json=[student(n, gpa="3.5" if n else None) for n in range(3)])
+    response = client.get("/api/v1/students/export", params={"format": "csv"})
+
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["student_id"] for row in rows] == ["STU00000", "STU00001", "STU00002"]
+    assert rows[0]["gpa"] == "" and rows[1]["gpa"] == "3.5"
+    assert rows[0]["is_active"] == "true"
+
+
+def test_export_applies_list_filters(client):
+    client.post("/api/v1/students/bulk", json=[student(n, major="Chemistry" if n % 2 else "Physics") for n in range(6)])
+    response = client.get("/api/v1/students/export", params={"major": "Chemistry"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["student_id"] for row in rows] == ["STU00001", "STU00003", "STU00005"]
+
+
+def test_export_of_an_empty_table_is_empty(client):
+    assert client.get("/api/v1/students/export").text == ""
+    assert client.get("/api/v1/students/export", params={"format": "csv"}).text.count("\n") == 1
+
+
+def test_export_streams_in_batches(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "export_batch_size", 4)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(10)])
+    with client.stream("GET", "/api/v1/students/export") as response:
+        chunks = [chunk for chunk in response.iter_raw() if chunk]
+    assert b"".join(chunks).count(b"\n") == 10
@@ -0,0 +1,46 @@
+GROUP_COMMIT_WRITES = """
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from tests.integration.payloads import student
+
+    def queries(response):
+        return [response.status_code, int(response.headers["X-DB-Queries"])]
+
+    def batches(client):
+        samples = dict(
+            line.split(" ") for line in client.get("/metrics").text.splitlines()
+            if line.startswith("group_commit_batch_size_")
+        )
+        return [float(samples["group_commit_batch_size_count"]), float(samples["group_commit_batch_size_sum"])]
+
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(8) as pool:
+            created = list(pool.map(lambda n: client.post("/api/v1/students/", json=student(n)), range(8)))
+        row = created[0].json()
+        print(json.dumps({
+            "batches": batches(client),
+            "created": [queries(response) for response in created],
+            "duplicate": queries(client.post("/api/v1/students/", json=student(0))),
+            "update": queries(client.put(f"/api/v1/students/{row['id']}", json={"major": "Biology"})),
+            "delete": queries(client.delete(f"/api/v1/students/{row['id']}")),
+            "left": len(client.get("/api/v1/students/").json()),
+        }))
+"""
+
+
+def test_writes_made_by_the_writer_thread_count_against_the_request(run_isolated):
+    # A window wide enough that the concurrent creates always share commits
+    report = run_isolated(GROUP_COMMIT_WRITES, {"GROUP_COMMIT": "true", "GROUP_COMMIT_WINDOW": "0.2"})
+
+    commits, writes = report["batches"]
+    assert writes == 8 and commits < writes
+
+    # SAVEPOINT, the statement and RELEASE for the write itself; BEGIN and the
+    # write token read for the batch it landed in
+    assert report["created"] == [[201, 5]] * 8
+    assert report["update"] == [200, 5] and report["delete"] == [204, 5]
+    # BEGIN, SAVEPOINT, the failed INSERT and ROLLBACK TO SAVEPOINT
+    assert report["duplicate"] == [400, 4]
+    assert report["left"] == 7
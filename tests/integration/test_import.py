@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from tests.integration.payloads import DOMAINS, student
+
+
+def _ndjson(*records) -> bytes:
+    return b"".join(
+        (record if isinstance(record, bytes) else json.dumps(record).encode()) + b"\n"
+        for record in records
+    )
+
+
+def _upload(client, prefix, content: bytes, filename: str, **params):
+    return client.post(f"{prefix}/import", files={"file": (filename, content)}, params=params)
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_export_can_be_imported_back(client, prefix, payload, key):
+    client.post(f"{prefix}/bulk", json=[payload(n) for n in range(5)])
+    exported = client.get(f"{prefix}/export", params={"format": "csv"}).content
+    for row in client.get(f"{prefix}/").json():
+        client.delete(f"{prefix}/{row['id']}")
+
+    report = _upload(client, prefix, exported, "export.csv").json()
+    assert report["total_rows"] == 5 and report["imported"] == 5 and report["failed"] == 0
+    assert [row[key] for row in client.get(f"{prefix}/").json()] == [payload(n)[key] for n in range(5)]
+
+
+def test_bad_rows_are_reported_by_line_and_the_rest_imported(client):
+    content = _ndjson(
+        student(1),
+        b"{not json",
+        student(2, email="not-an-email"),
+        b"",
+        [1, 2],
+        student(3, email="stu1@uni.edu"),
+        student(4),
+    )
+    report = _upload(client, "/api/v1/students", content, "people.ndjson").json()
+
+    assert report["total_rows"] == 6 and report["imported"] == 2 and report["failed"] == 4
+    errors = {error["line"]: error["error"] for error in report["errors"]}
+    assert sorted(errors) == [2, 3, 5, 6]
+    assert errors[2].startswith("Invalid JSON")
+    assert errors[3].startswith("email:")
+    assert errors[5] == "Expected a JSON object"
+    assert errors[6] == "Email already exists"
+
+
+def test_csv_line_numbers_count_the_header(client):
+    content = b"student_id,first_name,last_name,email\nSTU1,A,B,a@uni.edu\nSTU2,A,B,bad\n"
+    report = _upload(client, "/api/v1/students", content, "people.csv").json()
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [3]
+
+
+def test_rows_are_imported_in_batches(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "import_batch_size", 4)
+    report = _upload(client, "/api/v1/students", _ndjson(*[student(n) for n in range(10)]), "x.ndjson").json()
+    assert report["batches"] == 3 and report["imported"] == 10
+
+
+def test_error_list_is_truncated(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "import_max_errors", 2)
+    report = _upload(client, "/api/v1/students", _ndjson(*[b"{"] * 5), "x.ndjson").json()
+    assert report["failed"] == 5 and len(report["errors"]) == 2 and report["errors_truncated"]
+
+
+def test_format_parameter_overrides_the_filename(client):
+    report = _upload(client, "/api/v1/students", _ndjson(student(1)), "upload.txt", format="ndjson").json()
+    assert report["imported"] == 1
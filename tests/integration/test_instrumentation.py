@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.instrumentation import DB_QUERIES_HEADER, QueryStats, _current_stats
+from tests.integration.payloads import student
+
+
+def test_responses_report_database_usage(client):
+    response = client.get("/api/v1/students/")
+    assert int(response.headers[DB_QUERIES_HEADER]) >= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_failed_statements_are_counted(client):
+    from app.db.base import engine
+
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(50):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.exec_driver_sql("SELECT 1")
+            assert not [key for key in conn.info if "query" in key]
+    finally:
+        _current_stats.reset(token)
+    assert stats.count == 52  # BEGIN, the 50 failures and SELECT 1
+    assert stats.duration > 0
+
+
+def test_rejected_write_still_reports_its_statements(client):
+    client.post("/api/v1/students/", json=student(1))
+    response = client.post("/api/v1/students/", json=student(1))
+    assert response.status_code == 400
+    assert int(response.headers[DB_QUERIES_HEADER]) >= 1
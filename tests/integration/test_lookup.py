@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.config import settings
+from app.core.instrumentation import DB_QUERIES_HEADER
+from tests.integration.payloads import DOMAINS, student
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_lookup_lines_up_with_the_request(client, prefix, payload, key):
+    first, second = (client.post(f"{prefix}/", json=payload(n)).json() for n in (1, 2))
+
+    by_id = client.post(f"{prefix}/lookup", json={"ids": [second["id"], 9999, first["id"], second["id"]]})
+    assert by_id.status_code == 200
+    assert [row and row["id"] for row in by_id.json()] == [second["id"], None, first["id"], second["id"]]
+    assert by_id.json()[0] == client.get(f"{prefix}/{second['id']}").json()
+
+    by_key = client.post(f"{prefix}/lookup", json={f"{key}s": ["NOPE", first[key]]})
+    assert [row and row[key] for row in by_key.json()] == [None, first[key]]
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"ids": [1], "student_ids": ["STU00001"]},
+    {"staff_ids": ["STU00001"]},
+    {"ids": list(range(settings.lookup_max_items + 1))},
+])
+def test_lookup_takes_exactly_one_key_list(client, body):
+    assert client.post("/api/v1/students/lookup", json=body).status_code == 422
+
+
+def test_lookup_fetches_one_batch_at_a_time(client, monkeypatch):
+    monkeypatch.setattr(settings, "bulk_batch_size", 2)
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(5)])
+    keys = [student(n)["student_id"] for n in range(5)] * 2
+
+    response = client.post("/api/v1/students/lookup", json={"student_ids": keys})
+    assert [row["student_id"] for row in response.json()] == keys
+    # BEGIN, then three IN (...) batches for the five distinct keys
+    assert response.headers[DB_QUERIES_HEADER] == "4"
@@ -0,0 +1,22 @@
+def test_metrics_report_requests_by_route_template(client):
+    client.get("/api/v1/students/")
+    client.get("/api/v1/students/123456")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/students/{student_id}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{le="0.001",method="GET",route="/api/v1/students/"}' in body
+    assert 'http_request_db_queries_count{method="GET",route="/api/v1/students/"}' in body
+    assert "db_pool_checkout_wait_seconds_count" in body
+
+
+def test_unmatched_paths_share_one_label(client):
+    from app.core.metrics import UNMATCHED_ROUTE
+
+    client.get("/no/such/path/42")
+    client.get("/no/such/path/43")
+    body = client.get("/metrics").text
+    assert "/no/such/path" not in body
+    assert f'route="{UNMATCHED_ROUTE}"' in body
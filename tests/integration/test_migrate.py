@@ -0,0 +1,71 @@
+import sqlite3
+
+from app.db.migrate import SCHEMA_VERSION
+
+START = """
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    try:
+        with TestClient(app) as client:
+            outcome = client.get("/api/v1/students/").status_code
+    except RuntimeError as e:
+        outcome = str(e)
+    print(json.dumps(outcome))
+"""
+
+
+def user_version(tmp_path, value=None):
+    with sqlite3.connect(tmp_path / "app.db") as db:
+        if value is not None:
+            db.execute(f"PRAGMA user_version = {value}")
+        return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_outdated_schema_stops_startup_without_auto_migrate(run_isolated, tmp_path):
+    user_version(tmp_path, 0)
+    assert run_isolated(START, {"AUTO_MIGRATE": "false"}) == (
+        f"Database schema is at version 0, this release needs {SCHEMA_VERSION}; "
+        "run `python -m app.db.migrate`"
+    )
+
+
+def test_migrate_command_brings_the_schema_up_to_date(run_isolated, tmp_path):
+    user_version(tmp_path, 0)
+    migrated = run_isolated("""
+        import json, subprocess, sys
+        from app.db.migrate import oldest_schema_version
+        before = oldest_schema_version()
+        subprocess.run([sys.executable, "-m", "app.db.migrate"], check=True, capture_output=True)
+        print(json.dumps([before, oldest_schema_version()]))
+    """)
+    assert migrated == [0, SCHEMA_VERSION]
+    assert run_isolated(START, {"AUTO_MIGRATE": "false"}) == 200
+
+
+def test_auto_migrate_upgrades_on_startup(run_isolated, tmp_path):
+    user_version(tmp_path, SCHEMA_VERSION - 1)
+    assert run_isolated(START, {"AUTO_MIGRATE": "true"}) == 200
+    assert user_version(tmp_path) == SCHEMA_VERSION
+
+
+def test_newer_schema_is_left_alone(run_isolated, tmp_path):
+    run_isolated(START)
+    user_version(tmp_path, SCHEMA_VERSION + 1)
+    assert run_isolated(START, {"AUTO_MIGRATE": "false"}) == 200
+    assert user_version(tmp_path) == SCHEMA_VERSION + 1
+
+
+def test_workers_starting_together_migrate_once(run_isolated, tmp_path):
+    outcomes = run_isolated("""
+        import json, subprocess, sys
+        code = "from app.db.migrate import ensure_schema; ensure_schema()"
+        workers = [
+            subprocess.Popen([sys.executable, "-c", code], stderr=subprocess.PIPE, text=True)
+            for _ in range(4)
+        ]
+        print(json.dumps([(worker.wait(), worker.stderr.read()[-300:]) for worker in workers]))
+    """)
+    assert outcomes == [[0, ""]] * 4
+    assert user_version(tmp_path) == SCHEMA_VERSION
@@ -0,0 +1,71 @@
+import pytest
+
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from tests.integration.payloads import DOMAINS, student
+
+
+def _walk(client, url, **params):
+    """Follow X-Next-Cursor from the first page to the last; returns every row."""
+    rows, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        rows += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_cursor_pages_cover_every_row_once(client, prefix, payload, key):
+    assert client.post(f"{prefix}/bulk", json=[payload(n) for n in range(23)]).status_code == 200
+    rows = _walk(client, f"{prefix}/", limit=5)
+    assert [row[key] for row in rows] == [payload(n)[key] for n in range(23)]
+
+
+def test_last_name_cursor_keeps_sort_across_pages(client):
+    client.post("/api/v1/students/bulk", json=[student(n, last_name=f"Name{n % 4}") for n in range(10)])
+    rows = _walk(client, "/api/v1/students/", limit=3, sort="-last_name")
+    keys = [(row["last_name"], row["id"]) for row in rows]
+    assert len(rows) == 10
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_short_page_has_no_next_cursor(client):
+    client.post("/api/v1/students/", json=student(1))
+    response = client.get("/api/v1/students/", params={"limit": 5})
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_cursor_ignores_skip(client):
+    client.post("/api/v1/students/bulk", json=[student(n) for n in range(6)])
+    first = client.get("/api/v1/students/", params={"limit": 2})
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    second = client.get("/api/v1/students/", params={"limit": 2, "cursor": cursor, "skip": 4})
+    assert [row["student_id"] for row in second.json()] == ["STU00002", "STU00003"]
+
+
+@pytest.mark.parametrize("cursor, sort", [
+    ("not-a-cursor", "id"),
+    (encode_cursor("5"), "id"),
+    (encode_cursor(1, 2), "id"),
+    (encode_cursor(5), "last_name"),
+    (encode_cursor("-last_name", "Smith", 5), "last_name"),
+])
+def test_invalid_cursor_is_400(client, cursor, sort):
+    response = client.get("/api/v1/students/", params={"cursor": cursor, "sort": sort})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_page_size_is_capped(client):
+    from app.core.config import settings
+
+    assert client.get("/api/v1/students/", params={"limit": settings.max_page_size + 1}).status_code == 422
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_list_rows_match_single_row_responses(client, prefix, payload, key):
+    client.post(f"{prefix}/bulk", json=[payload(n) for n in range(3)])
+    rows = client.get(f"{prefix}/").json()
+    assert rows == [client.get(f"{prefix}/{row['id']}").json() for row in rows]
@@ -0,0 +1,53 @@
+from tests.integration.payloads import faculty, patient, student
+
+
+def _search(client, **params):
+    response = client.get("/api/v1/people/search", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_finds_people_across_domains_by_prefix(client):
+    client.post("/api/v1/students/", json=student(1, first_name="John", last_name="Smith"))
+    client.post("/api/v1/faculty/", json=faculty(1, first_name="Johanna", last_name="Smithers"))
+    client.post("/api/v1/patients/", json=patient(1, first_name="Mary", last_name="Jones"))
+
+    rows = _search(client, q="jo smi")
+    assert {(row["domain"], row["last_name"]) for row in rows} == {("students", "Smith"), ("faculty", "Smithers")}
+    for row in rows:
+        assert client.get(f"/api/v1/{row['domain']}/{row['id']}").json()["last_name"] == row["last_name"]
+
+
+def test_search_follows_writes(client):
+    created = client.post("/api/v1/students/", json=student(1, last_name="Quixote")).json()
+    assert len(_search(client, q="quix")) == 1
+    client.put(f"/api/v1/students/{created['id']}", json={"last_name": "Panza"})
+    assert _search(client, q="quix") == []
+    client.delete(f"/api/v1/students/{created['id']}")
+    assert _search(client, q="panza") == []
+
+
+def test_domain_filter_and_paging(client):
+    client.post("/api/v1/students/bulk", json=[student(n, first_name="Ada") for n in range(5)])
+    client.post("/api/v1/faculty/", json=faculty(1, first_name="Ada"))
+
+    assert {row["domain"] for row in _search(client, q="ada", domain="faculty")} == {"faculty"}
+    everyone = _search(client, q="ada")
+    assert len(everyone) == 6
+    pages = _search(client, q="ada", limit=4) + _search(client, q="ada", skip=4, limit=4)
+    assert pages == everyone
+
+
+def test_best_match_is_ranked_first_among_many_matches(client):
+    # Far more matches than any page, with the best match written last so it
+    # has the highest rowid: ranking must consider every match.
+    client.post("/api/v1/students/bulk", json=[student(n, first_name="Zed") for n in range(1500)])
+    best = client.post("/api/v1/students/", json=student(9999, student_id="ZED-1", first_name="Zed")).json()
+
+    rows = _search(client, q="zed", limit=5)
+    assert (rows[0]["domain"], rows[0]["id"]) == ("students", best["id"])
+
+
+def test_query_without_words_matches_nothing(client):
+    client.post("/api/v1/students/", json=student(1))
+    assert _search(client, q="*:-") == []
@@ -0,0 +1,84 @@
+import sqlite3
+
+from app.db.migrate import SCHEMA_VERSION
+
+SHARDS = {"DATABASE_URLS": '{{"patients": "sqlite:///{tmp}/patients.db", "students": "sqlite:///{tmp}/students.db"}}'}
+
+ACROSS_DATABASES = """
+    import json, time
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.utils.pagination import decode_cursor, encode_cursor
+    from tests.integration.payloads import faculty, patient, student
+
+    with TestClient(app) as client:
+        since = client.get("/api/v1/changes/head").json()["cursor"]
+        client.post("/api/v1/students/", json=student(1, last_name="Shardson"))
+        client.post("/api/v1/patients/", json=patient(1, last_name="Shardson"))
+        row = client.post("/api/v1/faculty/", json=faculty(1, last_name="Shardson")).json()
+        client.put(f"/api/v1/faculty/{row['id']}", json={"department": "Chemistry"})
+
+        pages, cursor = [], since
+        while True:
+            feed = client.get("/api/v1/changes/", params={"since": cursor, "limit": 2}).json()
+            pages.append([(change["domain"], change["op"]) for change in feed["changes"]])
+            cursor = feed["next_cursor"]
+            if not feed["has_more"]:
+                break
+
+        for _ in range(250):
+            check = client.post("/api/v1/access/check", json=["STU00001", "PAT00001", "fac1@uni.edu"]).json()
+            if all(decision["domain"] for decision in check):
+                break
+            time.sleep(0.02)
+
+        print(json.dumps({
+            "positions": len(decode_cursor(since)),
+            "pages": pages,
+            "search": sorted(hit["domain"] for hit in client.get("/api/v1/people/search", params={"q": "Shardson"}).json()),
+            "access": [decision["domain"] for decision in check],
+            "single_position_cursor": client.get("/api/v1/changes/", params={"since": encode_cursor(0)}).status_code,
+        }))
+"""
+
+
+def rows(tmp_path, database):
+    """Rows in each domain table `database` holds."""
+    with sqlite3.connect(tmp_path / database) as db:
+        tables = [name for name, in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {
+            table: db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in ("students", "faculty", "it_staff", "staff", "patients") if table in tables
+        }
+
+
+def test_domains_live_in_their_own_databases(run_isolated, tmp_path):
+    report = run_isolated(ACROSS_DATABASES, SHARDS)
+
+    assert rows(tmp_path, "students.db") == {"students": 1}
+    assert rows(tmp_path, "patients.db") == {"patients": 1}
+    assert rows(tmp_path, "app.db") == {"faculty": 1, "it_staff": 0, "staff": 0}
+    for database in ("app.db", "students.db", "patients.db"):
+        with sqlite3.connect(tmp_path / database) as db:
+            assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    # One position per database, and every change exactly once across pages
+    assert report["positions"] == 3
+    assert all(len(page) <= 2 for page in report["pages"])
+    assert sorted(sum(report["pages"], [])) == [
+        ["faculty", "insert"], ["faculty", "update"], ["patients", "insert"], ["students", "insert"],
+    ]
+    assert report["search"] == ["faculty", "patients", "students"]
+    assert report["access"] == ["students", "patients", "faculty"]
+    assert report["single_position_cursor"] == 410
+
+
+def test_unknown_domains_are_rejected(run_isolated):
+    error = run_isolated("""
+        import json
+        try:
+            import app.db.base
+        except ValueError as e:
+            print(json.dumps(str(e)))
+    """, {"DATABASE_URLS": '{{"pupils": "sqlite:///{tmp}/pupils.db"}}'})
+    assert error == "DATABASE_URLS names unknown domains: pupils"
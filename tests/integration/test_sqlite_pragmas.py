@@ -0,0 +1,32 @@
+import pytest
+
+from app.db.sqlite import begin_immediate
+
+
+def test_connections_use_the_configured_pragmas(client):
+    from app.core.config import settings
+    from app.db.base import engine
+    from app.db.sqlite import effective_pragmas
+
+    pragmas = effective_pragmas(engine)
+    assert pragmas["journal_mode"].upper() == settings.sqlite_journal_mode.upper()
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["mmap_size"] == settings.sqlite_mmap_size
+    assert pragmas["cache_size"] == settings.sqlite_cache_size
+    assert pragmas["temp_store"] == 2  # MEMORY
+    assert pragmas["busy_timeout"] == settings.sqlite_busy_timeout
+
+
+def test_begin_immediate_takes_the_write_lock_before_any_write(client):
+    import sqlite3
+
+    from app.db.base import SessionLocal, engine
+
+    with SessionLocal() as db:
+        begin_immediate(db)
+        other = sqlite3.connect(engine.url.database, timeout=0)
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+                other.execute("DELETE FROM students")
+        finally:
+            other.close()
@@ -0,0 +1,60 @@
+import pytest
+
+from app.core.instrumentation import DB_QUERIES_HEADER
+from tests.integration.payloads import faculty, staff, student
+
+UPSERT_DOMAINS = [
+    ("/api/v1/students", student, "student_id"),
+    ("/api/v1/faculty", faculty, "faculty_id"),
+    ("/api/v1/staff", staff, "staff_id"),
+]
+
+
+@pytest.mark.parametrize("prefix, payload, key", UPSERT_DOMAINS)
+def test_upsert_counts_inserted_updated_and_unchanged(client, prefix, payload, key):
+    client.post(f"{prefix}/bulk", json=[payload(1), payload(2)])
+    items = [payload(1), payload(2, first_name="Changed"), payload(3)]
+    response = client.post(f"{prefix}/upsert", json=items)
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 1, "updated": 1, "unchanged": 1, "failed": 0, "errors": []}
+    rows = {row[key]: row for row in client.get(f"{prefix}/").json()}
+    assert rows[payload(2)[key]]["first_name"] == "Changed"
+    assert payload(3)[key] in rows
+
+
+def test_upsert_reports_per_item_errors_by_index(client):
+    client.post("/api/v1/students/", json=student(1))
+    items = [student(2), student(3, email="stu1@uni.edu"), student(4)]
+    body = client.post("/api/v1/students/upsert", json=items).json()
+
+    assert body["inserted"] == 2 and body["failed"] == 1
+    assert body["errors"] == [{"index": 1, "id": None, "error": "Email already exists"}]
+    assert len(client.get("/api/v1/students/").json()) == 3
+
+
+def test_upsert_last_occurrence_of_a_key_wins(client):
+    items = [student(1, major="Chemistry"), student(1, major="Biology"), student(2)]
+    body = client.post("/api/v1/students/upsert", json=items).json()
+
+    # The superseded copy counts as unchanged, so the counts cover every item
+    assert body == {"inserted": 2, "updated": 0, "unchanged": 1, "failed": 0, "errors": []}
+    assert [row["major"] for row in client.get("/api/v1/students/").json()] == ["Biology", "Physics"]
+
+
+def test_upsert_writes_without_reading_first(client):
+    client.post("/api/v1/students/", json=student(1))
+    response = client.post("/api/v1/students/upsert", json=[student(1, major="Biology"), student(2)])
+
+    assert response.json()["inserted"] == response.json()["updated"] == 1
+    # BEGIN, SAVEPOINT, the upsert, RELEASE and the write token's change log read
+    assert response.headers[DB_QUERIES_HEADER] == "5"
+
+
+def test_unchanged_upsert_keeps_updated_at(client):
+    client.post("/api/v1/students/", json=student(1))
+    before = client.get("/api/v1/students/").json()[0]
+    body = client.post("/api/v1/students/upsert", json=[student(1)]).json()
+
+    assert body["unchanged"] == 1
+    assert client.get("/api/v1/students/").json()[0]["updated_at"] == before["updated_at"]
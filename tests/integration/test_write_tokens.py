@@ -0,0 +1,90 @@
+import pytest
+
+from app.core.instrumentation import DB_QUERIES_HEADER
+from app.db.write_tokens import WRITE_TOKEN_HEADER, parse_write_token
+from tests.integration.payloads import student
+
+
+def _rename_behind_the_cache(row_id, last_name):
+    """Change a row the way another worker would: without touching this worker's entity cache."""
+    from app.db.base import table_engines
+
+    with table_engines["students"].begin() as conn:
+        conn.exec_driver_sql("UPDATE students SET last_name = ? WHERE id = ?", (last_name, row_id))
+
+
+def test_writes_return_a_token_and_reads_do_not(client):
+    created = client.post("/api/v1/students/", json=student(1))
+    updated = client.put(f"/api/v1/students/{created.json()['id']}", json={"major": "Biology"})
+
+    (first,), (second,) = (parse_write_token(r.headers[WRITE_TOKEN_HEADER]) for r in (created, updated))
+    assert 0 < first < second
+    assert WRITE_TOKEN_HEADER not in client.get("/api/v1/students/").headers
+
+
+def test_requests_that_change_nothing_get_no_token(client):
+    client.post("/api/v1/students/", json=student(1))
+
+    unchanged = client.post("/api/v1/students/upsert", json=[student(1)])
+    assert unchanged.json()["unchanged"] == 1
+    failed = client.post("/api/v1/students/", json=student(1))
+    assert failed.status_code == 400
+    for response in (unchanged, failed):
+        assert WRITE_TOKEN_HEADER not in response.headers
+    # No change log read for the token either: BEGIN and the upsert between
+    # its SAVEPOINT and RELEASE
+    assert unchanged.headers[DB_QUERIES_HEADER] == "4"
+
+
+def test_malformed_token_is_400(client):
+    for token in ("garbage", "WyJ4Il0", "Wy0xXQ"):  # not a cursor, ["x"], [-1]
+        response = client.get("/api/v1/students/", headers={WRITE_TOKEN_HEADER: token})
+        assert response.status_code == 400
+        assert response.json()["detail"] == f"Invalid {WRITE_TOKEN_HEADER}"
+
+
+def test_token_bypasses_the_entity_cache(client):
+    created = client.post("/api/v1/students/", json=student(1))
+    row = created.json()
+    client.get(f"/api/v1/students/{row['id']}")
+    _rename_behind_the_cache(row["id"], "Elsewhere")
+
+    assert client.get(f"/api/v1/students/{row['id']}").json()["last_name"] == row["last_name"]
+    headers = {WRITE_TOKEN_HEADER: created.headers[WRITE_TOKEN_HEADER]}
+    assert client.get(f"/api/v1/students/{row['id']}", headers=headers).json()["last_name"] == "Elsewhere"
+
+
+STALE_REPLICA = """
+    import json, os, shutil, subprocess, sys
+    # The replica is a copy of the empty, migrated database that never catches up
+    subprocess.run([sys.executable, "-m", "app.db.migrate"], check=True, capture_output=True)
+    shutil.copyfile(os.environ["DATABASE_URL"][len("sqlite:///"):], os.environ["READ_DATABASE_URL"][len("sqlite:///"):])
+
+    from fastapi.testclient import TestClient
+    from app.db.base import table_engines
+    from app.main import app
+    from tests.integration.payloads import student
+
+    with TestClient(app) as client:
+        created = client.post("/api/v1/students/", json=student(1))
+        path = f"/api/v1/students/{created.json()['id']}"
+        token = {"X-Write-Token": created.headers["X-Write-Token"]}
+        report = {
+            "replica": client.get(path).status_code,
+            "with_token": client.get(path, headers=token).status_code,
+            "list_with_token": len(client.get("/api/v1/students/", headers=token).json()),
+        }
+        # The token read above cached the row; change it behind the cache
+        with table_engines["students"].begin() as conn:
+            conn.exec_driver_sql("UPDATE students SET last_name = 'Elsewhere'")
+        report["fresh_with_token"] = client.get(path, headers=token).json()["last_name"]
+        print(json.dumps(report))
+"""
+
+
+@pytest.mark.parametrize("async_database", ["false", "true"])
+def test_token_reads_fall_back_to_the_primary(run_isolated, async_database):
+    report = run_isolated(STALE_REPLICA, {
+        "READ_DATABASE_URL": "sqlite:///{tmp}/replica.db", "ASYNC_DATABASE": async_database,
+    })
+    assert report == {"replica": 404, "with_token": 200, "list_with_token": 1, "fresh_with_token": "Elsewhere"}
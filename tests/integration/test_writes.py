@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.instrumentation import DB_QUERIES_HEADER
+from tests.integration.payloads import DOMAINS, student
+
+# BEGIN, the UPDATE/DELETE ... RETURNING and the write position read
+# for the X-Write-Token header; no SELECT before or after the write.
+MAX_WRITE_STATEMENTS = 3
+
+
+def _statements(response) -> int:
+    return int(response.headers[DB_QUERIES_HEADER])
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_writes_take_one_round_trip(client, prefix, payload, key):
+    created = client.post(f"{prefix}/", json=payload(1))
+    row = created.json()
+    assert created.status_code == 201
+
+    updated = client.put(f"{prefix}/{row['id']}", json={"last_name": "Renamed"})
+    assert updated.status_code == 200
+    assert updated.json()["last_name"] == "Renamed"
+    assert updated.json()[key] == row[key]
+    assert updated.json()["updated_at"] is not None
+    assert _statements(updated) <= MAX_WRITE_STATEMENTS
+
+    deleted = client.delete(f"{prefix}/{row['id']}")
+    assert deleted.status_code == 204
+    assert _statements(deleted) <= MAX_WRITE_STATEMENTS
+    assert client.get(f"{prefix}/{row['id']}").status_code == 404
+
+
+@pytest.mark.parametrize("prefix, payload, key", DOMAINS)
+def test_missing_rows_are_404(client, prefix, payload, key):
+    assert client.put(f"{prefix}/999999", json={"last_name": "Renamed"}).status_code == 404
+    assert client.delete(f"{prefix}/999999").status_code == 404
+
+
+def test_empty_update_returns_the_row_unchanged(client):
+    row = client.post("/api/v1/students/", json=student(1)).json()
+    response = client.put(f"/api/v1/students/{row['id']}", json={})
+    assert response.status_code == 200
+    assert response.json() == row
@@ -0,0 +1,100 @@
+import asyncio
+from bisect import bisect_left
+
+import pytest
+
+from app.services.access_index import ACCESS_SOURCES, AccessIndex, _merge
+
+
+def person(domain, n, **fields):
+    id_column = next(column for name, _, column in ACCESS_SOURCES if name == domain)
+    return {id_column: f"{domain[:3].upper()}{n}", "email": f"p{n}@uni.edu", "is_active": True, **fields}
+
+
+def compact(index):
+    index._columns = _merge(index._columns, index._changed)
+    index._changed, index._changed_keys = {}, {}
+
+
+def build(people, compacted):
+    """An index holding `people` ((domain, id, row) triples), packed or still in the overlay."""
+    index = AccessIndex()
+    for domain, id, row in people:
+        index._apply(domain, id, row)
+    if compacted:
+        compact(index)
+    return index
+
+
+def found(index, identifier, domain=None):
+    return [(match["domain"], match["id"], match["is_active"]) for match in index.lookup(identifier, domain)]
+
+
+@pytest.fixture(params=[False, True], ids=["overlay", "columns"])
+def compacted(request):
+    return request.param
+
+
+def test_ids_match_exactly_and_emails_case_insensitively(compacted):
+    index = build([("students", 1, person("students", 1, email="Ada@Uni.edu"))], compacted)
+    assert found(index, "STU1") == found(index, " ada@UNI.EDU ") == [("students", 1, True)]
+    assert found(index, "stu1") == found(index, "STU") == found(index, "STU10") == []
+
+
+def test_shared_identifier_matches_every_holder_in_domain_order(compacted):
+    index = build([
+        ("staff", 7, person("staff", 7, email="both@uni.edu", is_active=False)),
+        ("students", 3, person("students", 3, email="both@uni.edu")),
+    ], compacted)
+    assert found(index, "both@uni.edu") == [("students", 3, True), ("staff", 7, False)]
+    assert found(index, "both@uni.edu", "staff") == [("staff", 7, False)]
+    assert found(index, "both@uni.edu", "patients") == []
+
+
+def test_decision_includes_access_level(compacted):
+    index = build([("it-staff", 2, person("it-staff", 2, access_level="admin"))], compacted)
+    [match] = index.lookup("IT-2")
+    assert (match["is_active"], match["access_level"]) == (True, "admin")
+
+
+def test_changes_mask_the_columns_until_compacted():
+    index = build([("students", n, person("students", n)) for n in range(1, 4)], compacted=True)
+    index._apply("students", 1, person("students", 1, email="new@uni.edu", is_active=False))
+    index._apply("students", 2, None)
+    index._apply("faculty", 9, person("faculty", 9))
+
+    for _ in range(2):
+        assert found(index, "p1@uni.edu") == []
+        assert found(index, "new@uni.edu") == found(index, "STU1") == [("students", 1, False)]
+        assert found(index, "STU2") == found(index, "p2@uni.edu") == []
+        assert found(index, "STU3") == [("students", 3, True)]
+        assert found(index, "FAC9") == [("faculty", 9, True)]
+        assert index._count == 3
+        compact(index)
+    assert len(index._columns.refs) == 3
+
+
+def test_search_agrees_with_bisect_across_samples():
+    people = [("students", n, person("students", n)) for n in range(1, 300)]
+    columns = build(people, compacted=True)._columns
+    keys = [columns.keys[position] for position in range(len(columns.keys))]
+    assert keys == sorted(keys)
+    for target in keys[::7] + [b"", b"STU150\0", b"p99@", b"\xff"]:
+        assert columns._search(target) == bisect_left(keys, target)
+
+
+def test_compaction_keeps_changes_applied_while_it_ran(monkeypatch):
+    from app.services import access_index
+
+    index = build([("students", 1, person("students", 1))], compacted=False)
+
+    def merge_during_a_write(columns, changed):
+        index._apply("students", 1, person("students", 1, is_active=False))
+        return _merge(columns, changed)
+
+    monkeypatch.setattr(access_index, "_merge", merge_during_a_write)
+    asyncio.run(index._compact())
+    assert list(index._changed) == [access_index.REF_STRIDE * 1]
+    assert found(index, "STU1") == [("students", 1, False)]
+    compact(index)
+    assert found(index, "STU1") == [("students", 1, False)]
@@ -0,0 +1,28 @@
+import pytest
+
+from app.utils.pagination import SortKey, _cursor_key, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips():
+    assert decode_cursor(encode_cursor(500)) == [500]
+    assert decode_cursor(encode_cursor("-last_name", "Smith", 7)) == ["-last_name", "Smith", 7]
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    cursor = encode_cursor("last_name", "Ünïcode ?&/", 123456)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90IGpzb24", "e30", "W10"])  # ..., not json, {}, []
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_must_match_the_sort_it_was_issued_for():
+    assert _cursor_key([5], SortKey.id) == (5,)
+    assert _cursor_key(["last_name", "Smith", 5], SortKey.last_name) == ("Smith", 5)
+    assert _cursor_key(["last_name", "Smith", 5], SortKey.last_name_desc) is None
+    assert _cursor_key([5], SortKey.last_name) is None
+    assert _cursor_key([True], SortKey.id) is None
+    assert _cursor_key(["5"], SortKey.id) is None
@@ -0,0 +1,77 @@
+from app.utils import cache
+from app.utils.cache import EntityCache
+
+
+class Loader:
+    def __init__(self, value="row"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_hits_are_served_without_loading():
+    entities, load = EntityCache("test"), Loader()
+    assert entities.get_or_load(1, load) == "row"
+    assert entities.get_or_load(1, load) == "row"
+    assert load.calls == 1
+
+
+def test_none_is_never_cached():
+    entities, load = EntityCache("test"), Loader(None)
+    entities.get_or_load(1, load)
+    entities.get_or_load(1, load)
+    assert load.calls == 2
+
+
+def test_invalidate_and_refresh_reload():
+    entities, load = EntityCache("test"), Loader()
+    entities.get_or_load(1, load)
+    entities.invalidate(1)
+    entities.get_or_load(1, load)
+    entities.get_or_load(1, load, refresh=True)
+    assert load.calls == 3
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    entities, load = EntityCache("test", ttl=5), Loader()
+    entities.get_or_load(1, load)
+    now[0] += 4
+    entities.get_or_load(1, load)
+    now[0] += 2
+    entities.get_or_load(1, load)
+    assert load.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    entities = EntityCache("test", maxsize=2)
+    loads = {key: Loader(key) for key in "abc"}
+    entities.get_or_load("a", loads["a"])
+    entities.get_or_load("b", loads["b"])
+    entities.get_or_load("a", loads["a"])
+    entities.get_or_load("c", loads["c"])
+    assert list(entities._entries) == ["a", "c"]
+
+
+def test_load_that_raced_an_invalidation_is_not_cached():
+    entities = EntityCache("test")
+    stale = Loader("stale")
+
+    def load_during_write():
+        entities.invalidate(1)
+        return stale()
+
+    assert entities.get_or_load(1, load_during_write) == "stale"
+    assert entities.get_or_load(1, Loader("fresh")) == "fresh"
+
+
+def test_disabled_cache_always_loads(monkeypatch):
+    monkeypatch.setattr(cache.settings, "entity_cache_enabled", False)
+    entities, load = EntityCache("test"), Loader()
+    entities.get_or_load(1, load)
+    entities.get_or_load(1, load)
+    assert load.calls == 2
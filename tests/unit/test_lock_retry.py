@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import sqlite
+from app.db.sqlite import run_with_lock_retry, run_with_lock_retry_async
+
+LOCKED = OperationalError("INSERT", {}, Exception("database is locked"))
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeAsyncSession(FakeSession):
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def _failing(times, result="done"):
+    calls = []
+
+    def operation():
+        calls.append(1)
+        if len(calls) <= times:
+            raise LOCKED
+        return result
+
+    return operation, calls
+
+
+def test_locked_operation_is_retried_with_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sqlite.time, "sleep", sleeps.append)
+    db = FakeSession()
+    operation, calls = _failing(2)
+
+    assert run_with_lock_retry(db, operation) == "done"
+    assert len(calls) == 3 and db.rollbacks == 2 and len(sleeps) == 2
+    assert sleeps[1] <= settings.sqlite_lock_retry_max_delay
+
+
+def test_gives_up_after_the_configured_retries(monkeypatch):
+    monkeypatch.setattr(sqlite.time, "sleep", lambda delay: None)
+    operation, calls = _failing(settings.sqlite_lock_retries + 1)
+
+    with pytest.raises(OperationalError):
+        run_with_lock_retry(FakeSession(), operation)
+    assert len(calls) == settings.sqlite_lock_retries + 1
+
+
+def test_other_errors_are_not_retried():
+    def operation():
+        raise OperationalError("SELECT", {}, Exception("no such table: x"))
+
+    db = FakeSession()
+    with pytest.raises(OperationalError):
+        run_with_lock_retry(db, operation)
+    assert db.rollbacks == 0
+
+
+def test_sync_retry_never_sleeps_on_the_event_loop(monkeypatch):
+    monkeypatch.setattr(sqlite.time, "sleep", lambda delay: pytest.fail("slept on the event loop"))
+    operation, calls = _failing(1)
+
+    async def main():
+        with pytest.raises(OperationalError):
+            run_with_lock_retry(FakeSession(), operation)
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_async_retry_backs_off_with_asyncio_sleep(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(sqlite.asyncio, "sleep", fake_sleep)
+    db = FakeAsyncSession()
+    operation, calls = _failing(2)
+
+    async def attempt():
+        return operation()
+
+    assert asyncio.run(run_with_lock_retry_async(db, attempt)) == "done"
+    assert len(calls) == 3 and db.rollbacks == 2 and len(sleeps) == 2
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.faculty import FacultyResponse
+from app.schemas.patient import PatientResponse
+from app.schemas.student import StudentResponse
+from app.utils.serialization import FileFormat, RowSerializer
+
+ROWS = {
+    StudentResponse: {
+        "id": 1, "student_id": "STU00001", "first_name": "Zoë", "last_name": "O'Brien",
+        "email": "stu1@uni.edu", "phone": None, "major": "Physics", "year": 2, "gpa": "3.75",
+        "is_active": True, "created_at": datetime(2024, 1, 2, 3, 4, 5, 678901), "updated_at": None,
+    },
+    FacultyResponse: {
+        "id": 2, "faculty_id": "FAC00002", "first_name": "Fac", "last_name": "Ulty",
+        "email": "fac2@uni.edu", "phone": "555-0100", "department": "Physics", "position": "Lecturer",
+        "office_location": None, "specialization": None, "is_active": False, "created_at": datetime(2024, 1, 2),
+        "updated_at": datetime(2024, 5, 6, 7, 8, 9),
+    },
+    PatientResponse: {
+        "id": 3, "patient_id": "PAT00003", "first_name": "Pat", "last_name": "Ient",
+        "email": "pat3@mail.org", "phone": None, "address": "1 Main St", "date_of_birth": "1990-01-01",
+        "is_active": True, "created_at": datetime(2024, 1, 2), "updated_at": None,
+    },
+}
+
+
+@pytest.mark.parametrize("schema", ROWS)
+def test_rows_serialize_like_the_default_response_pipeline(schema):
+    row = {name: ROWS[schema].get(name) for name in schema.model_fields}
+    expected = JSONResponse(jsonable_encoder([schema.model_validate(row)])).body
+
+    assert RowSerializer(schema).dump([row]) == expected
+
+
+def test_lookup_response_keeps_nulls_in_place():
+    row = ROWS[StudentResponse]
+    body = RowSerializer(StudentResponse).lookup_response([None, row, None]).body
+    assert body.startswith(b"[null,{") and body.endswith(b"},null]")
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("people.csv", FileFormat.csv),
+    ("PEOPLE.CSV", FileFormat.csv),
+    ("people.ndjson", FileFormat.ndjson),
+    ("", FileFormat.ndjson),
+])
+def test_format_from_filename(filename, expected):
+    assert FileFormat.from_filename(filename) == expected